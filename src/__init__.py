@@ -1,35 +1,141 @@
-from .data_preprocessing import (
-    excluir_outliers,
-    identificar_outliers,
-    contar_valores_nulos,
-    converter_tipo_dado,
-    gerar_resumo_estatistico,
-    normalizar_coluna,
-    preencher_nulos,
-    substituir_valores,
-    remover_duplicatas,
-    verificar_tipos_dados
-)
+import importlib
 
-from .data_analysis import (
-    analisar_categorias,
-    boxplot_coluna,
-    contar_categorias,
-    contar_valores_unicos,
-    detectar_skewness,
-    encontrar_colunas_constantes,
-    plot_matriz_correlacao_Encoding,
-    outliers_por_coluna,
-    visualizar_distribuicao
-)
+# Nomes públicos de cada módulo. Os módulos só são importados no primeiro acesso a um
+# dos seus nomes (`__getattr__`): `src.preencher_nulos` carrega o pré-processamento sem
+# matplotlib/seaborn, que só entram com as funções de gráfico.
+_MODULOS = {
+    "data_preprocessing": (
+        "ajustar_imputacao",
+        "aplicar_esquema",
+        "excluir_outliers",
+        "identificar_outliers",
+        "imputar_nulos",
+        "inferir_esquema",
+        "inferir_esquema_sql",
+        "contar_valores_nulos",
+        "converter_tipo_dado",
+        "deduplicar_textos",
+        "detectar_duplicatas",
+        "gerar_resumo_estatistico",
+        "normalizar_coluna",
+        "normalizar_colunas_texto",
+        "normalizar_texto",
+        "otimizar_memoria",
+        "preencher_nulos",
+        "remover_linhas_outliers",
+        "substituir_valores",
+        "remover_duplicatas",
+        "verificar_tipos_dados",
+    ),
+    "data_analysis": (
+        "plotar_distribuicoes_multiplas_colunas",
+        "boxplot_coluna",
+        "calcular_matriz_correlacao",
+        "calcular_outliers",
+        "codificar_categorias",
+        "contar_categorias",
+        "contar_frequencias",
+        "contar_valores_unicos",
+        "detectar_skewness",
+        "encontrar_colunas_constantes",
+        "plot_matriz_correlacao_Encoding",
+        "outliers_por_coluna",
+        "perfilar_tabela",
+        "visualizar_distribuicao",
+    ),
+    "visualization": (
+        "plot_histograma",
+        "plot_boxplot",
+        "plot_barras",
+        "plot_matriz_correlacao",
+        "plot_dispersao",
+        "plot_linha",
+        "plot_pairplot",
+        "plot_pie_chart",
+    ),
+    "data_streaming": (
+        "acumular_estatisticas_sql",
+        "contar_categorias_sql",
+        "contar_frequencias_sql",
+        "contar_valores_nulos_sql",
+        "detectar_duplicatas_sql",
+        "detectar_skewness_sql",
+        "gerar_resumo_estatistico_sql",
+        "outliers_por_coluna_sql",
+        "remover_duplicatas_sql",
+    ),
+    "data_loading": (
+        "carregar_staging",
+        "criar_indices",
+        "nome_tabela_staging",
+    ),
+    "data_reader": (
+        "LeitorTabelas",
+        "ler_tabela",
+        "obter_leitor",
+    ),
+    "binning": (
+        "amostrar_estratificado",
+        "calcular_densidade_2d",
+        "calcular_histograma",
+        "estimar_kde",
+    ),
+    "batch_rendering": (
+        "renderizar_lote",
+    ),
+    "eda_report": (
+        "RelatorioEDA",
+        "gerar_relatorio_eda",
+    ),
+    "pipeline": (
+        "Pipeline",
+    ),
+    "dw_build": (
+        "TabelaDW",
+        "construir_dw",
+        "ler_controle_dw",
+    ),
+    "geo": (
+        "IndiceGeografico",
+        "calcular_centroides",
+        "calcular_distancias_itens",
+        "haversine",
+    ),
+    "rollups": (
+        "RollupTemporal",
+        "obter_rollup",
+    ),
+    "aggregations": (
+        "agregar_vendas",
+        "construir_agregados",
+    ),
+    "instrumentation": (
+        "RegistroInstrumentacao",
+        "ativar_instrumentacao",
+        "desativar_instrumentacao",
+        "exportar_chrome_trace",
+        "instrumentacao_ativa",
+        "instrumentar",
+        "registro",
+        "resumo_instrumentacao",
+    ),
+}
 
-from .visualization import (
-    plot_histograma,
-    plot_boxplot,
-    plot_barras,
-    plot_matriz_correlacao,
-    plot_dispersao,
-    plot_linha,
-    plot_pairplot,
-    plot_pie_chart
-)
\ No newline at end of file
+# Nome público -> módulo que o define.
+_ORIGEM = {nome: modulo for modulo, nomes in _MODULOS.items() for nome in nomes}
+
+__all__ = sorted(_ORIGEM)
+
+# Importa o módulo de um nome público (ou o próprio submódulo) no primeiro acesso.
+def __getattr__(nome):
+    if nome in _MODULOS:
+        return importlib.import_module(f".{nome}", __name__)
+    if nome not in _ORIGEM:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(f".{_ORIGEM[nome]}", __name__), nome)
+    # Os acessos seguintes encontram o nome direto no módulo, sem passar por aqui
+    globals()[nome] = valor
+    return valor
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
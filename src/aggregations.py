@@ -0,0 +1,221 @@
+import json
+import sqlite3
+import time
+
+import pandas as pd
+
+try:
+    from .data_loading import criar_indices
+    from .dw_build import PRAGMAS_DW
+    from .sqlite_utils import citar, configurar_conexao, existe_tabela, linhas_para_insert, tipo_sqlite
+except ImportError:
+    from data_loading import criar_indices
+    from dw_build import PRAGMAS_DW
+    from sqlite_utils import citar, configurar_conexao, existe_tabela, linhas_para_insert, tipo_sqlite
+
+# Tabelas agregadas gravadas no dw_data.db: nome -> colunas de dimensão (além da data).
+AGREGADOS = {
+    "agg_vendas_diarias_estado": ["customer_state"],
+    "agg_vendas_diarias_categoria": ["product_category_name", "product_category_name_english"],
+    "agg_vendas_diarias_vendedor": ["seller_id", "seller_state"],
+}
+
+# Pedidos com estes status não entram na receita.
+STATUS_EXCLUIDOS = ("canceled", "unavailable")
+
+# Dias antes da última data processada que são recalculados a cada execução (igual à
+# janela dos pedidos em `dw_build.TABELAS_DW`).
+JANELA_DIAS = 60
+
+# Tabelas de dimensão cuja alteração exige recalcular todas as partições.
+DIMENSOES = ["dw_customers", "dw_products", "dw_sellers", "dw_product_category_name_translation"]
+
+# Tabela do dw_data.db com o estado dos agregados.
+TABELA_CONTROLE = "_controle_agregados"
+
+# Consulta as linhas de itens com as dimensões e a nota média do pedido.
+_CONSULTA_FATOS = """
+SELECT substr(o.order_purchase_timestamp, 1, 10) AS data,
+       o.order_id,
+       i.price,
+       i.freight_value,
+       c.customer_state,
+       p.product_category_name,
+       COALESCE(t.product_category_name_english, p.product_category_name) AS product_category_name_english,
+       i.seller_id,
+       s.seller_state,
+       r.nota
+FROM dw_order_items i
+JOIN dw_orders o ON o.order_id = i.order_id
+LEFT JOIN dw_customers c ON c.customer_id = o.customer_id
+LEFT JOIN dw_products p ON p.product_id = i.product_id
+LEFT JOIN dw_product_category_name_translation t ON t.product_category_name = p.product_category_name
+LEFT JOIN dw_sellers s ON s.seller_id = i.seller_id
+LEFT JOIN (
+    SELECT rv.order_id, AVG(rv.review_score) AS nota
+    FROM dw_order_reviews rv JOIN dw_orders ro ON ro.order_id = rv.order_id
+    WHERE ro.order_purchase_timestamp >= :limite
+    GROUP BY rv.order_id
+) r ON r.order_id = o.order_id
+WHERE o.order_purchase_timestamp >= :limite
+  AND o.order_status NOT IN ({status})
+"""
+
+# Impressão digital das dimensões (quantidade e soma dos hashes gravados pelo dw_build).
+def _assinatura_dimensoes(conexao):
+    assinatura = {}
+    for tabela in DIMENSOES:
+        if not existe_tabela(conexao, f"_hash_{tabela}"):
+            return None
+        assinatura[tabela] = list(conexao.execute(f'SELECT COUNT(*), TOTAL(__hash) FROM "_hash_{tabela}"').fetchone())
+    return assinatura
+
+def _controle(conexao):
+    if not existe_tabela(conexao, TABELA_CONTROLE):
+        return {}
+    return {
+        agregado: {"marca": marca, "dimensoes": json.loads(dimensoes)}
+        for agregado, marca, dimensoes in conexao.execute(f"SELECT agregado, marca, dimensoes FROM {TABELA_CONTROLE}")
+    }
+
+# Lê as linhas de itens (com dimensões) a partir de uma data.
+def _ler_fatos(conexao, limite):
+    status = ", ".join(f"'{s}'" for s in STATUS_EXCLUIDOS)
+    fatos = pd.read_sql_query(_CONSULTA_FATOS.format(status=status), conexao, params={"limite": limite})
+    # Categorias deixam o groupby mais rápido e com menos memória
+    for col in ["data", "customer_state", "product_category_name", "product_category_name_english", "seller_id", "seller_state"]:
+        fatos[col] = fatos[col].astype("category")
+    return fatos
+
+# Agrega os itens por data e dimensões.
+def agregar_vendas(fatos, dimensoes):
+    """
+    Agrega as linhas de itens por dia e pelas colunas de dimensão.
+
+    Parâmetros:
+    - fatos: DataFrame com data, order_id, price, freight_value, nota e as dimensões.
+    - dimensoes: Colunas de dimensão (ex: ['customer_state']).
+
+    Retorna:
+    - DataFrame com receita, frete, itens, pedidos, soma_notas, avaliacoes e nota_media por
+      data e dimensão. `soma_notas` e `avaliacoes` permitem recalcular a média em qualquer
+      nível no Power BI; `pedidos` conta pedidos distintos dentro de cada linha.
+    """
+    chaves = ["data", *dimensoes]
+    itens = fatos.groupby(chaves, observed=True, dropna=False, sort=False).agg(
+        receita=("price", "sum"),
+        frete=("freight_value", "sum"),
+        itens=("price", "size"),
+    )
+    # Pedidos e notas contam uma vez por pedido dentro de cada grupo
+    pedidos = fatos.drop_duplicates(chaves + ["order_id"]).groupby(chaves, observed=True, dropna=False, sort=False).agg(
+        pedidos=("order_id", "size"),
+        soma_notas=("nota", "sum"),
+        avaliacoes=("nota", "count"),
+    )
+    agregado = itens.join(pedidos).reset_index()
+    agregado["nota_media"] = agregado["soma_notas"] / agregado["avaliacoes"].where(agregado["avaliacoes"] > 0)
+    for col in chaves:
+        agregado[col] = agregado[col].astype(object)
+    return agregado.sort_values(chaves, kind="stable").reset_index(drop=True)
+
+# Substitui as partições (datas) recalculadas de um agregado.
+def _gravar_particoes(conexao, nome, agregado, limite, completo):
+    if completo or not existe_tabela(conexao, nome):
+        definicao = ", ".join(f"{citar(col)} {tipo_sqlite(dtype)}" for col, dtype in agregado.dtypes.items())
+        conexao.execute(f"DROP TABLE IF EXISTS {citar(nome)}")
+        conexao.execute(f"CREATE TABLE {citar(nome)} ({definicao})")
+    else:
+        conexao.execute(f"DELETE FROM {citar(nome)} WHERE data >= ?", (limite,))
+    if len(agregado):
+        marcadores = ", ".join("?" * len(agregado.columns))
+        colunas = ", ".join(citar(col) for col in agregado.columns)
+        conexao.executemany(f"INSERT INTO {citar(nome)} ({colunas}) VALUES ({marcadores})", linhas_para_insert(agregado))
+
+# Constrói ou atualiza as tabelas agregadas do dw_data.db.
+def construir_agregados(dw_path, agregados=None, completo=False, janela_dias=JANELA_DIAS, verbose=True):
+    """
+    Constrói as tabelas agregadas (por dia e estado, categoria e vendedor) a partir das
+    tabelas do DW (`construir_dw`), para o modelo do Power BI importar tabelas pequenas
+    em vez dos itens de pedido.
+
+    A atualização é incremental por partição de data: só as datas a partir da última
+    data processada menos `janela_dias` são relidas, reagregadas e substituídas. Se as
+    dimensões (clientes, produtos, vendedores, tradução das categorias) mudarem, todas
+    as partições são recalculadas.
+
+    Parâmetros:
+    - dw_path: Caminho do banco do DW (ex: data/processed/dw_data.db).
+    - agregados: Dicionário nome -> dimensões (se None, usa `AGREGADOS`).
+    - completo: Se True, recalcula todas as partições.
+    - janela_dias: Dias recalculados antes da última data processada.
+    - verbose: Se True, imprime o resultado de cada tabela.
+
+    Retorna:
+    - DataFrame por agregado com modo, partições recalculadas, linhas do detalhe (itens),
+      linhas do agregado, redução (%) e segundos.
+    """
+    agregados = AGREGADOS if agregados is None else agregados
+    conexao = sqlite3.connect(dw_path, isolation_level=None)
+    configurar_conexao(conexao, PRAGMAS_DW)
+    relatorio = {}
+    try:
+        criar_indices(conexao, "dw_orders", ["order_purchase_timestamp"])
+        controle = _controle(conexao)
+        dimensoes = _assinatura_dimensoes(conexao)
+        linhas_detalhe = conexao.execute("SELECT COUNT(*) FROM dw_order_items").fetchone()[0]
+        marca = conexao.execute("SELECT MAX(order_purchase_timestamp) FROM dw_orders").fetchone()[0]
+
+        # Agregados que podem ser atualizados só a partir de uma data em comum
+        incrementais = {
+            nome for nome in agregados
+            if not completo and marca is not None and nome in controle and existe_tabela(conexao, nome)
+            and dimensoes is not None and controle[nome]["dimensoes"] == dimensoes
+            and controle[nome]["marca"] and marca >= controle[nome]["marca"]
+        }
+        limite = ""
+        if incrementais:
+            marca_anterior = min(controle[nome]["marca"] for nome in incrementais)
+            limite = (pd.Timestamp(marca_anterior) - pd.Timedelta(days=janela_dias)).strftime("%Y-%m-%d")
+
+        # Os agregados reconstruídos precisam de todos os fatos; os incrementais, só das
+        # datas a partir do limite. Com os dois grupos, a leitura completa serve aos dois.
+        inicio = time.perf_counter()
+        reconstruir = len(incrementais) < len(agregados)
+        fatos = _ler_fatos(conexao, "" if reconstruir else limite)
+        fatos_incrementais = fatos
+        if incrementais and reconstruir:
+            fatos_incrementais = fatos[fatos["data"].astype(object) >= limite]
+        segundos_leitura = time.perf_counter() - inicio
+
+        conexao.execute(f"CREATE TABLE IF NOT EXISTS {TABELA_CONTROLE} (agregado TEXT PRIMARY KEY, marca TEXT, dimensoes TEXT, atualizado_em TEXT)")
+        for nome, colunas in agregados.items():
+            inicio = time.perf_counter()
+            incremental = nome in incrementais
+            agregado = agregar_vendas(fatos_incrementais if incremental else fatos, colunas)
+            conexao.execute("BEGIN")
+            _gravar_particoes(conexao, nome, agregado, limite, completo=not incremental)
+            conexao.execute(
+                f"INSERT OR REPLACE INTO {TABELA_CONTROLE} VALUES (?, ?, ?, ?)",
+                (nome, marca, json.dumps(dimensoes), pd.Timestamp.now().isoformat(timespec="seconds")),
+            )
+            conexao.execute("COMMIT")
+            criar_indices(conexao, nome, ["data", *colunas])
+
+            linhas = conexao.execute(f'SELECT COUNT(*) FROM "{nome}"').fetchone()[0]
+            relatorio[nome] = {
+                "modo": "incremental" if incremental else "completo",
+                "particoes_recalculadas": agregado["data"].nunique(),
+                "linhas_detalhe": linhas_detalhe,
+                "linhas_agregado": linhas,
+                "reducao (%)": (1 - linhas / linhas_detalhe) * 100 if linhas_detalhe else 0.0,
+                "segundos": time.perf_counter() - inicio + segundos_leitura / len(agregados),
+            }
+            if verbose:
+                r = relatorio[nome]
+                print(f"{nome}: {r['modo']}, {r['particoes_recalculadas']} partições, {linhas_detalhe:,} -> {linhas:,} linhas ({r['reducao (%)']:.1f}% menor)")
+    finally:
+        if conexao.in_transaction:
+            conexao.execute("ROLLBACK")
+        conexao.close()
+    return pd.DataFrame.from_dict(relatorio, orient="index")
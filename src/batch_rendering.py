@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import pandas as pd
+
+try:
+    from . import data_analysis, visualization
+    from .data_reader import obter_leitor
+except ImportError:
+    import data_analysis
+    import visualization
+    from data_reader import obter_leitor
+
+# Arquivo (dentro do diretório de saída) com o hash de cada gráfico já renderizado.
+ARQUIVO_MANIFESTO = ".cache_graficos.json"
+
+# Opções de `savefig` usadas em todos os arquivos (entram no hash de cada gráfico, junto com o dpi).
+OPCOES_SAVEFIG = {"bbox_inches": "tight"}
+
+# Hash dos dados de cada tabela já calculado neste processo:
+# (db_path, tabela) -> (versão da tabela no LeitorTabelas, hash).
+_HASH_TABELAS = {}
+
+# Converte uma especificação (tupla ou dicionário) para o formato de dicionário.
+def _normalizar_especificacao(especificacao):
+    if isinstance(especificacao, dict):
+        spec = dict(especificacao)
+    else:
+        funcao, tabela, coluna, *resto = especificacao
+        spec = {"funcao": funcao, "tabela": tabela, "coluna": coluna, "opcoes": resto[0] if resto else {}}
+    spec.setdefault("coluna", None)
+    spec["opcoes"] = dict(spec.get("opcoes") or {})
+    if callable(spec["funcao"]):
+        spec["funcao"] = spec["funcao"].__name__
+    if not spec.get("nome"):
+        partes = [spec["funcao"], spec["tabela"], spec["coluna"]]
+        if spec["opcoes"]:
+            partes.append(hashlib.sha1(json.dumps(spec["opcoes"], sort_keys=True, default=str).encode()).hexdigest()[:8])
+        spec["nome"] = re.sub(r"[^\w.-]+", "_", "_".join(str(p) for p in partes if p is not None))
+    return spec
+
+# Localiza a função de gráfico pelo nome em visualization ou data_analysis.
+def _resolver_funcao(nome):
+    for modulo in (visualization, data_analysis):
+        funcao = getattr(modulo, nome, None)
+        if callable(funcao):
+            return funcao
+    raise ValueError(f"Função de gráfico desconhecida: {nome}")
+
+# Hash do conteúdo de uma tabela, recalculado só quando a versão da tabela muda.
+def _hash_tabela(leitor, tabela):
+    chave = (leitor.db_path, tabela)
+    versao = leitor.versao(tabela)
+    if chave not in _HASH_TABELAS or _HASH_TABELAS[chave][0] != versao:
+        df = leitor.ler(tabela)
+        h = hashlib.sha256()
+        h.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        _HASH_TABELAS[chave] = (versao, h.hexdigest())
+    return _HASH_TABELAS[chave][1]
+
+# Renderiza uma especificação e grava os arquivos (executado nos processos do pool).
+def _renderizar(spec, db_path, diretorio_saida, formatos, hash_tabela, hash_anterior, dpi):
+    import matplotlib.pyplot as plt
+
+    inicio = time.perf_counter()
+    arquivos = [os.path.join(diretorio_saida, f"{spec['nome']}.{formato}") for formato in formatos]
+    try:
+        chave_spec = json.dumps(
+            {**{k: spec[k] for k in ("funcao", "tabela", "coluna", "opcoes")}, "savefig": {**OPCOES_SAVEFIG, "dpi": dpi}},
+            sort_keys=True, default=str,
+        )
+        hash_grafico = hashlib.sha256((hash_tabela + chave_spec).encode()).hexdigest()
+
+        if hash_grafico == hash_anterior and all(os.path.exists(a) for a in arquivos):
+            return {"nome": spec["nome"], "status": "em_cache", "hash": hash_grafico, "segundos": time.perf_counter() - inicio, "arquivos": arquivos}
+
+        df = obter_leitor(db_path).ler(spec["tabela"])
+        funcao = _resolver_funcao(spec["funcao"])
+        argumentos = [df] if spec["coluna"] is None else [df, spec["coluna"]]
+        with warnings.catch_warnings():
+            # plt.show() é inofensivo no backend Agg; só silencia o aviso
+            warnings.filterwarnings("ignore", message=".*non-interactive.*")
+            funcao(*argumentos, **spec["opcoes"])
+        figura = plt.gcf()
+        for arquivo in arquivos:
+            figura.savefig(arquivo, dpi=dpi, **OPCOES_SAVEFIG)
+        return {"nome": spec["nome"], "status": "renderizado", "hash": hash_grafico, "segundos": time.perf_counter() - inicio, "arquivos": arquivos}
+    except Exception as e:
+        return {"nome": spec["nome"], "status": "erro", "erro": f"{type(e).__name__}: {e}", "segundos": time.perf_counter() - inicio, "arquivos": []}
+    finally:
+        plt.close("all")
+
+def _inicializar_worker():
+    matplotlib.use("Agg")
+
+# Renderiza uma lista de gráficos sem interface, em paralelo e com cache.
+def renderizar_lote(especificacoes, db_path, diretorio_saida, formatos=("png",), processos=None, dpi=100):
+    """
+    Renderiza gráficos das funções de `visualization` e `data_analysis` em lote, no
+    backend Agg (sem janela), gravando PNG/SVG e fechando as figuras após cada gráfico.
+
+    Cada gráfico tem um hash do conteúdo da tabela mais a especificação e as opções de
+    gravação (dpi e `OPCOES_SAVEFIG`); gráficos cujo hash não mudou desde a última
+    execução (e cujos arquivos existem) são pulados. O hash de cada tabela é calculado
+    uma vez, neste processo, e reaproveitado enquanto a versão da tabela (mtime do banco
+    e quantidade de linhas) não mudar.
+
+    Parâmetros:
+    - especificacoes: Lista de tuplas (funcao, tabela, coluna, opcoes) ou dicionários com
+      as chaves 'funcao', 'tabela', 'coluna', 'opcoes' e 'nome' (opcional). `funcao` é o
+      nome (ex: 'plot_histograma') ou a própria função; `coluna` vai como segundo argumento.
+    - db_path: Caminho do banco SQLite com as tabelas (lidas via `data_reader`).
+    - diretorio_saida: Diretório onde os arquivos serão gravados.
+    - formatos: Formatos de saída (ex: ('png', 'svg')).
+    - processos: Número de processos (se None, os.cpu_count(); 1 executa no processo atual).
+    - dpi: Resolução dos arquivos raster.
+
+    Retorna:
+    - DataFrame com nome, status ('renderizado', 'em_cache' ou 'erro'), segundos e arquivos.
+    """
+    specs = [_normalizar_especificacao(e) for e in especificacoes]
+    os.makedirs(diretorio_saida, exist_ok=True)
+    caminho_manifesto = os.path.join(diretorio_saida, ARQUIVO_MANIFESTO)
+    manifesto = {}
+    if os.path.exists(caminho_manifesto):
+        with open(caminho_manifesto, encoding="utf-8") as f:
+            manifesto = json.load(f)
+
+    # Materializa os snapshots e calcula os hashes antes do pool para que os processos só leiam
+    leitor = obter_leitor(db_path)
+    hashes, erros = {}, {}
+    for tabela in sorted({spec["tabela"] for spec in specs}):
+        try:
+            if not leitor.snapshot_valido(tabela):
+                leitor.materializar(tabela)
+            hashes[tabela] = _hash_tabela(leitor, tabela)
+        except Exception as e:
+            erros[tabela] = f"{type(e).__name__}: {e}"
+
+    argumentos = [
+        (spec, db_path, diretorio_saida, tuple(formatos), hashes[spec["tabela"]], manifesto.get(spec["nome"]), dpi)
+        for spec in specs if spec["tabela"] in hashes
+    ]
+    if processos is None:
+        processos = os.cpu_count() or 1
+
+    if processos <= 1:
+        backend_anterior = matplotlib.get_backend()
+        matplotlib.use("Agg")
+        try:
+            resultados = [_renderizar(*a) for a in argumentos]
+        finally:
+            matplotlib.use(backend_anterior)
+    else:
+        with ProcessPoolExecutor(processos, initializer=_inicializar_worker) as executor:
+            futuros = [executor.submit(_renderizar, *a) for a in argumentos]
+            resultados = [f.result() for f in futuros]
+
+    # Gráficos de tabelas que não puderam ser lidas entram como erro, na ordem original
+    renderizados = iter(resultados)
+    resultados = [
+        {"nome": spec["nome"], "status": "erro", "erro": erros[spec["tabela"]], "segundos": 0.0, "arquivos": []}
+        if spec["tabela"] in erros else next(renderizados)
+        for spec in specs
+    ]
+
+    for resultado in resultados:
+        if resultado["status"] != "erro":
+            manifesto[resultado["nome"]] = resultado["hash"]
+    with open(caminho_manifesto, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+
+    return pd.DataFrame(resultados).drop(columns="hash", errors="ignore")
@@ -0,0 +1,571 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+# O benchmark mede as funções exportadas pelo pacote (src/__init__.py)
+if __package__:
+    pacote = importlib.import_module(__package__)
+    from .data_analysis import invalidar_perfil
+    from .synthetic_data import gerar_dados_olist, gravar_csv_olist
+else:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    pacote = importlib.import_module("src")
+    from src.data_analysis import invalidar_perfil
+    from src.synthetic_data import gerar_dados_olist, gravar_csv_olist
+
+# Escalas padrão (linhas da maior tabela sintética).
+ESCALAS_PADRAO = (10_000, 100_000)
+
+# Variação mínima (fração) para considerar regressão ao comparar duas execuções.
+TOLERANCIA_REGRESSAO = 0.25
+
+# Abaixo deste tempo (s) as diferenças são tratadas como ruído.
+MINIMO_SEGUNDOS = 0.005
+
+# Cenários de importação: nome -> nomes do pacote acessados após `import src`.
+CENARIOS_IMPORTACAO = {
+    "pacote": (),
+    "pre_processamento": ("preencher_nulos", "normalizar_texto", "imputar_nulos", "Pipeline"),
+    "carga_dw": ("carregar_staging", "construir_dw", "construir_agregados"),
+    "graficos": ("plot_histograma", "plotar_distribuicoes_multiplas_colunas"),
+}
+
+# Tempo máximo (s) de `import src` + pré-processamento nos workers de atualização.
+ORCAMENTO_IMPORTACAO = 0.5
+
+# Pacotes de gráficos que o pré-processamento não pode carregar.
+MODULOS_GRAFICOS = ("matplotlib", "seaborn")
+
+# Dependências pesadas acompanhadas na medição de importação.
+MODULOS_PESADOS = ("matplotlib", "seaborn", "scipy", "pyarrow", "unidecode")
+
+# Script executado em um processo novo para medir a importação de um cenário.
+_SCRIPT_IMPORTACAO = """
+import json, sys, time
+for modulo in {bloqueados!r}:
+    sys.modules[modulo] = None
+inicio = time.perf_counter()
+import {pacote} as pacote
+for nome in {nomes!r}:
+    getattr(pacote, nome)
+segundos = time.perf_counter() - inicio
+print(json.dumps({{"segundos": segundos, "modulos": [m for m in {pesados!r} if sys.modules.get(m) is not None]}}))
+"""
+
+class ContextoBenchmark:
+    """
+    Dados compartilhados pelos casos de uma escala: as tabelas sintéticas em memória e,
+    sob demanda, os CSVs e o banco de staging gerados a partir delas.
+
+    Os arquivos ficam num diretório temporário (com até 10M de linhas, alguns GB) que é
+    apagado, junto com as conexões abertas por `conexao`, em `fechar` ou ao sair do `with`.
+    """
+
+    def __init__(self, escala, semente=0):
+        self.escala = escala
+        self.tabelas = gerar_dados_olist(escala, semente)
+        self.diretorio = tempfile.mkdtemp(prefix=f"benchmark_{escala}_")
+        self._db_path = None
+        self._derivadas = {}
+        self._conexoes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Fecha as conexões abertas e apaga o diretório temporário."""
+        for conexao in self._conexoes:
+            conexao.close()
+        self._conexoes.clear()
+        self._derivadas.clear()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def tabela(self, nome):
+        """Tabela compartilhada, sem perfil/histogramas em cache (mede a execução a frio)."""
+        df = self.tabelas[nome]
+        invalidar_perfil(df)
+        return df
+
+    def copia(self, nome):
+        """Cópia da tabela, para as funções que alteram o DataFrame recebido."""
+        return self.tabelas[nome].copy()
+
+    def derivada(self, nome, funcao):
+        """Tabela derivada calculada uma única vez (fora da medição)."""
+        if nome not in self._derivadas:
+            self._derivadas[nome] = funcao(self)
+        return self._derivadas[nome]
+
+    @property
+    def diretorio_csv(self):
+        caminho = os.path.join(self.diretorio, "raw")
+        if not os.path.isdir(caminho):
+            gravar_csv_olist(caminho, tabelas=self.tabelas)
+        return caminho
+
+    @property
+    def db_path(self):
+        """Banco de staging com as tabelas sintéticas (carregado na primeira utilização)."""
+        if self._db_path is None:
+            self._db_path = os.path.join(self.diretorio, "stg_data.db")
+            pacote.carregar_staging(self.diretorio_csv, self._db_path, processos=1, verbose=False)
+        return self._db_path
+
+    def conexao(self, caminho=None):
+        """Conexão com o banco de staging (ou `caminho`), fechada em `fechar`."""
+        conexao = sqlite3.connect(self.db_path if caminho is None else caminho)
+        self._conexoes.append(conexao)
+        return conexao
+
+    def novo_caminho(self, nome):
+        """Caminho ainda inexistente dentro do diretório temporário."""
+        return tempfile.mkdtemp(prefix=nome + "_", dir=self.diretorio)
+
+@dataclass
+class Caso:
+    """
+    Um cenário de benchmark.
+
+    Atributos:
+    - nome: Nome do caso nos resultados (a função, ou 'funcao[variante]').
+    - funcao: Nome da função pública medida.
+    - preparar: Função (contexto, funcao) -> chamada sem argumentos; o que ela faz fica
+      fora da medição.
+    - escala_maxima: Maior escala em que o caso roda (None para todas).
+    """
+    nome: str
+    funcao: str
+    preparar: callable
+    escala_maxima: int = None
+
+def _vendas_diarias(c):
+    itens = c.tabelas["order_items"]
+    return itens.assign(data=itens["shipping_limit_date"].str[:10]).groupby("data", as_index=False)["price"].sum()
+
+def _esquema_pedidos(c):
+    return pacote.inferir_esquema(c.tabelas["orders"])
+
+def _dw_inicial(c):
+    caminho = os.path.join(c.novo_caminho("dw"), "dw.db")
+    pacote.construir_dw(c.db_path, caminho, verbose=False)
+    return caminho
+
+def _pipeline_itens(pipeline, fonte, tabela="stg_olist_order_items"):
+    return (
+        pipeline(fonte, tabela)
+        .selecionar(["order_id", "price", "freight_value"])
+        .filtrar("price", ">", 0)
+        .excluir_outliers(["price", "freight_value"], metodo="iqr", fator=1.5)
+        .preencher_nulos("mediana")
+        .normalizar_coluna("price", "z_score")
+    )
+
+def _centroides(c):
+    return pacote.calcular_centroides(c.tabelas["geolocation"])
+
+def _indice_geo(c):
+    return pacote.IndiceGeografico(c.derivada("centroides", _centroides))
+
+def _fatos_vendas(c):
+    aggregations = importlib.import_module(f"{pacote.__name__}.aggregations")
+    return aggregations._ler_fatos(c.conexao(c.derivada("dw_inicial", _dw_inicial)), "")
+
+# Rollup dos primeiros 90% dos itens; a medição incorpora os 10% restantes.
+def _rollup_incremental(c, classe):
+    itens = c.tabelas["order_items"]
+    corte = int(len(itens) * 0.9)
+    rollup = classe("shipping_limit_date", "price", "seller_id")
+    rollup.atualizar(itens.iloc[:corte])
+    rollup.tabela("mes")
+    return partial(rollup.atualizar, itens.iloc[corte:])
+
+_NUMERICAS_PRODUTOS = ["product_weight_g", "product_length_cm", "product_height_cm", "product_width_cm"]
+
+# Funções públicas que não processam dados (controle/configuração) e não são medidas.
+FUNCOES_SEM_MEDICAO = {
+    "RegistroInstrumentacao",
+    "RelatorioEDA",
+    "TabelaDW",
+    "ativar_instrumentacao",
+    "desativar_instrumentacao",
+    "exportar_chrome_trace",
+    "instrumentacao_ativa",
+    "instrumentar",
+    "resumo_instrumentacao",
+}
+
+# Casos medidos. Cada função pública do pacote deve ter ao menos um caso; as que não
+# têm aparecem nos resultados com status 'sem_caso'.
+CASOS = [
+    # data_preprocessing
+    Caso("ajustar_imputacao", "ajustar_imputacao", lambda c, f: partial(f, c.tabela("products"), "mediana", grupos="product_category_name")),
+    Caso("aplicar_esquema", "aplicar_esquema", lambda c, f: partial(f, c.copia("orders"), c.derivada("esquema_pedidos", _esquema_pedidos))),
+    Caso("contar_valores_nulos", "contar_valores_nulos", lambda c, f: partial(f, c.tabela("orders"))),
+    Caso("converter_tipo_dado", "converter_tipo_dado", lambda c, f: partial(f, c.copia("orders"), "order_purchase_timestamp", "datetime")),
+    Caso("deduplicar_textos", "deduplicar_textos", lambda c, f: partial(f, c.tabela("customers"), "customer_city", "customer_state")),
+    Caso("detectar_duplicatas", "detectar_duplicatas", lambda c, f: partial(f, c.tabela("geolocation"))),
+    Caso("excluir_outliers", "excluir_outliers", lambda c, f: partial(f, c.copia("order_items"), "price")),
+    Caso("gerar_resumo_estatistico", "gerar_resumo_estatistico", lambda c, f: partial(f, c.tabela("order_items"))),
+    Caso("identificar_outliers", "identificar_outliers", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    Caso("imputar_nulos", "imputar_nulos", lambda c, f: partial(f, c.tabela("products"), "mediana", grupos="product_category_name")),
+    Caso("inferir_esquema", "inferir_esquema", lambda c, f: partial(f, c.tabela("orders"))),
+    Caso("inferir_esquema_sql", "inferir_esquema_sql", lambda c, f: partial(f, c.conexao(), "stg_olist_orders")),
+    Caso("normalizar_coluna", "normalizar_coluna", lambda c, f: partial(f, c.copia("order_items"), "price")),
+    Caso("normalizar_colunas_texto", "normalizar_colunas_texto", lambda c, f: partial(f, c.copia("customers"), ["customer_city"])),
+    Caso("normalizar_texto", "normalizar_texto", lambda c, f: partial(list, map(f, c.tabelas["customers"]["customer_city"]))),
+    Caso("otimizar_memoria", "otimizar_memoria", lambda c, f: partial(f, c.copia("geolocation"))),
+    Caso("preencher_nulos", "preencher_nulos", lambda c, f: partial(f, c.tabela("products"), "mediana")),
+    Caso("remover_duplicatas", "remover_duplicatas", lambda c, f: partial(f, c.tabela("customers"), ["customer_unique_id"])),
+    Caso("remover_linhas_outliers", "remover_linhas_outliers", lambda c, f: partial(f, c.tabela("order_items"), ["price", "freight_value"])),
+    Caso("substituir_valores", "substituir_valores", lambda c, f: partial(f, c.copia("customers"), "customer_city", ["sao paulo", "são paulo"], "Sao Paulo")),
+    Caso("verificar_tipos_dados", "verificar_tipos_dados", lambda c, f: partial(f, c.tabela("orders"))),
+    # data_analysis
+    Caso("boxplot_coluna", "boxplot_coluna", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    Caso("calcular_matriz_correlacao", "calcular_matriz_correlacao", lambda c, f: partial(f, c.tabela("products")[_NUMERICAS_PRODUTOS])),
+    Caso("calcular_outliers", "calcular_outliers", lambda c, f: partial(f, c.tabela("order_items"))),
+    Caso("codificar_categorias", "codificar_categorias", lambda c, f: partial(f, c.tabela("customers"))),
+    Caso("contar_categorias", "contar_categorias", lambda c, f: partial(f, c.tabela("orders"), "order_status")),
+    Caso("contar_frequencias", "contar_frequencias", lambda c, f: partial(f, c.tabela("geolocation"), "geolocation_zip_code_prefix")),
+    Caso("contar_valores_unicos", "contar_valores_unicos", lambda c, f: partial(f, c.tabela("orders"))),
+    Caso("detectar_skewness", "detectar_skewness", lambda c, f: partial(f, c.tabela("products"))),
+    Caso("encontrar_colunas_constantes", "encontrar_colunas_constantes", lambda c, f: partial(f, c.tabela("products"))),
+    Caso("outliers_por_coluna", "outliers_por_coluna", lambda c, f: partial(f, c.tabela("order_items"))),
+    Caso("perfilar_tabela", "perfilar_tabela", lambda c, f: partial(f, c.tabela("order_items"))),
+    Caso("plot_matriz_correlacao_Encoding", "plot_matriz_correlacao_Encoding", lambda c, f: partial(f, c.tabela("products")[_NUMERICAS_PRODUTOS + ["product_category_name"]])),
+    Caso("plotar_distribuicoes_multiplas_colunas", "plotar_distribuicoes_multiplas_colunas", lambda c, f: partial(f, c.tabela("orders"), ["order_status"])),
+    Caso("visualizar_distribuicao", "visualizar_distribuicao", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    # visualization
+    Caso("plot_barras", "plot_barras", lambda c, f: partial(f, c.tabela("customers"), "customer_state")),
+    Caso("plot_boxplot", "plot_boxplot", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    Caso("plot_dispersao", "plot_dispersao", lambda c, f: partial(f, c.tabela("geolocation"), "geolocation_lng", "geolocation_lat")),
+    Caso("plot_dispersao[densidade]", "plot_dispersao", lambda c, f: partial(f, c.tabela("geolocation"), "geolocation_lng", "geolocation_lat", hue="geolocation_state", modo="densidade")),
+    Caso("plot_dispersao[pontos]", "plot_dispersao", lambda c, f: partial(f, c.tabela("geolocation"), "geolocation_lng", "geolocation_lat", modo="pontos"), escala_maxima=100_000),
+    Caso("plot_histograma", "plot_histograma", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    Caso("plot_linha", "plot_linha", lambda c, f: partial(f, c.derivada("vendas_diarias", _vendas_diarias), "data", "price")),
+    # Itens brutos agregados por mês; sem invalidar o cache, mede só o desenho da série pronta
+    Caso("plot_linha[pedidos]", "plot_linha", lambda c, f: partial(f, c.tabela("order_items"), "shipping_limit_date", "price", granularidade="mes", agregacao="soma")),
+    Caso("plot_linha[cache]", "plot_linha", lambda c, f: partial(f, c.tabelas["order_items"], "shipping_limit_date", "price", granularidade="mes", agregacao="soma")),
+    Caso("plot_matriz_correlacao", "plot_matriz_correlacao", lambda c, f: partial(f, c.tabela("products")[_NUMERICAS_PRODUTOS])),
+    Caso("plot_pairplot", "plot_pairplot", lambda c, f: partial(f, c.tabela("geolocation"), ["geolocation_lat", "geolocation_lng"])),
+    Caso("plot_pairplot[densidade]", "plot_pairplot", lambda c, f: partial(f, c.tabela("geolocation"), ["geolocation_lat", "geolocation_lng"], modo="densidade")),
+    Caso("plot_pairplot[pontos]", "plot_pairplot", lambda c, f: partial(f, c.tabela("geolocation"), ["geolocation_lat", "geolocation_lng"], modo="pontos"), escala_maxima=10_000),
+    Caso("plot_pie_chart", "plot_pie_chart", lambda c, f: partial(f, c.tabela("orders"), "order_status")),
+    # data_streaming
+    Caso("acumular_estatisticas_sql", "acumular_estatisticas_sql", lambda c, f: partial(f, c.db_path, "stg_olist_order_items")),
+    Caso("contar_valores_nulos_sql", "contar_valores_nulos_sql", lambda c, f: partial(f, c.db_path, "stg_olist_products")),
+    # Com uma conexão aberta o cache não é usado (mede a contagem); com o caminho, mede o acerto no cache
+    Caso("contar_frequencias_sql", "contar_frequencias_sql", lambda c, f: partial(f, c.conexao(), "stg_olist_geolocation", "geolocation_zip_code_prefix")),
+    Caso("contar_frequencias_sql[space_saving]", "contar_frequencias_sql", lambda c, f: partial(f, c.conexao(), "stg_olist_geolocation", "geolocation_zip_code_prefix", k=1000)),
+    Caso("contar_categorias_sql", "contar_categorias_sql", lambda c, f: partial(f, c.db_path, "stg_olist_geolocation", "geolocation_zip_code_prefix", 10)),
+    Caso("detectar_duplicatas_sql", "detectar_duplicatas_sql", lambda c, f: partial(f, c.db_path, "stg_olist_geolocation")),
+    Caso("detectar_duplicatas_sql[cep]", "detectar_duplicatas_sql", lambda c, f: partial(f, c.db_path, "stg_olist_geolocation", "geolocation_zip_code_prefix")),
+    Caso("detectar_skewness_sql", "detectar_skewness_sql", lambda c, f: partial(f, c.db_path, "stg_olist_order_items")),
+    Caso("gerar_resumo_estatistico_sql", "gerar_resumo_estatistico_sql", lambda c, f: partial(f, c.db_path, "stg_olist_order_items")),
+    Caso("outliers_por_coluna_sql", "outliers_por_coluna_sql", lambda c, f: partial(f, c.db_path, "stg_olist_order_items")),
+    Caso("remover_duplicatas_sql", "remover_duplicatas_sql", lambda c, f: partial(f, c.db_path, "stg_olist_geolocation", destino="bench_sem_duplicatas")),
+    # data_loading
+    Caso("carregar_staging", "carregar_staging", lambda c, f: partial(f, c.diretorio_csv, os.path.join(c.novo_caminho("staging"), "stg.db"), verbose=False)),
+    Caso("criar_indices", "criar_indices", lambda c, f: partial(f, c.conexao(), "stg_olist_orders")),
+    Caso("nome_tabela_staging", "nome_tabela_staging", lambda c, f: partial(f, "olist_order_items_dataset.csv")),
+    # data_reader
+    Caso("LeitorTabelas", "LeitorTabelas", lambda c, f: lambda: f(c.db_path, c.novo_caminho("snapshots")).ler("stg_olist_geolocation")),
+    Caso("ler_tabela", "ler_tabela", lambda c, f: partial(f, c.db_path, "stg_olist_geolocation")),
+    Caso("obter_leitor", "obter_leitor", lambda c, f: partial(f, c.db_path)),
+    # binning
+    Caso("amostrar_estratificado", "amostrar_estratificado", lambda c, f: partial(f, c.tabela("geolocation"), 10_000, "geolocation_state")),
+    Caso("calcular_densidade_2d", "calcular_densidade_2d", lambda c, f: partial(f, c.tabela("geolocation"), "geolocation_lng", "geolocation_lat")),
+    Caso("calcular_histograma", "calcular_histograma", lambda c, f: partial(f, c.tabela("order_items"), "price")),
+    Caso("estimar_kde", "estimar_kde", lambda c, f: partial(f, c.tabelas["geolocation"]["geolocation_lat"].to_numpy())),
+    # pipeline
+    Caso("Pipeline", "Pipeline", lambda c, f: _pipeline_itens(f, c.db_path).executar),
+    Caso("Pipeline[blocos]", "Pipeline", lambda c, f: partial(_pipeline_itens(f, c.db_path).executar, em_blocos=True)),
+    Caso("Pipeline[dataframe]", "Pipeline", lambda c, f: _pipeline_itens(f, c.tabela("order_items"), None).executar),
+    # dw_build
+    Caso("construir_dw", "construir_dw", lambda c, f: partial(f, c.db_path, os.path.join(c.novo_caminho("dw"), "dw.db"), verbose=False)),
+    Caso("construir_dw[incremental]", "construir_dw", lambda c, f: partial(f, c.db_path, c.derivada("dw_inicial", _dw_inicial), verbose=False)),
+    Caso("ler_controle_dw", "ler_controle_dw", lambda c, f: partial(f, c.derivada("dw_inicial", _dw_inicial))),
+    # geo
+    Caso("calcular_centroides", "calcular_centroides", lambda c, f: partial(f, c.tabela("geolocation"))),
+    Caso("IndiceGeografico", "IndiceGeografico", lambda c, f: partial(f, c.derivada("centroides", _centroides))),
+    Caso("calcular_distancias_itens", "calcular_distancias_itens", lambda c, f: partial(
+        f, c.tabela("order_items"), c.tabela("orders"), c.tabela("customers"), c.tabela("sellers"), c.derivada("indice_geo", _indice_geo)
+    )),
+    Caso("haversine", "haversine", lambda c, f: partial(f, *(c.tabelas["geolocation"][col].to_numpy() for col in ("geolocation_lat", "geolocation_lng")), -23.55, -46.63)),
+    # rollups
+    Caso("obter_rollup", "obter_rollup", lambda c, f: partial(f, c.tabela("order_items"), "shipping_limit_date", "price", "seller_id")),
+    Caso("RollupTemporal", "RollupTemporal", _rollup_incremental),
+    # aggregations
+    Caso("construir_agregados", "construir_agregados", lambda c, f: partial(f, c.derivada("dw_inicial", _dw_inicial), completo=True, verbose=False)),
+    Caso("construir_agregados[incremental]", "construir_agregados", lambda c, f: partial(f, c.derivada("dw_inicial", _dw_inicial), verbose=False)),
+    Caso("agregar_vendas", "agregar_vendas", lambda c, f: partial(f, c.derivada("fatos_vendas", _fatos_vendas), ["customer_state"])),
+    # batch_rendering
+    Caso("renderizar_lote", "renderizar_lote", lambda c, f: partial(f, [("plot_histograma", "stg_olist_order_items", "price")], c.db_path, c.novo_caminho("graficos"), processos=1)),
+    # eda_report
+    Caso("gerar_relatorio_eda", "gerar_relatorio_eda", lambda c, f: partial(f, c.db_path, processos=1, verbose=False)),
+    Caso("gerar_relatorio_eda[pool]", "gerar_relatorio_eda", lambda c, f: partial(f, c.db_path, diretorio_saida=c.novo_caminho("eda"), processos=2, verbose=False)),
+    Caso("gerar_relatorio_eda[blocos]", "gerar_relatorio_eda", lambda c, f: partial(f, c.db_path, processos=1, max_linhas_memoria=0, verbose=False)),
+]
+
+# Lista as funções (e classes) públicas exportadas pelo pacote.
+def funcoes_publicas():
+    """
+    Retorna os nomes públicos chamáveis de `src/__init__.py` (submódulos e
+    `FUNCOES_SEM_MEDICAO` ficam de fora).
+    """
+    return sorted(
+        nome for nome in dir(pacote)
+        if not nome.startswith("_") and callable(getattr(pacote, nome)) and nome not in FUNCOES_SEM_MEDICAO
+    )
+
+# Renderiza as figuras abertas (no Agg o desenho só acontece no draw/savefig).
+def _desenhar_figuras(plt):
+    for numero in plt.get_fignums():
+        plt.figure(numero).canvas.draw()
+
+# Executa um caso `repeticoes` vezes e mede o pico de memória em uma execução extra.
+def _medir(caso, contexto, repeticoes):
+    import matplotlib.pyplot as plt
+
+    funcao = getattr(pacote, caso.funcao)
+    tempos = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for _ in range(repeticoes):
+            chamada = caso.preparar(contexto, funcao)
+            inicio = time.perf_counter()
+            chamada()
+            _desenhar_figuras(plt)
+            tempos.append(time.perf_counter() - inicio)
+            plt.close("all")
+
+        # O tracemalloc deixa a execução mais lenta, por isso a memória é medida à parte
+        chamada = caso.preparar(contexto, funcao)
+        tracemalloc.start()
+        try:
+            chamada()
+            _desenhar_figuras(plt)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            plt.close("all")
+    return {"segundos": min(tempos), "segundos_media": float(np.mean(tempos)), "pico_memoria_mb": pico / 2**20}
+
+# Mede o tempo e o pico de memória das funções públicas em várias escalas.
+def executar_benchmarks(escalas=ESCALAS_PADRAO, funcoes=None, repeticoes=3, semente=0, saida=None, verbose=True):
+    """
+    Gera os dados sintéticos de cada escala (`synthetic_data`) e mede cada caso de
+    `CASOS`: o menor tempo entre `repeticoes` execuções e o pico de memória alocada
+    (tracemalloc, inclui os arrays do NumPy) em uma execução separada. Os gráficos são
+    desenhados no backend Agg (o tempo inclui a renderização) e fechados após cada execução. Falhas de um caso ficam
+    registradas com status 'erro' sem interromper os demais.
+
+    Parâmetros:
+    - escalas: Escalas a medir (linhas da maior tabela; ex: (10_000, 1_000_000, 10_000_000)).
+    - funcoes: Nomes das funções ou casos a medir (se None, todos).
+    - repeticoes: Execuções cronometradas por caso.
+    - semente: Semente do gerador de dados.
+    - saida: Caminho do JSON de resultados (se None, não grava).
+    - verbose: Se True, imprime cada resultado.
+
+    Retorna:
+    - Dicionário com 'metadados' e 'resultados' (o mesmo conteúdo gravado no JSON).
+    """
+    backend_anterior = matplotlib.get_backend()
+    matplotlib.use("Agg")
+    casos = [caso for caso in CASOS if funcoes is None or caso.funcao in funcoes or caso.nome in funcoes]
+    resultados = []
+    try:
+        for escala in escalas:
+            with ContextoBenchmark(escala, semente) as contexto:
+                for caso in casos:
+                    resultado = {"caso": caso.nome, "funcao": caso.funcao, "escala": escala}
+                    if caso.escala_maxima is not None and escala > caso.escala_maxima:
+                        resultado["status"] = "ignorado"
+                    else:
+                        try:
+                            resultado.update(_medir(caso, contexto, repeticoes), status="ok")
+                        except Exception as e:
+                            resultado.update(status="erro", erro=f"{type(e).__name__}: {e}")
+                    resultados.append(resultado)
+                    if verbose:
+                        detalhe = f"{resultado['segundos']:.4f}s, {resultado['pico_memoria_mb']:.1f} MB" if resultado["status"] == "ok" else resultado.get("erro", resultado["status"])
+                        print(f"[{escala:>10,}] {caso.nome}: {detalhe}")
+    finally:
+        matplotlib.use(backend_anterior)
+
+    medidas = {caso.funcao for caso in CASOS}
+    for nome in funcoes_publicas():
+        if nome not in medidas and (funcoes is None or nome in funcoes):
+            resultados.append({"caso": nome, "funcao": nome, "escala": None, "status": "sem_caso"})
+
+    execucao = {
+        "metadados": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "escalas": list(escalas),
+            "repeticoes": repeticoes,
+            "semente": semente,
+        },
+        "resultados": resultados,
+    }
+    if saida is not None:
+        with open(saida, "w", encoding="utf-8") as f:
+            json.dump(execucao, f, indent=2)
+    return execucao
+
+# Carrega uma execução a partir do caminho do JSON (ou devolve o próprio dicionário).
+def _carregar_execucao(execucao):
+    if isinstance(execucao, dict):
+        return execucao
+    with open(execucao, encoding="utf-8") as f:
+        return json.load(f)
+
+# Compara duas execuções do benchmark e aponta regressões de tempo ou memória.
+def comparar_execucoes(base, atual, tolerancia=TOLERANCIA_REGRESSAO, minimo_segundos=MINIMO_SEGUNDOS):
+    """
+    Compara os casos presentes nas duas execuções (mesmo caso e escala).
+
+    Parâmetros:
+    - base: Execução de referência (dicionário ou caminho do JSON).
+    - atual: Execução nova (dicionário ou caminho do JSON).
+    - tolerancia: Aumento relativo aceito antes de marcar regressão (0.25 = 25%).
+    - minimo_segundos: Tempos abaixo deste valor não são marcados como regressão.
+
+    Retorna:
+    - DataFrame com tempo e memória de cada execução, as razões atual/base e as colunas
+      'regressao_tempo' e 'regressao_memoria'.
+    """
+    colunas = ["caso", "escala", "segundos", "pico_memoria_mb"]
+    tabelas = []
+    for execucao in (base, atual):
+        resultados = [r for r in _carregar_execucao(execucao)["resultados"] if r.get("status") == "ok"]
+        tabelas.append(pd.DataFrame(resultados, columns=colunas))
+    comparacao = tabelas[0].merge(tabelas[1], on=["caso", "escala"], suffixes=("_base", "_atual"))
+
+    comparacao["razao_tempo"] = comparacao["segundos_atual"] / comparacao["segundos_base"]
+    comparacao["razao_memoria"] = comparacao["pico_memoria_mb_atual"] / comparacao["pico_memoria_mb_base"].replace(0, np.nan)
+    comparacao["regressao_tempo"] = (comparacao["razao_tempo"] > 1 + tolerancia) & (comparacao["segundos_atual"] >= minimo_segundos)
+    comparacao["regressao_memoria"] = comparacao["razao_memoria"] > 1 + tolerancia
+    return comparacao.sort_values(["escala", "caso"]).reset_index(drop=True)
+
+# Mede, em um processo novo, a importação do pacote e o acesso aos nomes de um cenário.
+def _importar_em_processo_novo(nomes, bloqueados=()):
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(pacote.__file__)))
+    script = _SCRIPT_IMPORTACAO.format(pacote=pacote.__name__, nomes=tuple(nomes), bloqueados=tuple(bloqueados), pesados=MODULOS_PESADOS)
+    processo = subprocess.run([sys.executable, "-c", script], cwd=raiz, capture_output=True, text=True)
+    if processo.returncode != 0:
+        ultima_linha = processo.stderr.strip().splitlines()[-1] if processo.stderr.strip() else f"código {processo.returncode}"
+        raise RuntimeError(ultima_linha)
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+# Mede o tempo de importação do pacote em cada cenário.
+def medir_importacao(cenarios=None, repeticoes=5, verbose=True):
+    """
+    Mede o tempo de `import src` mais o acesso aos nomes de cada cenário de
+    `CENARIOS_IMPORTACAO`, cada repetição em um processo Python novo (sem cache de
+    módulos), e quais dependências pesadas foram carregadas.
+
+    Parâmetros:
+    - cenarios: Dicionário nome -> nomes acessados (se None, `CENARIOS_IMPORTACAO`).
+    - repeticoes: Processos por cenário (vale o menor tempo).
+    - verbose: Se True, imprime cada cenário.
+
+    Retorna:
+    - DataFrame indexado pelo cenário com segundos, segundos_media e modulos carregados.
+    """
+    cenarios = CENARIOS_IMPORTACAO if cenarios is None else cenarios
+    resultados = {}
+    for cenario, nomes in cenarios.items():
+        medidas = [_importar_em_processo_novo(nomes) for _ in range(repeticoes)]
+        tempos = [m["segundos"] for m in medidas]
+        resultados[cenario] = {"segundos": min(tempos), "segundos_media": float(np.mean(tempos)), "modulos": ", ".join(medidas[-1]["modulos"])}
+        if verbose:
+            print(f"[importação] {cenario}: {min(tempos):.3f}s ({resultados[cenario]['modulos'] or 'sem dependências pesadas'})")
+    return pd.DataFrame.from_dict(resultados, orient="index")
+
+# Confere se o pré-processamento importa dentro do orçamento e sem a pilha de gráficos.
+def verificar_orcamento_importacao(orcamento=ORCAMENTO_IMPORTACAO, cenario="pre_processamento", repeticoes=5):
+    """
+    Importa o pacote e acessa os nomes do cenário com matplotlib e seaborn bloqueados
+    (como em um ambiente sem eles instalados) e compara o menor tempo com o orçamento.
+    Falha se o tempo passar do orçamento ou se algum módulo do cenário importar a pilha
+    de gráficos.
+
+    Parâmetros:
+    - orcamento: Tempo máximo em segundos.
+    - cenario: Cenário de `CENARIOS_IMPORTACAO`.
+    - repeticoes: Processos medidos (vale o menor tempo).
+
+    Retorna:
+    - Dicionário com cenario, segundos, orcamento, ok e erro (None se passou).
+    """
+    resultado = {"cenario": cenario, "segundos": None, "orcamento": orcamento, "ok": False, "erro": None}
+    try:
+        tempos = [_importar_em_processo_novo(CENARIOS_IMPORTACAO[cenario], MODULOS_GRAFICOS)["segundos"] for _ in range(repeticoes)]
+    except RuntimeError as e:
+        resultado["erro"] = f"importação falhou sem {'/'.join(MODULOS_GRAFICOS)}: {e}"
+        return resultado
+    resultado["segundos"] = min(tempos)
+    resultado["ok"] = resultado["segundos"] <= orcamento
+    if not resultado["ok"]:
+        resultado["erro"] = f"{resultado['segundos']:.3f}s acima do orçamento de {orcamento:.3f}s"
+    return resultado
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark das funções do src com dados sintéticos do Olist.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS_PADRAO), help="Linhas da maior tabela (ex: 10000 1000000).")
+    parser.add_argument("--funcoes", nargs="+", help="Funções ou casos a medir (padrão: todos).")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON de resultados.")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para apontar regressões.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESSAO)
+    parser.add_argument("--importacao", action="store_true", help="Mede só o tempo de importação e confere o orçamento.")
+    parser.add_argument("--orcamento-importacao", type=float, default=ORCAMENTO_IMPORTACAO, help="Orçamento (s) da importação do pré-processamento.")
+    args = parser.parse_args(argumentos)
+
+    if args.importacao:
+        medir_importacao(repeticoes=args.repeticoes)
+        verificacao = verificar_orcamento_importacao(args.orcamento_importacao, repeticoes=args.repeticoes)
+        if not verificacao["ok"]:
+            print(f"\nOrçamento de importação excedido: {verificacao['erro']}")
+            return 1
+        print(f"\nOrçamento de importação ok: {verificacao['segundos']:.3f}s <= {args.orcamento_importacao:.3f}s")
+        return 0
+
+    execucao = executar_benchmarks(args.escalas, args.funcoes, args.repeticoes, args.semente, args.saida)
+    if args.comparar:
+        comparacao = comparar_execucoes(args.comparar, execucao, args.tolerancia)
+        regressoes = comparacao[comparacao["regressao_tempo"] | comparacao["regressao_memoria"]]
+        print(comparacao.to_string(index=False))
+        if len(regressoes):
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}:")
+            print(regressoes[["caso", "escala", "razao_tempo", "razao_memoria"]].to_string(index=False))
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import weakref
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .cache_utils import assinatura_valores
+except ImportError:
+    from cache_utils import assinatura_valores
+
+# Cache dos histogramas: id(df) -> {(coluna, bins, kde): (assinatura, histograma)}.
+_CACHE_HISTOGRAMAS = {}
+
+@dataclass
+class Histograma:
+    """
+    Contagens de um histograma já agregadas, prontas para desenhar.
+
+    Atributos:
+    - contagens: Array com a contagem de cada bin.
+    - bordas: Array com as bordas dos bins (len(contagens) + 1).
+    - n: Quantidade de valores válidos usados.
+    - kde_x: Grade da estimativa de densidade (None se não calculada).
+    - kde_y: Densidade estimada em cada ponto da grade (None se não calculada).
+    """
+    contagens: np.ndarray
+    bordas: np.ndarray
+    n: int
+    kde_x: np.ndarray = None
+    kde_y: np.ndarray = None
+
+    @property
+    def centros(self):
+        """Centro de cada bin."""
+        return (self.bordas[:-1] + self.bordas[1:]) / 2
+
+    def kde_em_contagens(self):
+        """Densidade escalada para a mesma unidade das contagens (como no seaborn)."""
+        largura = np.diff(self.bordas).mean() if len(self.bordas) > 1 else 1.0
+        return self.kde_y * self.n * largura
+
+# Estima a densidade por binning linear e convolução via FFT.
+def estimar_kde(valores, tamanho_grade=512, bw_ajuste=1.0, corte=3):
+    """
+    Estima a densidade (kernel gaussiano) de um array sem avaliar o kernel em cada ponto.
+
+    Os valores são distribuídos linearmente em `tamanho_grade` pontos e a grade é
+    convoluída com o kernel via FFT, custando O(n + g log g) em vez de O(n * g). A largura
+    de banda segue a regra de Scott, como o `gaussian_kde` usado pelo seaborn, e a grade
+    se estende `corte` larguras de banda além dos extremos.
+
+    Parâmetros:
+    - valores: Array numérico (NaN são ignorados).
+    - tamanho_grade: Número de pontos da grade.
+    - bw_ajuste: Multiplicador da largura de banda.
+    - corte: Quantas larguras de banda a grade se estende além de min/max.
+
+    Retorna:
+    - Tupla (grade, densidade).
+    """
+    valores = np.asarray(valores, dtype="float64")
+    valores = valores[np.isfinite(valores)]
+    n = len(valores)
+    if n < 2:
+        return np.array([]), np.array([])
+
+    bw = valores.std(ddof=1) * n ** (-1 / 5) * bw_ajuste
+    if bw == 0:
+        return np.array([]), np.array([])
+
+    inicio, fim = valores.min() - corte * bw, valores.max() + corte * bw
+    grade = np.linspace(inicio, fim, tamanho_grade)
+    delta = grade[1] - grade[0]
+
+    # Binning linear: cada valor divide seu peso entre os dois pontos vizinhos da grade
+    posicao = (valores - inicio) / delta
+    indice = np.minimum(np.floor(posicao).astype("int64"), tamanho_grade - 2)
+    fracao = posicao - indice
+    pesos = np.bincount(indice, weights=1 - fracao, minlength=tamanho_grade)
+    pesos += np.bincount(indice + 1, weights=fracao, minlength=tamanho_grade)
+
+    alcance = min(tamanho_grade - 1, int(np.ceil(4 * bw / delta)))
+    deslocamentos = np.arange(-alcance, alcance + 1) * delta
+    kernel = np.exp(-0.5 * (deslocamentos / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+
+    tamanho_fft = 1 << int(np.ceil(np.log2(tamanho_grade + len(kernel) - 1)))
+    convolucao = np.fft.irfft(np.fft.rfft(pesos, tamanho_fft) * np.fft.rfft(kernel, tamanho_fft), tamanho_fft)
+    densidade = np.maximum(convolucao[alcance:alcance + tamanho_grade], 0) / n
+    return grade, densidade
+
+# Calcula (ou reaproveita do cache) as contagens do histograma e a KDE de uma coluna.
+def calcular_histograma(df, col_name, bins=30, kde=True, atualizar=False):
+    """
+    Calcula o histograma de uma coluna numérica com NumPy e, opcionalmente, a KDE
+    aproximada (`estimar_kde`). O resultado fica em cache por (coluna, bins) enquanto o
+    DataFrame existir e a assinatura dos valores da coluna não mudar
+    (`cache_utils.assinatura_valores`).
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - col_name: Nome da coluna numérica.
+    - bins: Número de bins (ou array de bordas).
+    - kde: Se True, calcula também a estimativa de densidade.
+    - atualizar: Se True, ignora o cache e recalcula.
+
+    Retorna:
+    - Histograma com contagens, bordas e KDE.
+    """
+    chave_bins = tuple(bins) if np.ndim(bins) else bins
+    chave = (col_name, chave_bins, kde)
+    serie = df[col_name]
+    assinatura = assinatura_valores(serie)
+
+    cache_df = _CACHE_HISTOGRAMAS.get(id(df))
+    if not atualizar and cache_df is not None and chave in cache_df and cache_df[chave][0] == assinatura:
+        return cache_df[chave][1]
+
+    valores = pd.to_numeric(serie, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    valores = valores[np.isfinite(valores)]
+    contagens, bordas = np.histogram(valores, bins=bins)
+
+    histograma = Histograma(contagens=contagens, bordas=bordas, n=len(valores))
+    if kde:
+        # Como no histplot do seaborn, a curva fica restrita ao intervalo dos dados
+        histograma.kde_x, histograma.kde_y = estimar_kde(valores, corte=0)
+
+    if cache_df is None:
+        cache_df = _CACHE_HISTOGRAMAS[id(df)] = {}
+        weakref.finalize(df, _CACHE_HISTOGRAMAS.pop, id(df), None)
+    cache_df[chave] = (assinatura, histograma)
+    return histograma
+
+# Descarta os histogramas em cache de um DataFrame.
+def invalidar_histogramas(df):
+    """
+    Remove do cache os histogramas de um DataFrame.
+    """
+    _CACHE_HISTOGRAMAS.pop(id(df), None)
+
+@dataclass
+class Densidade2D:
+    """
+    Contagens de pontos em uma grade 2D, usadas para desenhar dispersões como imagem.
+
+    Atributos:
+    - contagens: Array (n_categorias, bins_x, bins_y); sem `hue` há uma única categoria.
+    - limites_x: Tupla (min, max) do eixo X.
+    - limites_y: Tupla (min, max) do eixo Y.
+    - categorias: Lista das categorias de `hue` (None se não houver).
+    - n: Quantidade de pontos válidos agregados.
+    """
+    contagens: np.ndarray
+    limites_x: tuple
+    limites_y: tuple
+    categorias: list = None
+    n: int = 0
+
+    @property
+    def total(self):
+        """Contagem total de cada célula (todas as categorias)."""
+        return self.contagens.sum(axis=0)
+
+# Agrega pares (x, y) em uma grade 2D, opcionalmente separando por categoria.
+def calcular_densidade_2d(df, x_col, y_col, hue=None, bins=300):
+    """
+    Conta quantos pontos caem em cada célula de uma grade `bins` x `bins` com um único
+    `np.bincount`, em vez de desenhar cada ponto. Com `hue`, as contagens são separadas
+    por categoria na mesma passada.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - x_col: Coluna do eixo X.
+    - y_col: Coluna do eixo Y.
+    - hue: Coluna categórica para separar as contagens (opcional).
+    - bins: Número de células por eixo (inteiro ou tupla (bins_x, bins_y)).
+
+    Retorna:
+    - Densidade2D.
+    """
+    bins_x, bins_y = (bins, bins) if np.ndim(bins) == 0 else bins
+    x = pd.to_numeric(df[x_col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    y = pd.to_numeric(df[y_col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    validos = np.isfinite(x) & np.isfinite(y)
+
+    categorias = None
+    codigos = np.zeros(len(x), dtype="int64")
+    if hue is not None:
+        codigos, categorias = pd.factorize(df[hue], sort=True)
+        categorias = list(categorias)
+        validos &= codigos >= 0
+    x, y, codigos = x[validos], y[validos], codigos[validos]
+    n_categorias = len(categorias) if categorias is not None else 1
+
+    if len(x) == 0:
+        return Densidade2D(np.zeros((n_categorias, bins_x, bins_y), dtype="int64"), (0, 1), (0, 1), categorias, 0)
+
+    limites_x = (x.min(), x.max())
+    limites_y = (y.min(), y.max())
+    largura_x = (limites_x[1] - limites_x[0]) or 1.0
+    largura_y = (limites_y[1] - limites_y[0]) or 1.0
+    ix = np.minimum(((x - limites_x[0]) / largura_x * bins_x).astype("int64"), bins_x - 1)
+    iy = np.minimum(((y - limites_y[0]) / largura_y * bins_y).astype("int64"), bins_y - 1)
+
+    plano = (codigos * bins_x + ix) * bins_y + iy
+    contagens = np.bincount(plano, minlength=n_categorias * bins_x * bins_y)
+    return Densidade2D(
+        contagens=contagens.reshape(n_categorias, bins_x, bins_y),
+        limites_x=limites_x,
+        limites_y=limites_y,
+        categorias=categorias,
+        n=len(x),
+    )
+
+# Sorteia uma amostra mantendo a proporção de cada categoria.
+def amostrar_estratificado(df, n, coluna=None, semente=0):
+    """
+    Retorna uma amostra de aproximadamente `n` linhas. Com `coluna`, cada categoria é
+    amostrada na mesma fração, preservando as proporções.
+    """
+    if n >= len(df):
+        return df
+    if coluna is None:
+        return df.sample(n=n, random_state=semente)
+    fracao = n / len(df)
+    return df.groupby(coluna, group_keys=False, observed=True).sample(frac=fracao, random_state=semente)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# Soma ponderada pela posição dos bits de um array (muda se qualquer valor mudar de lugar).
+def _checksum(bits):
+    bits = bits.astype(np.uint64, copy=False)
+    pesos = np.arange(1, len(bits) + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    return int(np.add.reduce(bits * pesos, dtype=np.uint64)) if len(bits) else 0
+
+# Resume os valores de uma coluna para a assinatura.
+def _assinatura_coluna(serie):
+    dtype = serie.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        categorias = pd.util.hash_pandas_object(dtype.categories.to_series(), index=False).to_numpy()
+        return (_checksum(serie.cat.codes.to_numpy()), _checksum(categorias))
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM" and dtype.itemsize in (1, 2, 4, 8):
+        valores = np.ascontiguousarray(serie.to_numpy())
+        return _checksum(valores.view(f"u{dtype.itemsize}"))
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        # Tipos anuláveis (Int64, Float64, boolean)
+        return _checksum(serie.to_numpy(dtype="float64", na_value=np.nan).view("u8"))
+    # Texto e demais tipos: hash vetorizado de todas as linhas
+    try:
+        hashes = pd.util.hash_pandas_object(serie, index=False)
+    except TypeError:
+        # Objetos não hasheáveis (listas, dicionários): usa a representação em texto
+        hashes = pd.util.hash_pandas_object(serie.astype(str).where(serie.notna()), index=False)
+    return _checksum(hashes.to_numpy())
+
+# Gera a assinatura de um DataFrame (ou Series) usada para validar os caches do `src`.
+def assinatura_valores(dados):
+    """
+    Assinatura barata que muda quando os dados mudam, inclusive em alterações no lugar
+    (`df.loc[...] = ...`) feitas fora do `src`.
+
+    Cobre o formato, os nomes e tipos das colunas e todos os valores de cada coluna:
+    numéricas, de datas e categóricas pela soma ponderada dos bits; texto e demais tipos
+    pelo hash vetorizado (`hash_pandas_object`) de todas as linhas.
+
+    Parâmetros:
+    - dados: DataFrame ou Series do pandas.
+
+    Retorna:
+    - Tupla comparável com `==`.
+    """
+    if isinstance(dados, pd.Series):
+        cabecalho = (dados.shape, dados.name, str(dados.dtype))
+        dados = dados.to_frame()
+    else:
+        cabecalho = (dados.shape, tuple(dados.columns), tuple(map(str, dados.dtypes)))
+
+    colunas = tuple(_assinatura_coluna(dados.iloc[:, i]) for i in range(dados.shape[1]))
+    return cabecalho + (colunas,)
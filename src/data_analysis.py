@@ -1,8 +1,243 @@
+import warnings
+import weakref
+from dataclasses import dataclass
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import matplotlib.patches as mpatches
+
+try:
+    from .binning import calcular_histograma, invalidar_histogramas
+    from .cache_utils import assinatura_valores
+    from .data_streaming import TabelaFrequencias
+    from .instrumentation import instrumentar_modulo
+    from .rollups import invalidar_rollups
+except ImportError:
+    from binning import calcular_histograma, invalidar_histogramas
+    from cache_utils import assinatura_valores
+    from data_streaming import TabelaFrequencias
+    from instrumentation import instrumentar_modulo
+    from rollups import invalidar_rollups
+
+# Cache dos perfis já calculados: id(df) -> (assinatura, perfil).
+_CACHE_PERFIS = {}
+
+# Cache das matrizes de correlação: id(df) -> {(metodo, codificar): (assinatura, matriz)}.
+_CACHE_CORRELACOES = {}
+
+# Cache das tabelas de frequência: id(df) -> {coluna: (assinatura, TabelaFrequencias)}.
+_CACHE_FREQUENCIAS = {}
+
+@dataclass
+class PerfilTabela:
+    """
+    Perfil de uma tabela calculado em uma única passada por `perfilar_tabela`.
+
+    Atributos:
+    - n_linhas: Número de linhas da tabela.
+    - colunas: DataFrame indexado pelo nome da coluna, com 'tipo', 'nulos', 'percentual_nulos',
+      'count', 'mean', 'median', 'std', 'min', 'max', 'skew', 'cardinalidade' e 'constante'.
+      As estatísticas numéricas ficam NaN para colunas não numéricas.
+    """
+    n_linhas: int
+    colunas: pd.DataFrame
+
+    @property
+    def numericas(self):
+        """Lista com os nomes das colunas numéricas."""
+        return list(self.colunas.index[self.colunas["numerica"]])
+
+# Calcula count, média, mediana, desvio, min/max, skew e cardinalidade de uma matriz numérica.
+def _estatisticas_numericas(matriz):
+    """
+    Calcula as estatísticas de todas as colunas de uma matriz float64 de uma só vez.
+
+    A matriz é ordenada uma única vez por coluna (os NaN vão para o final), o que entrega
+    mínimo, máximo, mediana e cardinalidade sem novas varreduras. Média, desvio padrão
+    (ddof=1) e skew seguem as mesmas fórmulas do pandas.
+    """
+    n, k = matriz.shape
+    if n == 0:
+        vazio = np.full(k, np.nan)
+        return {
+            "count": np.zeros(k, dtype="int64"), "mean": vazio, "median": vazio, "std": vazio,
+            "min": vazio, "max": vazio, "skew": vazio, "cardinalidade": np.zeros(k, dtype="int64"),
+        }
+
+    validos = ~np.isnan(matriz)
+    count = validos.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(validos, matriz, 0.0).sum(axis=0) / count
+        desvio = np.where(validos, matriz - media, 0.0)
+        m2 = (desvio ** 2).sum(axis=0)
+        m3 = (desvio ** 3).sum(axis=0)
+        std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+
+        # Mesmo tratamento do pandas para erro de ponto flutuante em m2/m3
+        m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+        m3 = np.where(np.abs(m3) < 1e-14, 0.0, m3)
+        skew = (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5)
+        skew = np.where(m2 == 0, 0.0, skew)
+        skew = np.where(count < 3, np.nan, skew)
+
+    ordenada = np.sort(matriz, axis=0)
+    colunas = np.arange(k)
+    tem_valor = count > 0
+    minimo = np.where(tem_valor, ordenada[0, colunas], np.nan)
+    maximo = np.where(tem_valor, ordenada[np.maximum(count - 1, 0), colunas], np.nan)
+    meio_inf = ordenada[np.maximum((count - 1) // 2, 0), colunas]
+    meio_sup = ordenada[np.minimum(count // 2, n - 1), colunas]
+    mediana = np.where(tem_valor, (meio_inf + meio_sup) / 2, np.nan)
+
+    mudou = np.diff(ordenada, axis=0) != 0
+    dentro = np.arange(n - 1)[:, None] < (count - 1)[None, :]
+    cardinalidade = np.where(tem_valor, 1 + (mudou & dentro).sum(axis=0), 0)
+
+    return {
+        "count": count, "mean": media, "median": mediana, "std": std,
+        "min": minimo, "max": maximo, "skew": skew, "cardinalidade": cardinalidade,
+    }
+
+# Gera (ou reaproveita do cache) o perfil completo de uma tabela em uma única passada.
+def perfilar_tabela(df, atualizar=False):
+    """
+    Calcula nulos, count, média, mediana, desvio padrão, min/max, skew, cardinalidade e
+    a flag de coluna constante de todas as colunas em uma única passada vetorizada.
+
+    O perfil fica em cache enquanto o DataFrame existir e sua assinatura de valores
+    (`cache_utils.assinatura_valores`) não mudar, então alterações no lugar feitas fora do
+    `src` também refazem o perfil.
+
+    Parâmetros:
+    - df: DataFrame (ou Series) do pandas.
+    - atualizar: Se True, ignora o cache e recalcula o perfil.
+
+    Retorna:
+    - PerfilTabela com as estatísticas por coluna.
+    """
+    chave = id(df)
+    assinatura = assinatura_valores(df)
+    if not atualizar and chave in _CACHE_PERFIS:
+        assinatura_cache, perfil = _CACHE_PERFIS[chave]
+        if assinatura_cache == assinatura:
+            return perfil
+
+    original = df
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+
+    n_linhas = len(df)
+    numericas = df.select_dtypes(include=[np.number]).columns
+    perfil_df = pd.DataFrame(index=df.columns)
+    perfil_df["tipo"] = df.dtypes
+    perfil_df["numerica"] = perfil_df.index.isin(numericas)
+    for campo in ["count", "mean", "median", "std", "min", "max", "skew"]:
+        perfil_df[campo] = np.nan
+    perfil_df["cardinalidade"] = 0
+
+    if len(numericas):
+        matriz = df[numericas].to_numpy(dtype="float64", na_value=np.nan)
+        for campo, valores in _estatisticas_numericas(matriz).items():
+            perfil_df.loc[numericas, campo] = valores
+
+    outras = df.columns.difference(numericas, sort=False)
+    if len(outras):
+        nulos_outras = df[outras].isna().sum()
+        perfil_df.loc[outras, "count"] = n_linhas - nulos_outras
+        perfil_df.loc[outras, "cardinalidade"] = df[outras].nunique()
+
+    perfil_df["count"] = perfil_df["count"].astype("int64")
+    perfil_df["cardinalidade"] = perfil_df["cardinalidade"].astype("int64")
+    perfil_df["nulos"] = n_linhas - perfil_df["count"]
+    perfil_df["percentual_nulos"] = perfil_df["nulos"] / n_linhas * 100 if n_linhas else np.nan
+    perfil_df["constante"] = perfil_df["cardinalidade"] == 1
+
+    perfil = PerfilTabela(n_linhas=n_linhas, colunas=perfil_df)
+    if chave not in _CACHE_PERFIS:
+        weakref.finalize(original, _CACHE_PERFIS.pop, chave, None)
+    _CACHE_PERFIS[chave] = (assinatura, perfil)
+    return perfil
+
+# Descarta o perfil em cache de um DataFrame (usado após alterações no lugar).
+def invalidar_perfil(df):
+    """
+    Remove do cache o perfil (e os histogramas, correlações, frequências e séries
+    temporais) de um DataFrame, forçando o recálculo na próxima consulta.
+    """
+    _CACHE_PERFIS.pop(id(df), None)
+    _CACHE_CORRELACOES.pop(id(df), None)
+    _CACHE_FREQUENCIAS.pop(id(df), None)
+    invalidar_histogramas(df)
+    invalidar_rollups(df)
+
+@dataclass
+class ResultadoOutliers:
+    """
+    Resultado de `calcular_outliers` para várias colunas de uma vez.
+
+    Atributos:
+    - mascara: DataFrame booleano (mesmo índice do df) com True onde o valor é outlier.
+    - limites: DataFrame indexado pela coluna com 'limite_inferior' e 'limite_superior'.
+    """
+    mascara: pd.DataFrame
+    limites: pd.DataFrame
+
+    @property
+    def linhas_com_outlier(self):
+        """Series booleana com True nas linhas que têm outlier em qualquer coluna."""
+        return self.mascara.any(axis=1)
+
+    def contagem(self):
+        """Quantidade de outliers por coluna."""
+        return self.mascara.sum()
+
+# Calcula limites e máscara de outliers de todas as colunas numéricas em lote.
+def calcular_outliers(df, colunas=None, metodo="iqr", fator=1.5):
+    """
+    Calcula os limites de outliers de todas as colunas de uma só vez (um único
+    `quantile([0.25, 0.75])` ou um único cálculo de média/desvio) e a máscara booleana
+    correspondente, comparando a matriz inteira contra os limites.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - colunas: Coluna ou lista de colunas (se None, usa todas as numéricas).
+    - metodo: 'desvio_padrao' ou 'iqr'.
+    - fator: Multiplicador do desvio padrão ou IQR.
+
+    Retorna:
+    - ResultadoOutliers com a máscara e a tabela de limites.
+    """
+    if colunas is None:
+        colunas = df.select_dtypes(include=[np.number]).columns
+    elif not pd.api.types.is_list_like(colunas):
+        colunas = [colunas]
+    colunas = pd.Index(colunas)
+
+    valores = df[colunas].to_numpy(dtype="float64", na_value=np.nan)
+
+    with np.errstate(invalid="ignore"):
+        if metodo == "desvio_padrao":
+            media = np.nanmean(valores, axis=0)
+            intervalo = fator * np.nanstd(valores, axis=0, ddof=1)
+            limite_inferior = media - intervalo
+            limite_superior = media + intervalo
+        elif metodo == "iqr":
+            quartis = df[colunas].quantile([0.25, 0.75]).to_numpy(dtype="float64")
+            iqr = quartis[1] - quartis[0]
+            limite_inferior = quartis[0] - fator * iqr
+            limite_superior = quartis[1] + fator * iqr
+        else:
+            raise ValueError("Método inválido. Escolha entre 'desvio_padrao' ou 'iqr'.")
+
+        mascara = (valores < limite_inferior) | (valores > limite_superior)
+
+    limites = pd.DataFrame(
+        {"limite_inferior": limite_inferior, "limite_superior": limite_superior}, index=colunas
+    )
+    return ResultadoOutliers(
+        mascara=pd.DataFrame(mascara, index=df.index, columns=colunas),
+        limites=limites,
+    )
 
 # Plota um histograma + densidade para visualizar a distribuição de uma variável.
 def visualizar_distribuicao(df, col_name, bins=30):
@@ -17,8 +252,15 @@ def visualizar_distribuicao(df, col_name, bins=30):
     Retorna:
     - Um gráfico da distribuição da variável.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    histograma = calcular_histograma(df, col_name, bins=bins)
     plt.figure(figsize=(10, 5))
-    sns.histplot(df[col_name], bins=bins, kde=True)
+    # Bordas reais (bins podem ser irregulares); como lista porque o seaborn compara `bins == "auto"`
+    sns.histplot(x=histograma.centros, weights=histograma.contagens, bins=list(histograma.bordas))
+    if len(histograma.kde_x):
+        plt.plot(histograma.kde_x, histograma.kde_em_contagens())
     plt.title(f'Distribuição de {col_name}')
     plt.xlabel(col_name)
     plt.ylabel('Frequência')
@@ -26,14 +268,176 @@ def visualizar_distribuicao(df, col_name, bins=30):
     plt.show()
 
 # Conta quantos valores únicos existem em cada coluna.
-def contar_valores_unicos(df):
+def contar_valores_unicos(df, atualizar=False):
     """
     Conta o número de valores únicos para cada coluna.
 
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
+
     Retorna:
     - DataFrame com o número de valores únicos por coluna.
     """
-    return df.nunique().to_frame(name="Valores Únicos")
+    return perfilar_tabela(df, atualizar).colunas["cardinalidade"].rename("Valores Únicos").to_frame()
+
+@dataclass
+class CodificacaoCategorias:
+    """
+    Códigos numéricos das colunas categóricas, calculados uma única vez.
+
+    Atributos:
+    - codigos: Dicionário coluna -> array float64 com os códigos (-1 para nulos, como `cat.codes`).
+    - mapas: Dicionário coluna -> {código: categoria original}.
+    """
+    codigos: dict
+    mapas: dict
+
+# Codifica as colunas object/category sem copiar o DataFrame.
+def codificar_categorias(df):
+    """
+    Gera os códigos e o mapeamento reverso de cada coluna object/category com um único
+    `pd.factorize` (categorias ordenadas, igual a `astype("category").cat.codes`), sem
+    copiar o DataFrame.
+
+    Retorna:
+    - CodificacaoCategorias.
+    """
+    codigos, mapas = {}, {}
+    for col in df.select_dtypes(include=["object", "category"]).columns:
+        codigos_col, categorias = pd.factorize(df[col], sort=True)
+        codigos[col] = codigos_col.astype("float64")
+        mapas[col] = dict(enumerate(categorias))
+    return CodificacaoCategorias(codigos=codigos, mapas=mapas)
+
+# Correlação de Pearson (pares completos) acumulada em blocos de linhas.
+def _pearson_em_blocos(arrays, tamanho_bloco, dtype):
+    """
+    Calcula a correlação de Pearson entre os arrays usando produtos matriciais de blocos
+    de linhas em `dtype` (float32 por padrão), acumulados em float64. Os nulos são
+    tratados par a par, como no pandas: N = MᵀM, S = XᵀM, Q = (X²)ᵀM e P = XᵀX, com M a
+    máscara de valores válidos e X os valores centrados (zero onde há nulo).
+    """
+    k = len(arrays)
+    n = len(arrays[0]) if k else 0
+    N, S, Q, P = (np.zeros((k, k)) for _ in range(4))
+    deslocamento = None
+
+    for inicio in range(0, n, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n)
+        bloco = np.empty((fim - inicio, k), dtype=dtype)
+        for j, valores in enumerate(arrays):
+            bloco[:, j] = valores[inicio:fim]
+        validos = ~np.isnan(bloco)
+        if deslocamento is None:
+            # Centraliza pela média do primeiro bloco para reduzir o cancelamento numérico
+            with np.errstate(invalid="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                deslocamento = np.nan_to_num(np.nanmean(bloco, axis=0)).astype(dtype)
+        x = np.where(validos, bloco - deslocamento, 0).astype(dtype)
+        m = validos.astype(dtype)
+        N += m.T @ m
+        S += x.T @ m
+        Q += (x * x).T @ m
+        P += x.T @ x
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = (N * P - S * S.T) / np.sqrt((N * Q - S ** 2) * (N * Q.T - S.T ** 2))
+    return np.clip(corr, -1, 1)
+
+# Correlação de Kendall (tau-b) par a par com o algoritmo O(n log n) do scipy.
+def _kendall(arrays):
+    from scipy.stats import kendalltau
+
+    k = len(arrays)
+    corr = np.eye(k)
+    for i in range(k):
+        for j in range(i + 1, k):
+            validos = ~(np.isnan(arrays[i]) | np.isnan(arrays[j]))
+            corr[i, j] = corr[j, i] = kendalltau(arrays[i][validos], arrays[j][validos])[0]
+    return corr
+
+# Correlação de Spearman com os nulos tratados par a par, como no pandas.
+def _spearman(arrays, tamanho_bloco, dtype):
+    """
+    Ranqueia cada coluna uma única vez e segue para o Pearson em blocos. Isso só é exato
+    para os pares em que as duas colunas têm nulos nas mesmas linhas; nos demais pares
+    os ranks mudam ao descartar as linhas com nulo na outra coluna, então o par é
+    ranqueado de novo só nas linhas completas.
+    """
+    ranks = [pd.Series(valores).rank().to_numpy() for valores in arrays]
+    corr = _pearson_em_blocos(ranks, tamanho_bloco, dtype)
+    nulos = [np.isnan(valores) for valores in arrays]
+    com_nulos = [i for i, mascara in enumerate(nulos) if mascara.any()]
+    for i in range(len(arrays)):
+        for j in range(i + 1, len(arrays)):
+            if (i in com_nulos or j in com_nulos) and not np.array_equal(nulos[i], nulos[j]):
+                validos = ~(nulos[i] | nulos[j])
+                par = [pd.Series(arrays[i][validos]).rank().to_numpy(), pd.Series(arrays[j][validos]).rank().to_numpy()]
+                corr[i, j] = corr[j, i] = _pearson_em_blocos(par, tamanho_bloco, "float64")[0, 1]
+    return corr
+
+# Calcula (ou reaproveita do cache) a matriz de correlação de um DataFrame.
+def calcular_matriz_correlacao(df, metodo="pearson", codificar=True, tamanho_bloco=65_536, dtype="float32", atualizar=False):
+    """
+    Calcula a matriz de correlação das colunas numéricas (e das categóricas codificadas,
+    se `codificar=True`) sem copiar o DataFrame.
+
+    - 'pearson': um único produto matricial dos dados centrados, em blocos de linhas
+      float32 (erro relativo da ordem de 1e-5, irrelevante para o heatmap).
+    - 'spearman': cada coluna é ranqueada uma única vez e segue para o Pearson; os pares
+      com nulos em linhas diferentes são ranqueados de novo nas linhas completas, então
+      o resultado é o mesmo de `df.corr("spearman")`.
+    - 'kendall': tau-b com o algoritmo O(n log n) de Knight (`scipy.stats.kendalltau`).
+
+    A matriz fica em cache por DataFrame e método enquanto a assinatura dos valores não
+    mudar (`cache_utils.assinatura_valores`); cada chamada recebe uma cópia.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - metodo: 'pearson', 'spearman' ou 'kendall'.
+    - codificar: Se True, inclui as colunas object/category pelos seus códigos.
+    - tamanho_bloco: Número de linhas por bloco do produto matricial.
+    - dtype: Tipo dos blocos ('float32' ou 'float64').
+    - atualizar: Se True, ignora o cache e recalcula.
+
+    Retorna:
+    - Matriz de correlação (DataFrame).
+    """
+    if metodo not in ("pearson", "spearman", "kendall"):
+        raise ValueError("Método inválido. Escolha entre 'pearson', 'spearman' ou 'kendall'.")
+
+    chave = (metodo, codificar, dtype)
+    assinatura = assinatura_valores(df)
+    cache_df = _CACHE_CORRELACOES.get(id(df))
+    if not atualizar and cache_df is not None and chave in cache_df and cache_df[chave][0] == assinatura:
+        return cache_df[chave][1].copy()
+
+    codificacao = codificar_categorias(df) if codificar else CodificacaoCategorias({}, {})
+    numericas = set(df.select_dtypes(include=[np.number]).columns)
+    colunas, arrays = [], []
+    for col in df.columns:
+        if col in codificacao.codigos:
+            arrays.append(codificacao.codigos[col])
+        elif col in numericas:
+            arrays.append(df[col].to_numpy(dtype="float64", na_value=np.nan))
+        else:
+            continue
+        colunas.append(col)
+
+    if metodo == "kendall":
+        valores_corr = _kendall(arrays)
+    elif metodo == "spearman":
+        valores_corr = _spearman(arrays, tamanho_bloco, dtype)
+    else:
+        valores_corr = _pearson_em_blocos(arrays, tamanho_bloco, dtype)
+
+    matriz = pd.DataFrame(valores_corr, index=colunas, columns=colunas)
+    if cache_df is None:
+        cache_df = _CACHE_CORRELACOES[id(df)] = {}
+        weakref.finalize(df, _CACHE_CORRELACOES.pop, id(df), None)
+    cache_df[chave] = (assinatura, matriz)
+    return matriz.copy()
 
 # Retorna e plota a matriz de correlação das variáveis numéricas.
 def plot_matriz_correlacao_Encoding(df, graphWidth=8, method="pearson"):
@@ -49,58 +453,58 @@ def plot_matriz_correlacao_Encoding(df, graphWidth=8, method="pearson"):
     Retorna:
     - Matriz de correlação (DataFrame).
     """
-    df_encoded = df.copy()
-
-    # Dicionário para armazenar mapeamento reverso dos encodings
-    encoding_maps = {}
-
-    # Converte colunas categóricas para numéricas
-    for col in df.select_dtypes(include=["object", "category"]).columns:
-        df_encoded[col] = df_encoded[col].astype("category").cat.codes
-        encoding_maps[col] = dict(enumerate(df[col].astype("category").cat.categories))
-
-    # Filtra apenas colunas numéricas para a matriz de correlação
-    df_numerico = df_encoded.select_dtypes(include=["number"])
+    # Códigos e correlação vêm do motor em cache, sem copiar o DataFrame
+    corr = calcular_matriz_correlacao(df, metodo=method, codificar=True)
 
     # Verifica se há pelo menos duas colunas numéricas
-    if df_numerico.shape[1] < 2:
-        print(f'No correlation plots shown: The number of numeric columns ({df_numerico.shape[1]}) is less than 2.')
+    if corr.shape[1] < 2:
+        print(f'No correlation plots shown: The number of numeric columns ({corr.shape[1]}) is less than 2.')
         return None
 
-    # Calcula a matriz de correlação
-    corr = df_numerico.corr(method=method)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # Configura o gráfico
     plt.figure(figsize=(graphWidth, graphWidth))
-    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", xticklabels=df_numerico.columns, yticklabels=df_numerico.columns)
+    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", xticklabels=corr.columns, yticklabels=corr.columns)
     plt.title(f'Matriz de Correlação ({method})')
     plt.show()
 
     return corr
 
 # Retorna colunas que possuem apenas um valor único.
-def encontrar_colunas_constantes(df):
+def encontrar_colunas_constantes(df, atualizar=False):
     """
     Identifica colunas constantes (que possuem apenas um valor único).
 
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
+
     Retorna:
     - Lista com os nomes das colunas constantes.
     """
-    return [col for col in df.columns if df[col].nunique() == 1]
+    perfil = perfilar_tabela(df, atualizar).colunas
+    return list(perfil.index[perfil["constante"]])
 
 # Calcula o coeficiente de skewness para ver se os dados estão enviesados.
-def detectar_skewness(df):
+def detectar_skewness(df, atualizar=False):
     """
     Calcula o coeficiente de skewness (assimetria) das colunas numéricas.
 
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
+
     Retorna:
     - DataFrame com os valores de skewness.
     """
-    skew_values = df.select_dtypes(include=[np.number]).skew()
+    perfil = perfilar_tabela(df, atualizar).colunas
+    skew_values = perfil.loc[perfil["numerica"], "skew"].astype("float64")
     return pd.DataFrame({"Skewness": skew_values}).sort_values(by="Skewness", ascending=False)
 
 # Conta a quantidade de outliers por coluna numérica.
-def outliers_por_coluna(df, metodo="iqr", fator=1.5):
+def outliers_por_coluna(df, metodo="iqr", fator=1.5, resultado=None):
     """
     Conta a quantidade de outliers em cada coluna numérica.
 
@@ -108,25 +512,14 @@ def outliers_por_coluna(df, metodo="iqr", fator=1.5):
     - df: DataFrame do pandas.
     - metodo: 'desvio_padrao' ou 'iqr'.
     - fator: Multiplicador para a detecção de outliers.
+    - resultado: ResultadoOutliers já calculado por `calcular_outliers` (opcional).
 
     Retorna:
     - DataFrame com a contagem de outliers por coluna.
     """
-    outliers = {}
-    for col in df.select_dtypes(include=[np.number]).columns:
-        if metodo == "desvio_padrao":
-            limite = fator * df[col].std()
-            media = df[col].mean()
-            count = df[(df[col] < media - limite) | (df[col] > media + limite)].shape[0]
-        elif metodo == "iqr":
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            limite_inferior = Q1 - fator * IQR
-            limite_superior = Q3 + fator * IQR
-            count = df[(df[col] < limite_inferior) | (df[col] > limite_superior)].shape[0]
-        outliers[col] = count
-    return pd.DataFrame.from_dict(outliers, orient="index", columns=["Outliers"])
+    if resultado is None:
+        resultado = calcular_outliers(df, metodo=metodo, fator=fator)
+    return resultado.contagem().to_frame(name="Outliers")
 
 # Gera um boxplot para visualizar possíveis outliers.
 def boxplot_coluna(df, col_name):
@@ -140,14 +533,55 @@ def boxplot_coluna(df, col_name):
     Retorna:
     - Um gráfico boxplot.
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     plt.figure(figsize=(8, 4))
     sns.boxplot(x=df[col_name])
     plt.title(f'Boxplot de {col_name}')
     plt.grid()
     plt.show()
 
+# Tabela de frequências em cache de uma coluna (compartilhada; não deve ser alterada).
+def _frequencias_em_cache(df, col_name, atualizar=False):
+    chave = tuple(col_name) if isinstance(col_name, list) else col_name
+    dados = df[col_name]
+    assinatura = assinatura_valores(dados)
+
+    cache_df = _CACHE_FREQUENCIAS.get(id(df))
+    if not atualizar and cache_df is not None and chave in cache_df and cache_df[chave][0] == assinatura:
+        return cache_df[chave][1]
+
+    contagens = dados.value_counts()
+    frequencias = TabelaFrequencias(contagens=contagens, total=int(contagens.sum()), distintos=len(contagens))
+    if cache_df is None:
+        cache_df = _CACHE_FREQUENCIAS[id(df)] = {}
+        weakref.finalize(df, _CACHE_FREQUENCIAS.pop, id(df), None)
+    cache_df[chave] = (assinatura, frequencias)
+    return frequencias
+
+# Conta (ou reaproveita do cache) as frequências de uma coluna.
+def contar_frequencias(df, col_name, atualizar=False):
+    """
+    Conta os valores de uma coluna com um único `value_counts` e guarda a tabela de
+    frequências em cache enquanto o DataFrame existir e a assinatura dos valores da
+    coluna não mudar (`cache_utils.assinatura_valores`). `contar_categorias`,
+    `plot_barras`, `plot_pie_chart` e `plotar_distribuicoes_multiplas_colunas` usam o
+    mesmo cache, então cada coluna é contada uma vez e cada top-N seguinte é só uma
+    fatia da tabela.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - col_name: Nome da coluna (ou lista de colunas, contando as combinações).
+    - atualizar: Se True, ignora o cache e conta novamente.
+
+    Retorna:
+    - TabelaFrequencias (cópia da tabela em cache).
+    """
+    return _frequencias_em_cache(df, col_name, atualizar).copia()
+
 # Conta os valores mais frequentes de uma variável categórica.
-def contar_categorias(df, col_name, top_n=10):
+def contar_categorias(df, col_name, top_n=10, atualizar=False):
     """
     Conta os valores únicos de uma coluna categórica e retorna os 'top_n' mais frequentes.
 
@@ -155,11 +589,12 @@ def contar_categorias(df, col_name, top_n=10):
     - df: DataFrame do pandas.
     - col_name: Nome da coluna categórica.
     - top_n: Número de categorias mais frequentes a serem exibidas.
+    - atualizar: Se True, ignora o cache e conta novamente.
 
     Retorna:
     - DataFrame com as categorias mais frequentes.
     """
-    return df[col_name].value_counts().head(top_n).to_frame(name="Frequência")
+    return _frequencias_em_cache(df, col_name, atualizar).top(top_n).to_frame(name="Frequência")
 
 # Esta função gera gráficos de distribuição para múltiplas colunas categóricas ou numéricas de um DF.
 def plotar_distribuicoes_multiplas_colunas(df, colunas_x, quantidade_categorias=10, numero_colunas_subplots=2, ordenar_por='contagem', exibir_rotulos=False):
@@ -177,6 +612,9 @@ def plotar_distribuicoes_multiplas_colunas(df, colunas_x, quantidade_categorias=
         ordenar_por (str): Critério de ordenação ('contagem' ou 'indice').
         exibir_rotulos (bool): Se True, exibe rótulos com os valores sobre as barras.
     """
+    import matplotlib.patches as mpatches
+    import matplotlib.pyplot as plt
+
     numero_linhas_subplots = (len(colunas_x) + numero_colunas_subplots - 1) // numero_colunas_subplots
     plt.figure(figsize=(12, 6 * numero_linhas_subplots))
 
@@ -198,18 +636,9 @@ def plotar_distribuicoes_multiplas_colunas(df, colunas_x, quantidade_categorias=
             plt.xticks(rotation=45)
 
         else:
-            contagem_valores = dados_coluna.value_counts()
-            agregou_outros = False  
-            num_categorias_agregadas = 0  
-
             # Se houver mais categorias do que o limite, agrupa as menores em "Outros"
-            if len(contagem_valores) > quantidade_categorias:
-                top_n = contagem_valores.nlargest(quantidade_categorias)
-                contagem_outros = contagem_valores[quantidade_categorias:].sum()
-                num_categorias_agregadas = len(contagem_valores) - quantidade_categorias  
-                top_n.loc['Outros'] = contagem_outros
-                contagem_valores = top_n
-                agregou_outros = True
+            contagem_valores, num_categorias_agregadas = _frequencias_em_cache(df, coluna_x).com_outros(quantidade_categorias)
+            agregou_outros = num_categorias_agregadas > 0
 
             # Ordena conforme o critério escolhido
             if ordenar_por == 'contagem':
@@ -245,3 +674,6 @@ def plotar_distribuicoes_multiplas_colunas(df, colunas_x, quantidade_categorias=
 
     plt.tight_layout()
     plt.show()
+
+# Mede as funções públicas do módulo quando a instrumentação estiver ativa.
+instrumentar_modulo(globals())
@@ -0,0 +1,230 @@
+import multiprocessing
+import os
+import queue
+import sqlite3
+import time
+
+import pandas as pd
+
+try:
+    from .data_preprocessing import gravar_esquema_sql, inferir_esquema_sql
+    from .sqlite_utils import citar, colunas_tabela, configurar_conexao, linhas_para_insert, tipo_sqlite
+except ImportError:
+    from data_preprocessing import gravar_esquema_sql, inferir_esquema_sql
+    from sqlite_utils import citar, colunas_tabela, configurar_conexao, linhas_para_insert, tipo_sqlite
+
+# Colunas chave indexadas depois da carga (quando existem na tabela).
+COLUNAS_INDICE = [
+    "order_id",
+    "customer_id",
+    "customer_unique_id",
+    "product_id",
+    "seller_id",
+    "review_id",
+    "customer_zip_code_prefix",
+    "seller_zip_code_prefix",
+    "geolocation_zip_code_prefix",
+    "product_category_name",
+    # Marcas d'água da construção incremental do DW (`dw_build.TABELAS_DW`)
+    "order_purchase_timestamp",
+    "review_creation_date",
+]
+
+# Pragmas aplicados à conexão de escrita durante a carga.
+PRAGMAS_CARGA = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -262144,  # 256 MB de page cache
+    "temp_store": "MEMORY",
+}
+
+# Número de linhas gravadas entre commits.
+LINHAS_POR_TRANSACAO = 500_000
+
+# Ordem de alargamento dos tipos declarados quando blocos do mesmo CSV discordam.
+ORDEM_TIPOS = {"INTEGER": 0, "REAL": 1, "TEXT": 2}
+
+# Gera o nome da tabela de staging a partir do nome do arquivo CSV.
+def nome_tabela_staging(nome_arquivo, prefixo="stg_"):
+    """
+    Converte 'olist_orders_dataset.csv' em 'stg_olist_orders' (remove '.csv' e '_dataset'
+    e adiciona o prefixo, caso o arquivo ainda não o tenha).
+    """
+    nome = os.path.basename(nome_arquivo).replace(".csv", "").replace("_dataset", "")
+    return nome if nome.startswith(prefixo) else prefixo + nome
+
+# Lê um CSV em blocos e produz as mensagens consumidas pelo escritor.
+def _mensagens_csv(caminho, tabela, tamanho_chunk):
+    try:
+        leitor = pd.read_csv(caminho, chunksize=tamanho_chunk)
+        total = 0
+        anteriores = None
+        for i, chunk in enumerate(leitor):
+            tipos = {col: tipo_sqlite(dtype) for col, dtype in chunk.dtypes.items()}
+            if i == 0:
+                yield ("inicio", tabela, tipos)
+            elif tipos != anteriores:
+                # O escritor alarga as colunas que mudaram (ex: INTEGER -> TEXT)
+                yield ("tipos", tabela, tipos)
+            anteriores = tipos
+            total += len(chunk)
+            yield ("dados", tabela, linhas_para_insert(chunk))
+        if total == 0:
+            yield ("erro", tabela, f"O arquivo {caminho} está vazio e não será carregado.")
+        else:
+            yield ("fim", tabela, total)
+    except Exception as e:
+        yield ("erro", tabela, f"Erro ao carregar {caminho} para a tabela {tabela}: {e}")
+
+_fila_worker = None
+
+def _inicializar_worker(fila):
+    global _fila_worker
+    _fila_worker = fila
+
+def _worker_csv(tarefa):
+    for mensagem in _mensagens_csv(*tarefa):
+        _fila_worker.put(mensagem)
+
+# Combina os tipos declarados com os de um novo bloco, alargando quando discordam.
+def _ampliar_tipos(atuais, novos):
+    return {col: max(tipo, novos.get(col, tipo), key=ORDEM_TIPOS.__getitem__) for col, tipo in atuais.items()}
+
+# Recria a tabela com novos tipos declarados, copiando as linhas já gravadas.
+def _recriar_tabela(conexao, tabela, tipos):
+    temporaria = f"{tabela}__tipos"
+    definicao = ", ".join(f"{citar(col)} {tipo_sql}" for col, tipo_sql in tipos.items())
+    conexao.execute(f"DROP TABLE IF EXISTS {citar(temporaria)}")
+    conexao.execute(f"CREATE TABLE {citar(temporaria)} ({definicao})")
+    # A afinidade das novas colunas converte os valores copiados (ex: 3 -> '3' em TEXT)
+    conexao.execute(f"INSERT INTO {citar(temporaria)} SELECT * FROM {citar(tabela)}")
+    conexao.execute(f"DROP TABLE {citar(tabela)}")
+    conexao.execute(f"ALTER TABLE {citar(temporaria)} RENAME TO {citar(tabela)}")
+
+# Cria índices nas colunas chave presentes na tabela.
+def criar_indices(conexao, tabela, colunas=None):
+    """
+    Cria índices nas colunas chave (por padrão `COLUNAS_INDICE`) que existirem na tabela.
+
+    Retorna:
+    - Lista com as colunas indexadas.
+    """
+    colunas = COLUNAS_INDICE if colunas is None else colunas
+    existentes = set(colunas_tabela(conexao, tabela))
+    indexadas = [col for col in colunas if col in existentes]
+    for col in indexadas:
+        conexao.execute(f"CREATE INDEX IF NOT EXISTS {citar(f'idx_{tabela}_{col}')} ON {citar(tabela)} ({citar(col)})")
+    return indexadas
+
+# Carrega todos os CSVs brutos do Olist para o stg_data.db em paralelo.
+def carregar_staging(diretorio_csv, db_path, tamanho_chunk=100_000, processos=None, prefixo="stg_", pragmas=None, gerar_esquemas=True, verbose=True):
+    """
+    Carrega todos os arquivos CSV de um diretório em tabelas SQLite de staging.
+
+    Os CSVs são lidos em blocos por um pool de processos; um único escritor recebe os
+    blocos por uma fila limitada e grava com `executemany` em transações grandes, com
+    tipos de coluna declarados (INTEGER/REAL/TEXT, inferidos do primeiro bloco e
+    alargados quando um bloco seguinte discorda, ex: INTEGER -> TEXT) e os
+    pragmas de `PRAGMAS_CARGA`. Ao final, as colunas chave recebem índices e o esquema
+    otimizado de cada tabela (`inferir_esquema_sql`) é gravado no banco, para que o
+    `data_reader` já entregue os DataFrames com tipos compactos.
+
+    Parâmetros:
+    - diretorio_csv: Diretório com os arquivos .csv (ex: data/raw).
+    - db_path: Caminho do banco de staging (ex: data/processed/stg_data.db).
+    - tamanho_chunk: Número de linhas por bloco.
+    - processos: Número de processos leitores (se None, um por arquivo até o número de CPUs;
+      1 executa tudo no processo atual).
+    - prefixo: Prefixo das tabelas (padrão: 'stg_').
+    - pragmas: Dicionário de pragmas (se None, usa `PRAGMAS_CARGA`).
+    - gerar_esquemas: Se True, infere e grava o esquema otimizado de cada tabela.
+    - verbose: Se True, imprime o andamento de cada tabela.
+
+    Retorna:
+    - DataFrame com linhas, segundos e linhas/s de cada tabela carregada.
+    """
+    arquivos = sorted(f for f in os.listdir(diretorio_csv) if f.endswith(".csv"))
+    tarefas = [(os.path.join(diretorio_csv, f), nome_tabela_staging(f, prefixo), tamanho_chunk) for f in arquivos]
+    if processos is None:
+        processos = min(len(tarefas), os.cpu_count() or 1)
+
+    conexao = sqlite3.connect(db_path, isolation_level=None)
+    configurar_conexao(conexao, PRAGMAS_CARGA if pragmas is None else pragmas)
+
+    inicio = {}
+    relatorio = {}
+    pendentes = {tabela for _, tabela, _ in tarefas}
+    linhas_na_transacao = 0
+
+    def gravar(mensagem):
+        nonlocal linhas_na_transacao
+        tipo, tabela, conteudo = mensagem
+        if tipo == "inicio":
+            inicio[tabela] = (time.perf_counter(), dict(conteudo))
+            definicao = ", ".join(f"{citar(col)} {tipo_sql}" for col, tipo_sql in conteudo.items())
+            conexao.execute(f"DROP TABLE IF EXISTS {citar(tabela)}")
+            conexao.execute(f"CREATE TABLE {citar(tabela)} ({definicao})")
+        elif tipo == "tipos":
+            atuais = inicio[tabela][1]
+            ampliados = _ampliar_tipos(atuais, conteudo)
+            if ampliados != atuais:
+                _recriar_tabela(conexao, tabela, ampliados)
+                inicio[tabela] = (inicio[tabela][0], ampliados)
+        elif tipo == "dados":
+            colunas = inicio[tabela][1]
+            marcadores = ", ".join("?" * len(colunas))
+            conexao.executemany(f"INSERT INTO {citar(tabela)} VALUES ({marcadores})", conteudo)
+            linhas_na_transacao += len(conteudo)
+            if linhas_na_transacao >= LINHAS_POR_TRANSACAO:
+                conexao.execute("COMMIT")
+                conexao.execute("BEGIN")
+                linhas_na_transacao = 0
+        elif tipo == "fim":
+            segundos = time.perf_counter() - inicio[tabela][0]
+            relatorio[tabela] = {"linhas": conteudo, "segundos": segundos, "linhas_por_segundo": conteudo / segundos if segundos else float("inf")}
+            pendentes.discard(tabela)
+            if verbose:
+                print(f"Tabela {tabela} carregada com sucesso! ({conteudo:,} linhas, {relatorio[tabela]['linhas_por_segundo']:,.0f} linhas/s)")
+        elif tipo == "erro":
+            if tabela in inicio:
+                conexao.execute(f"DROP TABLE IF EXISTS {citar(tabela)}")
+            pendentes.discard(tabela)
+            if verbose:
+                print(conteudo)
+
+    try:
+        conexao.execute("BEGIN")
+        if processos <= 1:
+            for tarefa in tarefas:
+                for mensagem in _mensagens_csv(*tarefa):
+                    gravar(mensagem)
+        else:
+            contexto = multiprocessing.get_context()
+            fila = contexto.Queue(maxsize=processos * 2)
+            with contexto.Pool(processos, initializer=_inicializar_worker, initargs=(fila,)) as pool:
+                resultado = pool.map_async(_worker_csv, tarefas, chunksize=1)
+                while pendentes:
+                    try:
+                        gravar(fila.get(timeout=1))
+                    except queue.Empty:
+                        if resultado.ready():
+                            resultado.get()  # propaga falhas inesperadas dos workers
+                            break
+        conexao.execute("COMMIT")
+
+        for tabela in relatorio:
+            inicio_indice = time.perf_counter()
+            criar_indices(conexao, tabela)
+            relatorio[tabela]["segundos_indices"] = time.perf_counter() - inicio_indice
+
+        if gerar_esquemas:
+            for tabela in relatorio:
+                inicio_esquema = time.perf_counter()
+                gravar_esquema_sql(conexao, tabela, inferir_esquema_sql(conexao, tabela))
+                relatorio[tabela]["segundos_esquema"] = time.perf_counter() - inicio_esquema
+    finally:
+        if conexao.in_transaction:
+            conexao.execute("ROLLBACK")
+        conexao.close()
+
+    return pd.DataFrame.from_dict(relatorio, orient="index")
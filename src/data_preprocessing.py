@@ -1,61 +1,244 @@
+import itertools
+import re
+import time
+import warnings
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 import unidecode
+
+try:
+    from .data_analysis import calcular_outliers, invalidar_perfil, perfilar_tabela
+    from .data_streaming import ConjuntoHashes, ResultadoDuplicatas, estatisticas_duplicatas, hash_linhas
+    from .instrumentation import instrumentar_modulo
+    from .sqlite_utils import citar, existe_tabela
+except ImportError:
+    from data_analysis import calcular_outliers, invalidar_perfil, perfilar_tabela
+    from data_streaming import ConjuntoHashes, ResultadoDuplicatas, estatisticas_duplicatas, hash_linhas
+    from instrumentation import instrumentar_modulo
+    from sqlite_utils import citar, existe_tabela
+
 # Substitui outliers por NaN usando desvio padrão ou IQR.
-def excluir_outliers(df, col_name, metodo="desvio_padrao", fator=2.7):
+def excluir_outliers(df, col_name, metodo="desvio_padrao", fator=2.7, resultado=None):
     """
     Remove outliers de uma coluna de um DataFrame.
 
     Parâmetros:
     - df: DataFrame do pandas.
-    - col_name: Nome da coluna para verificar outliers.
+    - col_name: Nome da coluna (ou lista de colunas) para verificar outliers.
     - metodo: 'desvio_padrao' (default) ou 'iqr' para Interquartile Range.
     - fator: Multiplicador do desvio padrão ou IQR (quanto maior, menos valores serão removidos).
+    - resultado: ResultadoOutliers já calculado por `calcular_outliers` (opcional).
 
     Retorna:
     - DataFrame com outliers substituídos por NaN.
+
+    Levanta ValueError se `metodo` não for 'desvio_padrao' nem 'iqr'.
     """
-    if metodo == "desvio_padrao":
-        intervalo = fator * df[col_name].std()
-        media = df[col_name].mean()
-        df.loc[(df[col_name] < media - intervalo) | (df[col_name] > media + intervalo), col_name] = np.nan
-    
-    elif metodo == "iqr":
-        Q1 = df[col_name].quantile(0.25)
-        Q3 = df[col_name].quantile(0.75)
-        IQR = Q3 - Q1
-        limite_inferior = Q1 - fator * IQR
-        limite_superior = Q3 + fator * IQR
-        df.loc[(df[col_name] < limite_inferior) | (df[col_name] > limite_superior), col_name] = np.nan
+    colunas = list(col_name) if pd.api.types.is_list_like(col_name) else [col_name]
+    if resultado is None:
+        resultado = calcular_outliers(df, colunas, metodo=metodo, fator=fator)
+
+    for col in colunas:
+        df.loc[resultado.mascara[col].to_numpy(), col] = np.nan
     
+    invalidar_perfil(df)
     return df
 
 # Retorna um DataFrame com os valores considerados outliers.
-def identificar_outliers(df, col_name, metodo="desvio_padrao", fator=2.7):
+def identificar_outliers(df, col_name, metodo="desvio_padrao", fator=2.7, resultado=None):
     """
     Identifica outliers em uma coluna de um DataFrame sem removê-los.
 
-    Retorna um DataFrame com as linhas que possuem outliers.
+    Com uma lista de colunas, retorna as linhas com outlier em qualquer uma delas.
+
+    Retorna um DataFrame com as linhas que possuem outliers. Levanta ValueError se
+    `metodo` não for 'desvio_padrao' nem 'iqr'.
     """
-    if metodo == "desvio_padrao":
-        intervalo = fator * df[col_name].std()
-        media = df[col_name].mean()
-        return df[(df[col_name] < media - intervalo) | (df[col_name] > media + intervalo)]
-    
-    elif metodo == "iqr":
-        Q1 = df[col_name].quantile(0.25)
-        Q3 = df[col_name].quantile(0.75)
-        IQR = Q3 - Q1
-        limite_inferior = Q1 - fator * IQR
-        limite_superior = Q3 + fator * IQR
-        return df[(df[col_name] < limite_inferior) | (df[col_name] > limite_superior)]
+    colunas = list(col_name) if pd.api.types.is_list_like(col_name) else [col_name]
+    if resultado is None:
+        resultado = calcular_outliers(df, colunas, metodo=metodo, fator=fator)
+
+    return df[resultado.mascara[colunas].any(axis=1).to_numpy()]
+
+# Remove as linhas que possuem outlier em qualquer uma das colunas.
+def remover_linhas_outliers(df, colunas=None, metodo="iqr", fator=1.5, resultado=None):
+    """
+    Remove as linhas com outlier em qualquer coluna, usando uma única máscara combinada
+    (sem gerar cópias intermediárias por coluna).
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - colunas: Lista de colunas a verificar (se None, usa todas as numéricas).
+    - metodo: 'desvio_padrao' ou 'iqr' (default).
+    - fator: Multiplicador do desvio padrão ou IQR.
+    - resultado: ResultadoOutliers já calculado por `calcular_outliers` (opcional).
+
+    Retorna:
+    - DataFrame sem as linhas com outliers.
+    """
+    if resultado is None:
+        resultado = calcular_outliers(df, colunas, metodo=metodo, fator=fator)
+
+    return df[~resultado.linhas_com_outlier.to_numpy()]
 
 # Exibe os tipos de dados presentes no DataFrame.
-def verificar_tipos_dados(df):
+def verificar_tipos_dados(df, atualizar=False):
     """
     Retorna um resumo dos tipos de dados presentes no DataFrame.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
+    """
+    return perfilar_tabela(df, atualizar).colunas["tipo"].rename("Tipo de Dado").to_frame()
+
+# Métodos de imputação calculados a partir dos dados (outros valores são usados como constante).
+METODOS_IMPUTACAO = ("media", "mediana", "moda", "zero")
+
+@dataclass
+class Imputacao:
+    """
+    Valores de preenchimento ajustados por `ajustar_imputacao`, reaplicáveis em outros
+    DataFrames com as mesmas colunas (ex: os próximos blocos de uma leitura em chunks).
+
+    Atributos:
+    - valores: Dicionário coluna -> valor de preenchimento global.
+    - valores_grupo: Dicionário coluna -> Series (valor do grupo -> valor de preenchimento).
+    - grupos: Dicionário coluna -> coluna de agrupamento (só para as colunas agrupadas).
+    """
+    valores: dict
+    valores_grupo: dict
+    grupos: dict
+
+    def aplicar(self, df, inplace=False):
+        """
+        Preenche os nulos do DataFrame com os valores ajustados. Nas colunas agrupadas,
+        usa o valor do grupo da linha e, para grupos sem valor, o valor global.
+
+        Parâmetros:
+        - df: DataFrame do pandas.
+        - inplace: Se True, altera o próprio DataFrame; se False, retorna uma cópia rasa
+          em que só as colunas preenchidas são novas (as demais são compartilhadas).
+
+        Retorna:
+        - DataFrame com os nulos preenchidos.
+        """
+        resultado = df if inplace else df.copy(deep=False)
+        for col, valor in self.valores.items():
+            if col not in resultado.columns:
+                continue
+            serie = resultado[col]
+            if not serie.hasnans:
+                continue
+            if col in self.valores_grupo:
+                chaves = resultado[self.grupos[col]]
+                serie = preencher_serie(serie, chaves.map(self.valores_grupo[col]))
+            resultado[col] = preencher_serie(serie, valor)
+        if inplace:
+            invalidar_perfil(df)
+        return resultado
+
+# Preenche os nulos de uma série, ajustando o tipo quando o valor não cabe nele.
+def preencher_serie(serie, valor):
+    if isinstance(valor, pd.Series):
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            novos = pd.Index(valor.dropna().unique()).difference(serie.cat.categories)
+            serie = serie.cat.add_categories(novos)
+        elif pd.api.types.is_integer_dtype(serie) and not valor.dropna().mod(1).eq(0).all():
+            serie = serie.astype("float64")
+        return serie.fillna(valor)
+    if valor is None or pd.isna(valor):
+        return serie
+    if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    elif pd.api.types.is_integer_dtype(serie) and isinstance(valor, float) and not valor.is_integer():
+        serie = serie.astype("float64")
+    return serie.fillna(valor)
+
+# Calcula a moda de cada grupo (menor valor em caso de empate, como em Series.mode).
+def _moda_por_grupo(df, col, grupo):
+    contagens = df.groupby([grupo, col], observed=True, sort=True).size().rename("n").reset_index()
+    contagens = contagens.sort_values([grupo, "n"], ascending=[True, False], kind="stable")
+    return contagens.drop_duplicates(grupo).set_index(grupo)[col]
+
+# Ajusta os valores de preenchimento de todas as colunas de uma vez.
+def ajustar_imputacao(df, estrategias="media", colunas=None, grupos=None):
+    """
+    Calcula os valores de preenchimento de nulos. Colunas com a mesma estratégia são
+    agregadas juntas (uma única chamada de mean/median para todas) e as agrupadas usam
+    um único groupby por coluna de grupo.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - estrategias: 'media', 'mediana', 'moda', 'zero' ou um valor constante, aplicado a
+      todas as colunas; ou um dicionário coluna -> estratégia.
+    - colunas: Colunas a imputar quando `estrategias` não é um dicionário (se None, as
+      numéricas para 'media'/'mediana'/'zero' e todas para 'moda' ou constante).
+    - grupos: Coluna de agrupamento (ex: 'customer_state') para todas as colunas, ou um
+      dicionário coluna -> coluna de agrupamento (ex: mediana do frete por estado).
+
+    Retorna:
+    - Imputacao com os valores ajustados.
+    """
+    if not isinstance(estrategias, dict):
+        if colunas is None:
+            numericas = isinstance(estrategias, str) and estrategias in ("media", "mediana", "zero")
+            colunas = df.select_dtypes(include=[np.number]).columns if numericas else df.columns
+        estrategias = {col: estrategias for col in colunas}
+    if not isinstance(grupos, dict):
+        grupos = {col: grupos for col in estrategias if grupos is not None and col != grupos}
+
+    valores, valores_grupo = {}, {}
+    # Agrupa as colunas por (estratégia, grupo) para agregar cada conjunto de uma vez
+    conjuntos = defaultdict(list)
+    for col, estrategia in estrategias.items():
+        metodo = estrategia if isinstance(estrategia, str) and estrategia in METODOS_IMPUTACAO else "valor"
+        conjuntos[(metodo, grupos.get(col))].append(col)
+
+    for (metodo, grupo), cols in conjuntos.items():
+        if metodo == "valor":
+            valores.update({col: estrategias[col] for col in cols})
+        elif metodo == "zero":
+            valores.update(dict.fromkeys(cols, 0))
+        elif metodo in ("media", "mediana"):
+            funcao = "mean" if metodo == "media" else "median"
+            valores.update(getattr(df[cols], funcao)().to_dict())
+            if grupo is not None:
+                por_grupo = df.groupby(grupo, observed=True)[cols].agg(funcao)
+                valores_grupo.update({col: por_grupo[col].dropna() for col in cols})
+        else:
+            for col in cols:
+                moda = df[col].mode()
+                valores[col] = moda.iloc[0] if len(moda) else np.nan
+                if grupo is not None:
+                    valores_grupo[col] = _moda_por_grupo(df, col, grupo)
+
+    return Imputacao(valores=valores, valores_grupo=valores_grupo, grupos={col: grupos[col] for col in valores_grupo})
+
+# Preenche os nulos de várias colunas com estratégias por coluna (inclusive por grupo).
+def imputar_nulos(df, estrategias="media", colunas=None, grupos=None, inplace=False, imputacao=None):
     """
-    return df.dtypes.to_frame(name="Tipo de Dado")
+    Preenche valores nulos em uma única passada: ajusta os valores com
+    `ajustar_imputacao` (ou usa uma `imputacao` já ajustada) e aplica em todas as colunas.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - estrategias, colunas, grupos: Ver `ajustar_imputacao`.
+    - inplace: Se True, altera o próprio DataFrame; se False, não copia as colunas que
+      não mudam.
+    - imputacao: Imputacao ajustada anteriormente (ignora estratégias, colunas e grupos).
+
+    Retorna:
+    - DataFrame com os nulos preenchidos.
+    """
+    if imputacao is None:
+        imputacao = ajustar_imputacao(df, estrategias, colunas, grupos)
+    return imputacao.aplicar(df, inplace=inplace)
 
 # Preenche valores NaN usando média, mediana, moda ou zero.
 def preencher_nulos(df, metodo="media"):
@@ -68,19 +251,9 @@ def preencher_nulos(df, metodo="media"):
 
     Retorna o DataFrame com valores nulos preenchidos.
     """
-    df = df.copy()
-    
-    for col in df.select_dtypes(include=[np.number]).columns:
-        if metodo == "media":
-            df[col] = df[col].fillna(df[col].mean())
-        elif metodo == "mediana":
-            df[col] = df[col].fillna(df[col].median())
-        elif metodo == "moda":
-            df[col] = df[col].fillna(df[col].mode()[0])
-        elif metodo == "zero":
-            df[col] = df[col].fillna(0)
-    
-    return df
+    if metodo not in METODOS_IMPUTACAO:
+        return df.copy()
+    return imputar_nulos(df, metodo, colunas=df.select_dtypes(include=[np.number]).columns)
 
 # Normaliza uma coluna usando Min-Max ou Z-score.
 def normalizar_coluna(df, col_name, metodo="min_max"):
@@ -100,8 +273,12 @@ def normalizar_coluna(df, col_name, metodo="min_max"):
     elif metodo == "z_score":
         df[col_name] = (df[col_name] - df[col_name].mean()) / df[col_name].std()
     
+    invalidar_perfil(df)
     return df
 
+# Valores aceitos em `manter` -> `keep` do pandas.
+_MANTER_DUPLICATAS = {"primeiro": "first", "ultimo": "last", "último": "last", "first": "first", "last": "last", False: False}
+
 # Remove linhas duplicadas do DataFrame.
 def remover_duplicatas(df, colunas=None, manter="primeiro"):
     """
@@ -110,39 +287,282 @@ def remover_duplicatas(df, colunas=None, manter="primeiro"):
     Parâmetros:
     - df: DataFrame do pandas.
     - colunas: Lista de colunas para verificar duplicatas (se None, verifica todas as colunas).
-    - manter: 'primeiro' (default) mantém a primeira ocorrência, 'último' mantém a última, False remove todas as duplicatas.
+    - manter: 'primeiro' (default) mantém a primeira ocorrência, 'ultimo' mantém a última, False remove todas as duplicatas.
 
     Retorna:
     - DataFrame sem duplicatas.
     """
-    return df.drop_duplicates(subset=colunas, keep=manter)
+    if manter not in _MANTER_DUPLICATAS:
+        raise ValueError("Opção inválida para 'manter'. Escolha entre 'primeiro', 'ultimo' ou False.")
+    return df.drop_duplicates(subset=colunas, keep=_MANTER_DUPLICATAS[manter])
+
+# Relatório dos grupos de linhas repetidas de um DataFrame (via hash de 64 bits por linha).
+def detectar_duplicatas(df, colunas=None, limite_grupos=100):
+    """
+    Conta as linhas duplicadas e lista os maiores grupos de repetição, com o mesmo
+    relatório de `detectar_duplicatas_sql` (para tabelas que não cabem em memória).
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - colunas: Coluna ou lista de colunas comparadas (se None, todas).
+    - limite_grupos: Quantidade de grupos no relatório (os maiores primeiro).
+
+    Retorna:
+    - ResultadoDuplicatas.
+    """
+    inicio = time.perf_counter()
+    colunas = list(df.columns) if colunas is None else [colunas] if isinstance(colunas, str) else list(colunas)
+    conjunto = ConjuntoHashes()
+    conjunto.adicionar(hash_linhas(df, colunas))
+
+    grupos = conjunto.maiores_grupos(limite_grupos)
+    valores = df[colunas].iloc[grupos["primeira_linha"].to_numpy()].reset_index(drop=True)
+    grupos = pd.concat([grupos, valores], axis=1)
+    return ResultadoDuplicatas(grupos=grupos, estatisticas=estatisticas_duplicatas(conjunto, len(conjunto), inicio))
 
 # Exibe a quantidade e percentual de valores NaN em cada coluna.
-def contar_valores_nulos(df):
+def contar_valores_nulos(df, atualizar=False):
     """
     Retorna um resumo com a quantidade e percentual de valores nulos em cada coluna.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
     """
-    total_nulos = df.isnull().sum()
-    percentual_nulos = (df.isnull().sum() / len(df)) * 100
-    return pd.DataFrame({"Total Nulos": total_nulos, "Percentual (%)": percentual_nulos})
+    perfil = perfilar_tabela(df, atualizar).colunas
+    return pd.DataFrame({"Total Nulos": perfil["nulos"], "Percentual (%)": perfil["percentual_nulos"]})
 
 # Substitui valores específicos em uma coluna.
-def substituir_valores(df, col_name, valores_antigos, novo_valor):
+def substituir_valores(df, col_name, valores_antigos, novo_valor=None, col_estado=None):
     """
     Substitui valores específicos em uma coluna.
 
     Parâmetros:
     - df: DataFrame do pandas.
     - col_name: Nome da coluna onde os valores serão substituídos.
-    - valores_antigos: Lista ou único valor a ser substituído.
-    - novo_valor: Valor pelo qual substituir.
+    - valores_antigos: Lista ou único valor a ser substituído, um dicionário {antigo: novo}
+      ou a tabela de mapeamento de `deduplicar_textos` (aplicada em lote).
+    - novo_valor: Valor pelo qual substituir (ignorado para dicionário ou tabela de mapeamento).
+    - col_estado: Coluna de estado do df, usada quando a tabela de mapeamento tem a coluna 'estado'.
 
     Retorna:
     - DataFrame com os valores substituídos.
     """
-    df[col_name] = df[col_name].replace(valores_antigos, novo_valor)
+    if isinstance(valores_antigos, pd.DataFrame):
+        df[col_name] = aplicar_mapeamento(df, col_name, valores_antigos, col_estado)
+    elif isinstance(valores_antigos, dict):
+        df[col_name] = df[col_name].replace(valores_antigos)
+    else:
+        df[col_name] = df[col_name].replace(valores_antigos, novo_valor)
+    invalidar_perfil(df)
     return df
 
+# Aplica uma tabela de mapeamento (valor_original -> valor_canonico) de forma vetorizada.
+def aplicar_mapeamento(df, col_name, mapeamento, col_estado=None):
+    mapa = mapeamento[mapeamento["valor_original"] != mapeamento["valor_canonico"]]
+    valores = df[col_name].to_numpy(dtype=object, copy=True)
+
+    if "estado" in mapa.columns:
+        # Cada estado tem seus próprios nomes canônicos: sem o estado, o mapeamento é ambíguo
+        if col_estado is None:
+            raise ValueError("A tabela de mapeamento é por estado: informe col_estado.")
+        chaves = pd.MultiIndex.from_frame(mapa[["estado", "valor_original"]])
+        posicoes = chaves.get_indexer(pd.MultiIndex.from_arrays([df[col_estado], df[col_name]]))
+    else:
+        mapa = mapa.drop_duplicates("valor_original")
+        posicoes = pd.Index(mapa["valor_original"]).get_indexer(df[col_name])
+
+    encontrados = posicoes >= 0
+    valores[encontrados] = mapa["valor_canonico"].to_numpy(dtype=object)[posicoes[encontrados]]
+    return pd.Series(valores, index=df.index)
+
+@dataclass
+class ResultadoDeduplicacao:
+    """
+    Resultado de `deduplicar_textos`.
+
+    Atributos:
+    - mapeamento: DataFrame com 'estado' (se houver), 'valor_original', 'valor_canonico' e
+      'frequencia', pronto para `substituir_valores`.
+    - estatisticas: Dicionário com valores distintos, pares possíveis, pares candidatos,
+      redução de pares, pares similares, blocos/pares descartados (blocos grandes demais
+      mesmo após a subdivisão), segundos e pares pontuados por segundo.
+    """
+    mapeamento: pd.DataFrame
+    estatisticas: dict
+
+# Gera os pares candidatos de um bloco de textos pelas chaves de prefixo e n-gramas.
+def _pares_candidatos(textos, tamanho_ngrama, tamanho_prefixo, tamanho_max_bloco):
+    """
+    Indexa cada texto por prefixo e por n-gramas de caracteres e devolve os pares de
+    índices que compartilham ao menos uma chave.
+
+    Chaves muito comuns (blocos maiores que `tamanho_max_bloco`, como o n-grama 'sao')
+    não geram pares diretamente, para evitar o O(n²): elas são subdivididas pelos pares
+    de chaves comuns de cada texto, então dois textos que só compartilham chaves comuns
+    ainda se encontram num sub-bloco. Sub-blocos que continuam grandes demais são
+    descartados e contados.
+
+    Retorna:
+    - Tupla (pares, blocos_descartados, pares_descartados); `pares_descartados` é o total
+      de pares dos sub-blocos descartados (limite superior do que deixou de ser pontuado).
+    """
+    blocos = defaultdict(set)
+    for i, texto in enumerate(textos):
+        blocos["p:" + texto[:tamanho_prefixo]].add(i)
+        blocos["s:" + texto[-tamanho_prefixo:]].add(i)
+        for j in range(max(1, len(texto) - tamanho_ngrama + 1)):
+            blocos["g:" + texto[j:j + tamanho_ngrama]].add(i)
+
+    pares = set()
+    comuns = defaultdict(list)
+    for chave, membros in blocos.items():
+        if len(membros) > tamanho_max_bloco:
+            for i in membros:
+                comuns[i].append(chave)
+        elif len(membros) > 1:
+            pares.update(itertools.combinations(sorted(membros), 2))
+
+    sub_blocos = defaultdict(set)
+    for i, chaves in comuns.items():
+        for par_chaves in itertools.combinations(sorted(chaves), 2):
+            sub_blocos[par_chaves].add(i)
+
+    blocos_descartados = pares_descartados = 0
+    for membros in sub_blocos.values():
+        if len(membros) > tamanho_max_bloco:
+            blocos_descartados += 1
+            pares_descartados += len(membros) * (len(membros) - 1) // 2
+        elif len(membros) > 1:
+            pares.update(itertools.combinations(sorted(membros), 2))
+    return pares, blocos_descartados, pares_descartados
+
+# Agrupa os pares similares (union-find) e escolhe o valor mais frequente como canônico.
+def _agrupar_pares(valores, frequencias, pares):
+    pai = list(range(len(valores)))
+
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    for i, j in pares:
+        ri, rj = raiz(i), raiz(j)
+        if ri != rj:
+            pai[rj] = ri
+
+    grupos = defaultdict(list)
+    for i in range(len(valores)):
+        grupos[raiz(i)].append(i)
+
+    canonicos = [None] * len(valores)
+    for membros in grupos.values():
+        escolhido = min(membros, key=lambda i: (-frequencias[i], str(valores[i])))
+        for i in membros:
+            canonicos[i] = valores[escolhido]
+    return canonicos
+
+# Deduplica nomes parecidos (cidades, categorias) com blocagem e fuzzy matching.
+def deduplicar_textos(df, col_name, col_estado=None, limiar=90, tamanho_ngrama=3, tamanho_prefixo=3, tamanho_max_bloco=100, metodo="indexado"):
+    """
+    Encontra grafias diferentes do mesmo nome (ex: 'sao paulo' e 'sao paolo') e gera uma
+    tabela de mapeamento para o nome canônico.
+
+    Os valores distintos são separados por estado (se `col_estado` for informado) e
+    indexados por prefixo/sufixo e n-gramas de caracteres; só os pares que compartilham
+    uma chave (e passam no filtro de tamanho) são pontuados com `fuzz.ratio`. Pares com
+    pontuação >= `limiar` são agrupados e cada grupo recebe o valor mais frequente.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - col_name: Coluna de texto (ex: 'customer_city').
+    - col_estado: Coluna de estado usada na blocagem (ex: 'customer_state'), opcional.
+    - limiar: Pontuação mínima (0-100) para considerar dois textos iguais.
+    - tamanho_ngrama: Tamanho dos n-gramas de caracteres usados como chave.
+    - tamanho_prefixo: Tamanho do prefixo/sufixo usado como chave.
+    - tamanho_max_bloco: Tamanho máximo de um bloco; chaves mais comuns são subdivididas
+      e o que continuar grande demais é descartado (com um aviso e nas estatísticas).
+    - metodo: 'indexado' (default) ou 'forca_bruta' (todos os pares, usado como referência).
+
+    Retorna:
+    - ResultadoDeduplicacao com a tabela de mapeamento e as estatísticas.
+    """
+    from fuzzywuzzy import fuzz
+
+    if metodo not in ("indexado", "forca_bruta"):
+        raise ValueError("Método inválido. Escolha entre 'indexado' ou 'forca_bruta'.")
+
+    chaves = [col_estado, col_name] if col_estado else [col_name]
+    contagem = df.groupby(chaves, dropna=True, observed=True).size()
+    if col_estado:
+        grupos = [(estado, serie.droplevel(0)) for estado, serie in contagem.groupby(level=0)]
+    else:
+        grupos = [(None, contagem)]
+
+    estatisticas = {
+        "valores_distintos": 0, "pares_possiveis": 0, "pares_candidatos": 0, "pares_similares": 0,
+        "blocos_descartados": 0, "pares_descartados": 0,
+    }
+    partes = []
+    tempo_pontuacao = 0.0
+    inicio = time.perf_counter()
+
+    for estado, serie in grupos:
+        valores = list(serie.index)
+        frequencias = serie.to_numpy()
+        textos = [str(normalizar_texto(v)) for v in valores]
+        n = len(valores)
+
+        if metodo == "forca_bruta":
+            candidatos = itertools.combinations(range(n), 2)
+        else:
+            pares, blocos_descartados, pares_descartados = _pares_candidatos(textos, tamanho_ngrama, tamanho_prefixo, tamanho_max_bloco)
+            estatisticas["blocos_descartados"] += blocos_descartados
+            estatisticas["pares_descartados"] += pares_descartados
+            candidatos = [
+                (i, j) for i, j in pares
+                # fuzz.ratio = 2*M/(la+lb) e M <= min(la, lb): descarta pares que não alcançam o limiar
+                if 200 * min(len(textos[i]), len(textos[j])) / (len(textos[i]) + len(textos[j])) >= limiar - 0.5
+            ]
+
+        inicio_pontuacao = time.perf_counter()
+        similares = []
+        n_candidatos = 0
+        for i, j in candidatos:
+            n_candidatos += 1
+            if fuzz.ratio(textos[i], textos[j]) >= limiar:
+                similares.append((i, j))
+        tempo_pontuacao += time.perf_counter() - inicio_pontuacao
+
+        estatisticas["valores_distintos"] += n
+        estatisticas["pares_possiveis"] += n * (n - 1) // 2
+        estatisticas["pares_candidatos"] += n_candidatos
+        estatisticas["pares_similares"] += len(similares)
+
+        parte = pd.DataFrame({
+            "valor_original": valores,
+            "valor_canonico": _agrupar_pares(valores, frequencias, similares),
+            "frequencia": frequencias,
+        })
+        if col_estado:
+            parte.insert(0, "estado", estado)
+        partes.append(parte)
+
+    if estatisticas["blocos_descartados"]:
+        warnings.warn(
+            f"{estatisticas['blocos_descartados']} blocos maiores que tamanho_max_bloco foram descartados "
+            f"(até {estatisticas['pares_descartados']} pares não pontuados); aumente tamanho_max_bloco."
+        )
+    possiveis = estatisticas["pares_possiveis"]
+    estatisticas["reducao_pares"] = 1 - estatisticas["pares_candidatos"] / possiveis if possiveis else 0.0
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    estatisticas["pares_por_segundo"] = estatisticas["pares_candidatos"] / tempo_pontuacao if tempo_pontuacao else 0.0
+
+    colunas = (["estado"] if col_estado else []) + ["valor_original", "valor_canonico", "frequencia"]
+    mapeamento = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=colunas)
+    return ResultadoDeduplicacao(mapeamento=mapeamento, estatisticas=estatisticas)
+
 # Converte uma coluna para um novo tipo de dado, incluindo datetime.
 def converter_tipo_dado(df, col_name, tipo):
     """
@@ -160,19 +580,266 @@ def converter_tipo_dado(df, col_name, tipo):
         df[col_name] = pd.to_datetime(df[col_name], errors="coerce")
     else:
         df[col_name] = df[col_name].astype(tipo, errors="ignore")
+    invalidar_perfil(df)
+    return df
+
+# Tabela do banco onde o loader grava o esquema otimizado de cada tabela.
+TABELA_ESQUEMAS = "_esquemas"
+
+_PADRAO_DATA = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+# Mesmo formato de `_PADRAO_DATA` em padrões GLOB do SQLite ({c} é a coluna).
+_DIA_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+_HORA_GLOB = _DIA_GLOB + "[ T][0-9][0-9]:[0-9][0-9]"
+_NAO_DATA_SQL = (
+    f"NOT ({{c}} GLOB '{_DIA_GLOB}' OR {{c}} GLOB '{_HORA_GLOB}' OR {{c}} GLOB '{_HORA_GLOB}:[0-9][0-9]'"
+    f" OR ({{c}} GLOB '{_HORA_GLOB}:[0-9][0-9].[0-9]*' AND {{c}} NOT GLOB '{_HORA_GLOB}:[0-9][0-9].*[^0-9]*'))"
+)
+
+# Indica se a coluna é um identificador (id, *_id), que não vira 'category' por padrão.
+def _coluna_id(nome):
+    nome = str(nome).lower()
+    return nome == "id" or nome.endswith("_id")
+
+# Verifica se todos os valores (não nulos) de texto estão no formato de data.
+def _sao_datas(valores, amostra=200):
+    """
+    Testa primeiro as `amostra` primeiras linhas (descarta rápido colunas que não são
+    datas) e depois todos os valores distintos da coluna.
+    """
+    if not len(valores) or not all(_PADRAO_DATA.match(str(v)) for v in valores[:amostra]):
+        return False
+    return all(_PADRAO_DATA.match(str(v)) for v in pd.unique(np.asarray(valores, dtype=object)))
+
+@dataclass
+class ResultadoOtimizacao:
+    """
+    Resultado de `otimizar_memoria`.
+
+    Atributos:
+    - df: DataFrame com os tipos otimizados.
+    - relatorio: DataFrame por coluna com tipo e memória (bytes) antes/depois e a redução (%).
+    - esquema: Dicionário coluna -> tipo, reaplicável com `aplicar_esquema`.
+    """
+    df: pd.DataFrame
+    relatorio: pd.DataFrame
+    esquema: dict
+
+# Escolhe o tipo mais compacto que representa a coluna sem perda.
+def _escolher_tipo(tipo_base, minimo=None, maximo=None, inteiros=False, tem_nulos=False, distintos=None, total=None, datas=False, limite_categoria=0.5, converter_datas=True, permitir_float32=False):
+    if tipo_base in ("int", "float") and (tipo_base == "int" or inteiros) and minimo is not None:
+        for tipo in ("int8", "int16", "int32", "int64"):
+            info = np.iinfo(tipo)
+            if info.min <= minimo and maximo <= info.max:
+                # Inteiros com nulos usam o tipo anulável do pandas (Int8, Int16, ...)
+                return tipo.capitalize() if tem_nulos else tipo
+    if tipo_base == "float":
+        return "float32" if permitir_float32 else "float64"
+    if tipo_base == "texto":
+        if converter_datas and datas:
+            return "datetime64[ns]"
+        if total and distintos is not None and distintos / total <= limite_categoria:
+            return "category"
+        return "object"
+    return None
+
+# Infere o esquema otimizado de um DataFrame.
+def inferir_esquema(df, limite_categoria=0.5, converter_datas=True, permitir_float32=False, categorizar_ids=False):
+    """
+    Infere o tipo mais compacto de cada coluna: inteiros no menor tamanho que comporta
+    min/max (floats com valores inteiros também), textos com poucas categorias como
+    'category' e textos no formato AAAA-MM-DD[ HH:MM:SS] como datetime64 (só quando
+    todos os valores da coluna estão nesse formato).
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - limite_categoria: Razão máxima distintos/não nulos para converter texto em 'category'.
+    - converter_datas: Se True, converte textos de data/hora em datetime64.
+    - permitir_float32: Se True, reduz floats não inteiros para float32 (com perda de precisão).
+    - categorizar_ids: Se True, colunas de identificador (id, *_id) também podem virar 'category'.
+
+    Retorna:
+    - Dicionário coluna -> tipo (colunas que já estão no tipo ideal ficam de fora).
+    """
+    esquema = {}
+    opcoes = dict(limite_categoria=limite_categoria, converter_datas=converter_datas, permitir_float32=permitir_float32)
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_bool_dtype(serie) or isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(serie):
+            continue
+        validos = serie.dropna()
+        if pd.api.types.is_integer_dtype(serie) or pd.api.types.is_float_dtype(serie):
+            tipo_base = "int" if pd.api.types.is_integer_dtype(serie) else "float"
+            inteiros = bool(len(validos)) and tipo_base == "float" and bool((validos % 1 == 0).all())
+            tipo = _escolher_tipo(
+                tipo_base, validos.min() if len(validos) else None, validos.max() if len(validos) else None,
+                inteiros=inteiros, tem_nulos=len(validos) < len(serie), **opcoes,
+            )
+        else:
+            tipo = _escolher_tipo(
+                "texto", distintos=validos.nunique() if categorizar_ids or not _coluna_id(col) else None,
+                total=len(validos), datas=converter_datas and _sao_datas(validos.to_numpy()), **opcoes,
+            )
+        if tipo is not None and tipo != str(serie.dtype):
+            esquema[col] = tipo
+    return esquema
+
+# Infere o esquema otimizado de uma tabela SQLite com consultas agregadas.
+def inferir_esquema_sql(conexao, tabela, limite_categoria=0.5, converter_datas=True, permitir_float32=False, categorizar_ids=False):
+    """
+    Mesmas regras de `inferir_esquema`, calculadas no SQLite com uma única varredura
+    agregada (COUNT, MIN, MAX, COUNT DISTINCT) mais uma pequena amostra de cada texto.
+    Textos cuja amostra parece data são conferidos na coluna inteira (GLOB) antes de
+    virarem datetime64.
+
+    Retorna:
+    - Dicionário coluna -> tipo.
+    """
+    colunas = [(linha[1], (linha[2] or "").upper()) for linha in conexao.execute(f"PRAGMA table_info({citar(tabela)})")]
+    expressoes = ["COUNT(*)"]
+    for nome, tipo in colunas:
+        c = citar(nome)
+        expressoes += [f"COUNT({c})", f"MIN({c})", f"MAX({c})"]
+        if "INT" in tipo or "REAL" in tipo or "FLOA" in tipo or "DOUB" in tipo:
+            expressoes.append(f"SUM({c} != CAST({c} AS INTEGER))")
+        else:
+            expressoes.append(f"COUNT(DISTINCT {c})")
+    linha = conexao.execute(f"SELECT {', '.join(expressoes)} FROM {citar(tabela)}").fetchone()
+
+    total, valores = linha[0], linha[1:]
+    opcoes = dict(limite_categoria=limite_categoria, converter_datas=converter_datas, permitir_float32=permitir_float32)
+    esquema = {}
+    for i, (nome, tipo) in enumerate(colunas):
+        nao_nulos, minimo, maximo, extra = valores[4 * i:4 * i + 4]
+        if nao_nulos == 0:
+            continue
+        if isinstance(minimo, str) or isinstance(maximo, str) or "INT" not in tipo and not any(t in tipo for t in ("REAL", "FLOA", "DOUB")):
+            amostra = [v for (v,) in conexao.execute(f"SELECT {citar(nome)} FROM {citar(tabela)} WHERE {citar(nome)} IS NOT NULL LIMIT 200")]
+            datas = converter_datas and _sao_datas(amostra)
+            if datas:
+                condicao = _NAO_DATA_SQL.format(c=citar(nome))
+                datas = conexao.execute(f"SELECT 1 FROM {citar(tabela)} WHERE {citar(nome)} IS NOT NULL AND {condicao} LIMIT 1").fetchone() is None
+            distintos = extra if not any(t in tipo for t in ("INT", "REAL", "FLOA", "DOUB")) else None
+            if _coluna_id(nome) and not categorizar_ids:
+                distintos = None
+            tipo_otimizado = _escolher_tipo("texto", distintos=distintos, total=nao_nulos, datas=datas, **opcoes)
+        else:
+            tipo_base = "int" if "INT" in tipo else "float"
+            tipo_otimizado = _escolher_tipo(
+                tipo_base, minimo, maximo, inteiros=(extra or 0) == 0, tem_nulos=nao_nulos < total, **opcoes,
+            )
+        if tipo_otimizado not in (None, "object", "float64"):
+            esquema[nome] = tipo_otimizado
+    return esquema
+
+# Grava o esquema de uma tabela na tabela de esquemas do banco.
+def gravar_esquema_sql(conexao, tabela, esquema):
+    """
+    Grava (substituindo) o esquema de uma tabela em `TABELA_ESQUEMAS`, para que os
+    leitores apliquem os tipos automaticamente.
+    """
+    conexao.execute(f"CREATE TABLE IF NOT EXISTS {citar(TABELA_ESQUEMAS)} (tabela TEXT, coluna TEXT, tipo TEXT, PRIMARY KEY (tabela, coluna))")
+    conexao.execute(f"DELETE FROM {citar(TABELA_ESQUEMAS)} WHERE tabela = ?", (tabela,))
+    conexao.executemany(f"INSERT INTO {citar(TABELA_ESQUEMAS)} VALUES (?, ?, ?)", [(tabela, col, tipo) for col, tipo in esquema.items()])
+
+# Lê o esquema gravado de uma tabela.
+def ler_esquema_sql(conexao, tabela):
+    """
+    Retorna o esquema gravado por `gravar_esquema_sql` (dicionário vazio se não houver).
+    """
+    if not existe_tabela(conexao, TABELA_ESQUEMAS):
+        return {}
+    return dict(conexao.execute(f"SELECT coluna, tipo FROM {citar(TABELA_ESQUEMAS)} WHERE tabela = ?", (tabela,)).fetchall())
+
+# Converte as colunas de um DataFrame conforme um esquema.
+def aplicar_esquema(df, esquema):
+    """
+    Aplica um esquema (coluna -> tipo) no DataFrame, coluna a coluna. Colunas ausentes
+    no DataFrame são ignoradas; inteiros com nulos usam o tipo anulável do pandas.
+    Uma coluna de datas com algum valor que não é data fica como texto (com um aviso),
+    em vez de perder esses valores como NaT.
+
+    Retorna:
+    - DataFrame com os tipos convertidos.
+    """
+    for col, tipo in esquema.items():
+        if col not in df.columns:
+            continue
+        if tipo.startswith("datetime"):
+            datas = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
+            falhas = int((datas.isna() & df[col].notna()).sum())
+            if falhas:
+                warnings.warn(f"{falhas} valores de '{col}' não são datas; a coluna foi mantida como texto.")
+                continue
+            df[col] = datas
+        elif tipo.lower().startswith("int") and df[col].isna().any():
+            df[col] = df[col].astype(tipo.capitalize())
+        else:
+            df[col] = df[col].astype(tipo)
+    invalidar_perfil(df)
     return df
 
+# Reduz o uso de memória do DataFrame convertendo cada coluna para o tipo mais compacto.
+def otimizar_memoria(df, limite_categoria=0.5, converter_datas=True, permitir_float32=False, esquema=None, categorizar_ids=False):
+    """
+    Reduz a memória de um DataFrame: inteiros e floats inteiros vão para o menor tipo
+    inteiro possível, textos com poucos valores distintos (ex: customer_state,
+    payment_type, order_status) viram 'category' e textos de data viram datetime64.
+    As colunas são convertidas uma a uma no próprio DataFrame.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - limite_categoria: Razão máxima distintos/não nulos para converter texto em 'category'.
+    - converter_datas: Se True, converte textos de data/hora em datetime64.
+    - permitir_float32: Se True, reduz floats não inteiros para float32 (com perda de precisão).
+    - esquema: Esquema pronto (ex: de uma execução anterior); se None, é inferido.
+    - categorizar_ids: Se True, colunas de identificador (id, *_id) também podem virar 'category'.
+
+    Retorna:
+    - ResultadoOtimizacao com o DataFrame, o relatório por coluna e o esquema aplicado.
+    """
+    if esquema is None:
+        esquema = inferir_esquema(df, limite_categoria, converter_datas, permitir_float32, categorizar_ids)
+
+    tipos_antes = df.dtypes.astype(str)
+    memoria_antes = df.memory_usage(deep=True, index=False)
+    aplicar_esquema(df, esquema)
+    memoria_depois = df.memory_usage(deep=True, index=False)
+
+    relatorio = pd.DataFrame({
+        "tipo_antes": tipos_antes,
+        "tipo_depois": df.dtypes.astype(str),
+        "memoria_antes": memoria_antes,
+        "memoria_depois": memoria_depois,
+    })
+    relatorio["reducao (%)"] = (1 - relatorio["memoria_depois"] / relatorio["memoria_antes"]) * 100
+    # Linha de total só com as colunas numéricas (os tipos ficam nulos)
+    total = pd.DataFrame(
+        {"memoria_antes": [memoria_antes.sum()], "memoria_depois": [memoria_depois.sum()],
+         "reducao (%)": [(1 - memoria_depois.sum() / memoria_antes.sum()) * 100]},
+        index=["Total"],
+    )
+    relatorio = pd.concat([relatorio, total])
+    return ResultadoOtimizacao(df=df, relatorio=relatorio, esquema=esquema)
+
 # Retorna estatísticas como média, mediana, desvio padrão, mínimo e máximo de cada coluna numérica.
-def gerar_resumo_estatistico(df):
+def gerar_resumo_estatistico(df, atualizar=False):
     """
     Retorna um resumo estatístico do DataFrame, incluindo média, mediana, desvio padrão, mínimo e máximo.
 
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - atualizar: Se True, recalcula o perfil em vez de usar o cache.
+
     Retorna:
     - DataFrame com resumo estatístico.
     """
-    resumo = df.describe().T
-    resumo["mediana"] = df.median()
-    return resumo[["count", "mean", "mediana", "std", "min", "max"]]
+    perfil = perfilar_tabela(df, atualizar).colunas
+    resumo = perfil.loc[perfil["numerica"], ["count", "mean", "median", "std", "min", "max"]]
+    resumo = resumo.rename(columns={"median": "mediana"}).astype("float64")
+    if isinstance(df, pd.Series):
+        return resumo.iloc[0].rename(df.name)
+    return resumo
 
 # Tratar valores nulos (NaN) em um DataFrame. A função permitirá a escolha do método de tratamento...
 def trata_valores_nulos(df: pd.DataFrame, metodo: str = 'remover', valor: float = None) -> pd.DataFrame:
@@ -193,22 +860,22 @@ def trata_valores_nulos(df: pd.DataFrame, metodo: str = 'remover', valor: float
         return df.dropna()
 
     elif metodo == 'preencher_medio':
-        # Preenche os valores nulos com a média da coluna
-        return df.fillna(df.mean())
+        # Preenche os valores nulos com a média das colunas numéricas
+        return imputar_nulos(df, "media")
 
     elif metodo == 'preencher_mediana':
-        # Preenche os valores nulos com a mediana da coluna
-        return df.fillna(df.median())
+        # Preenche os valores nulos com a mediana das colunas numéricas
+        return imputar_nulos(df, "mediana")
 
     elif metodo == 'preencher_moda':
         # Preenche os valores nulos com a moda da coluna
-        return df.apply(lambda col: col.fillna(col.mode()[0]))
+        return imputar_nulos(df, "moda")
 
     elif metodo == 'preencher_valor':
         if valor is None:
             raise ValueError("É necessário fornecer um valor para preencher os valores nulos.")
         # Preenche os valores nulos com um valor específico
-        return df.fillna(valor)
+        return imputar_nulos(df, {col: valor for col in df.columns})
 
     else:
         raise ValueError("Método inválido. Escolha entre 'remover', 'preencher_medio', 'preencher_mediana', 'preencher_moda' ou 'preencher_valor'.")
@@ -222,6 +889,64 @@ def normalizar_texto(texto):
     - texto (str): String a ser normalizada.
 
     Retorna:
-    - str: Texto sem acentos e em minúsculas.
+    - str: Texto sem acentos e em minúsculas (valores que não são str, como NaN, voltam inalterados).
     """
-    return unidecode.unidecode(texto).lower()
\ No newline at end of file
+    if not isinstance(texto, str):
+        return texto
+    return _normalizar_texto_cache(texto)
+
+@lru_cache(maxsize=65536)
+def _normalizar_texto_cache(texto):
+    return unidecode.unidecode(texto).lower()
+
+# Normaliza os valores distintos de uma lista, em paralelo quando a lista é grande.
+def _normalizar_unicos(valores, processos, limite_paralelo):
+    if processos and processos > 1 and len(valores) >= limite_paralelo:
+        tamanho_bloco = max(1, len(valores) // (processos * 4))
+        with ProcessPoolExecutor(processos) as executor:
+            return list(executor.map(normalizar_texto, valores, chunksize=tamanho_bloco))
+    return [normalizar_texto(v) for v in valores]
+
+# Normaliza várias colunas de texto aplicando `normalizar_texto` só aos valores distintos.
+def normalizar_colunas_texto(df, colunas, como_categoria=False, processos=None, limite_paralelo=200_000):
+    """
+    Remove acentos e transforma em minúsculas várias colunas de texto.
+
+    Cada coluna é fatorada (`pd.factorize`), só os valores distintos são normalizados
+    (ex: ~4 mil cidades em vez de ~100 mil linhas) e o resultado volta para as linhas
+    pelos códigos, de forma vetorizada. Nulos são preservados.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - colunas: Nome da coluna ou lista de colunas (ex: ['customer_city', 'seller_city']).
+    - como_categoria: Se True, grava as colunas como dtype 'category' (menos memória).
+    - processos: Número de processos para normalizar conjuntos grandes de valores distintos.
+    - limite_paralelo: Quantidade mínima de valores distintos para usar o pool de processos.
+
+    Retorna:
+    - DataFrame com as colunas normalizadas.
+    """
+    if isinstance(colunas, str):
+        colunas = [colunas]
+
+    for col in colunas:
+        codigos, unicos = pd.factorize(df[col], use_na_sentinel=True)
+        if len(unicos) == 0:
+            continue
+        normalizados = _normalizar_unicos(list(unicos), processos, limite_paralelo)
+
+        # Valores distintos podem colapsar no mesmo texto ('São Paulo' e 'sao paulo')
+        codigos_norm, categorias = pd.factorize(pd.Index(normalizados, dtype=object))
+        codigos_finais = np.where(codigos >= 0, codigos_norm[codigos], -1)
+        coluna = pd.Categorical.from_codes(codigos_finais, categories=categorias)
+
+        if como_categoria:
+            df[col] = pd.Series(coluna, index=df.index)
+        else:
+            df[col] = pd.Series(np.asarray(coluna, dtype=object), index=df.index)
+
+    invalidar_perfil(df)
+    return df
+
+# Mede as funções públicas do módulo quando a instrumentação estiver ativa.
+instrumentar_modulo(globals())
@@ -0,0 +1,185 @@
+import json
+import os
+import sqlite3
+import warnings
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+    _TEM_PYARROW = True
+except ImportError:
+    _TEM_PYARROW = False
+
+try:
+    from .data_preprocessing import aplicar_esquema, ler_esquema_sql
+    from .sqlite_utils import citar, existe_tabela
+except ImportError:
+    from data_preprocessing import aplicar_esquema, ler_esquema_sql
+    from sqlite_utils import citar, existe_tabela
+
+# Leitores abertos: (caminho absoluto do banco, diretório de cache) -> LeitorTabelas.
+_LEITORES = {}
+
+# Diretório padrão dos snapshots de um banco: snapshots/<nome do banco> ao lado dele.
+def _diretorio_cache_padrao(db_path):
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), "snapshots", base)
+
+class LeitorTabelas:
+    """
+    Leitor das tabelas de um banco SQLite (ex: stg_data.db) com uma conexão única e um
+    cache de snapshots colunares em Feather.
+
+    Na primeira leitura a tabela é materializada em `<diretorio_cache>/<tabela>.feather`;
+    as leituras seguintes carregam o snapshot com memory map e projeção de colunas. O
+    snapshot é descartado quando o mtime do banco (incluindo o arquivo -wal) ou a
+    quantidade de linhas da tabela mudam.
+
+    Se o banco tiver o esquema otimizado gravado pelo loader (`gravar_esquema_sql`), os
+    tipos (inteiros compactos, 'category', datetime64) são aplicados antes do snapshot.
+
+    Sem o `pyarrow` instalado, as leituras vão direto ao SQLite (com projeção de colunas).
+    """
+
+    def __init__(self, db_path, diretorio_cache=None):
+        self.db_path = os.path.abspath(db_path)
+        if diretorio_cache is None:
+            diretorio_cache = _diretorio_cache_padrao(self.db_path)
+        self.diretorio_cache = diretorio_cache
+        self._conexao = None
+
+    @property
+    def conexao(self):
+        """Conexão SQLite compartilhada (aberta na primeira utilização)."""
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.db_path)
+        return self._conexao
+
+    def fechar(self):
+        """Fecha a conexão compartilhada."""
+        if self._conexao is not None:
+            self._conexao.close()
+            self._conexao = None
+
+    def tabelas(self):
+        """Lista as tabelas do banco."""
+        cursor = self.conexao.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+        return [linha[0] for linha in cursor.fetchall()]
+
+    def _caminhos(self, tabela):
+        base = os.path.join(self.diretorio_cache, tabela)
+        return base + ".feather", base + ".json"
+
+    def versao(self, tabela):
+        """
+        Versão atual da tabela: mtime do banco (e do -wal com dados) e quantidade de
+        linhas. Muda sempre que o banco é gravado; é o que valida os snapshots.
+
+        Levanta FileNotFoundError se o banco não existir e KeyError se a tabela não
+        existir nele (inclusive num banco vazio).
+        """
+        # Verifica antes de conectar: `sqlite3.connect` criaria um banco vazio no caminho
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"Banco {self.db_path} não encontrado.")
+        if not existe_tabela(self.conexao, tabela):
+            raise KeyError(f"Tabela {tabela!r} não encontrada em {self.db_path}.")
+        # O -wal vazio é criado por qualquer leitor em modo WAL; só conta se tiver dados
+        mtime = max(
+            os.stat(caminho).st_mtime_ns
+            for caminho in (self.db_path, self.db_path + "-wal")
+            if os.path.exists(caminho) and os.path.getsize(caminho) > 0
+        )
+        linhas = self.conexao.execute(f"SELECT COUNT(*) FROM {citar(tabela)}").fetchone()[0]
+        return {"mtime_ns": mtime, "linhas": linhas}
+
+    def snapshot_valido(self, tabela):
+        """Indica se o snapshot da tabela existe e corresponde ao estado atual do banco."""
+        arquivo, metadados = self._caminhos(tabela)
+        if not (os.path.exists(arquivo) and os.path.exists(metadados)):
+            return False
+        with open(metadados, encoding="utf-8") as f:
+            return json.load(f) == self.versao(tabela)
+
+    def materializar(self, tabela):
+        """Lê a tabela inteira do SQLite e grava o snapshot Feather com seus metadados."""
+        arquivo, metadados = self._caminhos(tabela)
+        os.makedirs(self.diretorio_cache, exist_ok=True)
+        assinatura = self.versao(tabela)
+        df = aplicar_esquema(pd.read_sql_query(f"SELECT * FROM {citar(tabela)}", self.conexao), ler_esquema_sql(self.conexao, tabela))
+
+        # Grava em arquivos temporários e troca no final: outros processos nunca leem um snapshot pela metade
+        sufixo = f".{os.getpid()}.tmp"
+        df.to_feather(arquivo + sufixo)
+        with open(metadados + sufixo, "w", encoding="utf-8") as f:
+            json.dump(assinatura, f)
+        os.replace(arquivo + sufixo, arquivo)
+        os.replace(metadados + sufixo, metadados)
+        return df
+
+    def ler(self, tabela, colunas=None):
+        """
+        Lê uma tabela usando o snapshot colunar quando ele é válido.
+
+        Parâmetros:
+        - tabela: Nome da tabela (ex: 'stg_olist_customers').
+        - colunas: Lista de colunas a retornar (se None, todas).
+
+        Retorna:
+        - DataFrame com os dados da tabela.
+        """
+        if not _TEM_PYARROW:
+            selecao = ", ".join(citar(c) for c in colunas) if colunas else "*"
+            df = pd.read_sql_query(f"SELECT {selecao} FROM {citar(tabela)}", self.conexao)
+            return aplicar_esquema(df, ler_esquema_sql(self.conexao, tabela))
+
+        if not self.snapshot_valido(tabela):
+            df = self.materializar(tabela)
+            return df[list(colunas)] if colunas else df
+
+        arquivo, _ = self._caminhos(tabela)
+        tabela_arrow = feather.read_table(arquivo, columns=list(colunas) if colunas else None, memory_map=True)
+        return tabela_arrow.to_pandas()
+
+    def invalidar(self, tabela=None):
+        """Remove o snapshot de uma tabela (ou de todas, se `tabela` for None)."""
+        if tabela is not None:
+            tabelas = [tabela]
+        elif os.path.isdir(self.diretorio_cache):
+            tabelas = [os.path.splitext(f)[0] for f in os.listdir(self.diretorio_cache) if f.endswith(".json")]
+        else:
+            tabelas = []
+        for nome in tabelas:
+            for caminho in self._caminhos(nome):
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+
+# Retorna o leitor compartilhado de um banco, criando-o na primeira chamada.
+def obter_leitor(db_path, diretorio_cache=None):
+    """
+    Retorna o LeitorTabelas do banco, reaproveitando a mesma conexão entre chamadas.
+    Há um leitor por banco e diretório de cache: chamadas com outro `diretorio_cache`
+    recebem um leitor próprio, que grava os snapshots nesse diretório.
+    """
+    db_path = os.path.abspath(db_path)
+    chave = (db_path, os.path.abspath(diretorio_cache or _diretorio_cache_padrao(db_path)))
+    if chave not in _LEITORES:
+        if not _TEM_PYARROW:
+            warnings.warn("pyarrow não instalado: snapshots desativados, lendo direto do SQLite.")
+        _LEITORES[chave] = LeitorTabelas(db_path, diretorio_cache)
+    return _LEITORES[chave]
+
+# Lê uma tabela do banco de staging usando o cache de snapshots.
+def ler_tabela(db_path, tabela, colunas=None):
+    """
+    Lê uma tabela do banco SQLite com cache de snapshot colunar e conexão compartilhada.
+
+    Parâmetros:
+    - db_path: Caminho do banco (ex: data/processed/stg_data.db).
+    - tabela: Nome da tabela.
+    - colunas: Lista de colunas a retornar (se None, todas).
+
+    Retorna:
+    - DataFrame com os dados da tabela.
+    """
+    return obter_leitor(db_path).ler(tabela, colunas)
@@ -0,0 +1,874 @@
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sqlite_utils import citar, colunas_tabela, conectar
+except ImportError:
+    from sqlite_utils import citar, colunas_tabela, conectar
+
+# Tamanho padrão dos blocos lidos do cursor SQLite.
+TAMANHO_CHUNK = 100_000
+
+# Lê uma tabela (ou consulta) do SQLite em blocos de tamanho fixo.
+def ler_chunks_sql(conexao, tabela, colunas=None, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Lê uma tabela SQLite em blocos de `tamanho_chunk` linhas via `fetchmany`, sem
+    carregar a tabela inteira em memória.
+
+    Parâmetros:
+    - conexao: Conexão sqlite3 aberta.
+    - tabela: Nome da tabela.
+    - colunas: Lista de colunas a ler (se None, lê todas).
+    - tamanho_chunk: Número de linhas por bloco.
+
+    Retorna:
+    - Gerador de DataFrames.
+    """
+    selecao = ", ".join(citar(c) for c in colunas) if colunas else "*"
+    cursor = conexao.execute(f"SELECT {selecao} FROM {citar(tabela)}")
+    nomes = [d[0] for d in cursor.description]
+    try:
+        while True:
+            linhas = cursor.fetchmany(tamanho_chunk)
+            if not linhas:
+                break
+            yield pd.DataFrame.from_records(linhas, columns=nomes)
+    finally:
+        cursor.close()
+
+# Identifica as colunas numéricas pela afinidade do tipo declarado no SQLite.
+def colunas_numericas_sql(conexao, tabela):
+    numericas = []
+    for _, nome, tipo, *_ in conexao.execute(f"PRAGMA table_info({citar(tabela)})"):
+        tipo = (tipo or "").upper()
+        if any(afinidade in tipo for afinidade in ("INT", "REAL", "FLOA", "DOUB", "NUM", "DEC")):
+            numericas.append(nome)
+    return numericas
+
+# Colunas sem afinidade numérica (sem tipo, TEXT, ...) cujos valores parecem números.
+def _colunas_numericas_por_valor(conexao, tabela, declaradas, amostra=1000):
+    """
+    Candidatas a numéricas entre as colunas não declaradas como numéricas: as primeiras
+    `amostra` linhas não nulas precisam ser todas números (ou textos de números). Quem
+    usa confere a coluna inteira na leitura.
+    """
+    candidatas = []
+    for col in colunas_tabela(conexao, tabela):
+        if col in declaradas:
+            continue
+        consulta = f"SELECT {citar(col)} FROM {citar(tabela)} WHERE {citar(col)} IS NOT NULL LIMIT {int(amostra)}"
+        valores = pd.Series([v for (v,) in conexao.execute(consulta)], dtype=object)
+        if len(valores) and pd.to_numeric(valores, errors="coerce").notna().all():
+            candidatas.append(col)
+    return candidatas
+
+# Converte as colunas numéricas de um bloco em uma matriz float64.
+def _matriz_numerica(chunk, colunas):
+    return np.column_stack(
+        [pd.to_numeric(chunk[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan) for c in colunas]
+    ) if len(colunas) else np.empty((len(chunk), 0))
+
+class AcumuladorMomentos:
+    """
+    Acumulador online e mesclável de count, média, M2, M3, mínimo e máximo para várias
+    colunas ao mesmo tempo (fórmulas de combinação de Chan/Pébay).
+
+    Cada bloco é resumido de forma vetorizada e combinado ao estado atual, então dois
+    acumuladores de partes diferentes da tabela podem ser unidos com `mesclar`.
+    """
+
+    def __init__(self, n_colunas):
+        self.n = np.zeros(n_colunas)
+        self.media = np.zeros(n_colunas)
+        self.m2 = np.zeros(n_colunas)
+        self.m3 = np.zeros(n_colunas)
+        self.minimo = np.full(n_colunas, np.inf)
+        self.maximo = np.full(n_colunas, -np.inf)
+
+    def atualizar(self, matriz):
+        """Incorpora um bloco (matriz float64 com NaN para nulos)."""
+        validos = ~np.isnan(matriz)
+        n = validos.sum(axis=0).astype("float64")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = np.where(n > 0, np.where(validos, matriz, 0.0).sum(axis=0) / n, 0.0)
+        desvio = np.where(validos, matriz - media, 0.0)
+        bloco = AcumuladorMomentos(matriz.shape[1])
+        bloco.n = n
+        bloco.media = media
+        bloco.m2 = (desvio ** 2).sum(axis=0)
+        bloco.m3 = (desvio ** 3).sum(axis=0)
+        if len(matriz):
+            bloco.minimo = np.where(n > 0, np.nanmin(np.where(validos, matriz, np.inf), axis=0), np.inf)
+            bloco.maximo = np.where(n > 0, np.nanmax(np.where(validos, matriz, -np.inf), axis=0), -np.inf)
+        self.mesclar(bloco)
+
+    def mesclar(self, outro):
+        """Combina o estado de outro acumulador com as mesmas colunas."""
+        n = self.n + outro.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = outro.media - self.media
+            media = np.where(n > 0, self.media + delta * outro.n / n, 0.0)
+            m2 = self.m2 + outro.m2 + delta ** 2 * self.n * outro.n / n
+            m3 = (
+                self.m3 + outro.m3
+                + delta ** 3 * self.n * outro.n * (self.n - outro.n) / n ** 2
+                + 3 * delta * (self.n * outro.m2 - outro.n * self.m2) / n
+            )
+        self.m2 = np.where(n > 0, m2, 0.0)
+        self.m3 = np.where(n > 0, m3, 0.0)
+        self.media = media
+        self.n = n
+        self.minimo = np.minimum(self.minimo, outro.minimo)
+        self.maximo = np.maximum(self.maximo, outro.maximo)
+
+    def selecionar(self, posicoes):
+        """Novo acumulador só com as colunas nas `posicoes` informadas."""
+        selecionado = AcumuladorMomentos(len(posicoes))
+        for atributo in ("n", "media", "m2", "m3", "minimo", "maximo"):
+            setattr(selecionado, atributo, getattr(self, atributo)[posicoes])
+        return selecionado
+
+    @property
+    def desvio_padrao(self):
+        """Desvio padrão amostral (ddof=1), como no pandas."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    @property
+    def skewness(self):
+        """Skewness amostral ajustada (mesma fórmula de `Series.skew`)."""
+        n = self.n
+        m2 = np.where(np.abs(self.m2) < 1e-14, 0.0, self.m2)
+        m3 = np.where(np.abs(self.m3) < 1e-14, 0.0, self.m3)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            skew = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+        skew = np.where(m2 == 0, 0.0, skew)
+        return np.where(n < 3, np.nan, skew)
+
+class SketchQuantis:
+    """
+    Sketch KLL de quantis aproximados com memória limitada a O(k log(n/k)) valores.
+
+    Os valores entram no nível 0; quando um nível passa da capacidade ele é ordenado e
+    metade dos itens (posições pares ou ímpares, sorteadas) sobe para o nível seguinte
+    com o dobro do peso. O erro de rank normalizado fica em torno de 1.7/k
+    (~0,4% com k=400).
+    """
+
+    def __init__(self, k=400, semente=None):
+        self.k = k
+        self.n = 0
+        self.niveis = [np.empty(0)]
+        self._rng = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis)
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (altura - nivel - 1))))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                impar = len(itens) % 2
+                promovidos = itens[impar + self._rng.integers(2)::2]
+                self.niveis[nivel] = itens[:impar]
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+            nivel += 1
+
+    def atualizar(self, valores):
+        """Incorpora um array de valores (NaN são ignorados)."""
+        valores = np.asarray(valores, dtype="float64")
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return
+        self.n += len(valores)
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+
+    def mesclar(self, outro):
+        """Combina outro sketch a este."""
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self._compactar()
+
+    @property
+    def erro_rank(self):
+        """Erro de rank normalizado esperado dos quantis (~1.7/k)."""
+        return 1.7 / self.k
+
+    def quantil(self, q):
+        """
+        Retorna o(s) quantil(is) aproximado(s) para `q` (escalar ou lista em [0, 1]).
+        """
+        escalar = np.isscalar(q)
+        q = np.atleast_1d(np.asarray(q, dtype="float64"))
+        if self.n == 0:
+            resultado = np.full(len(q), np.nan)
+            return resultado[0] if escalar else resultado
+
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.niveis)])
+        ordem = np.argsort(itens, kind="stable")
+        itens, pesos = itens[ordem], pesos[ordem]
+        # Rank do centro de cada item, interpolando como o método linear do pandas
+        centros = (np.cumsum(pesos) - pesos / 2) / pesos.sum()
+        resultado = np.interp(q, centros, itens)
+        return resultado[0] if escalar else resultado
+
+@dataclass
+class EstatisticasStreaming:
+    """
+    Estatísticas de uma tabela acumuladas bloco a bloco por `acumular_estatisticas_sql`.
+
+    Atributos:
+    - tabela: Nome da tabela.
+    - n_linhas: Total de linhas lidas.
+    - nulos: Series com a quantidade de nulos por coluna (todas as colunas).
+    - numericas: Lista das colunas numéricas (declaradas com afinidade numérica ou com
+      todos os valores numéricos).
+    - momentos: AcumuladorMomentos das colunas numéricas.
+    - sketches: Dicionário coluna -> SketchQuantis.
+    """
+    tabela: str
+    n_linhas: int
+    nulos: pd.Series
+    numericas: list
+    momentos: AcumuladorMomentos
+    sketches: dict = field(default_factory=dict)
+
+    def quantis(self, qs):
+        """DataFrame com os quantis aproximados (linhas) de cada coluna numérica."""
+        return pd.DataFrame(
+            {col: self.sketches[col].quantil(qs) for col in self.numericas}, index=qs
+        )
+
+# Percorre a tabela uma única vez acumulando nulos, momentos e sketches de quantis.
+def acumular_estatisticas_sql(fonte, tabela, tamanho_chunk=TAMANHO_CHUNK, k=400, semente=0):
+    """
+    Lê a tabela em blocos e acumula, em memória constante, nulos por coluna, momentos
+    (count, média, variância, skew, min/max) e um sketch KLL de quantis por coluna numérica.
+
+    São numéricas as colunas declaradas com afinidade numérica (INTEGER, REAL, NUMERIC...)
+    e as sem tipo ou de texto cujos valores não nulos são todos números: estas entram
+    pela amostra inicial e saem no fim se algum valor não for número.
+
+    Parâmetros:
+    - fonte: Caminho do banco SQLite (ex: stg_data.db) ou conexão sqlite3 aberta.
+    - tabela: Nome da tabela (ex: 'stg_olist_geolocation').
+    - tamanho_chunk: Número de linhas por bloco.
+    - k: Parâmetro de precisão do sketch de quantis.
+    - semente: Semente do sorteio do sketch (resultados reprodutíveis).
+
+    Retorna:
+    - EstatisticasStreaming.
+    """
+    conexao, fechar = conectar(fonte)
+    try:
+        declaradas = colunas_numericas_sql(conexao, tabela)
+        numericas = declaradas + _colunas_numericas_por_valor(conexao, tabela, declaradas)
+        momentos = AcumuladorMomentos(len(numericas))
+        sketches = {col: SketchQuantis(k=k, semente=semente) for col in numericas}
+        nulos = None
+        n_linhas = 0
+        falhas = np.zeros(len(numericas), dtype="int64")
+
+        for chunk in ler_chunks_sql(conexao, tabela, tamanho_chunk=tamanho_chunk):
+            n_linhas += len(chunk)
+            nulos_chunk = chunk.isna().sum()
+            nulos = nulos_chunk if nulos is None else nulos + nulos_chunk
+
+            matriz = _matriz_numerica(chunk, numericas)
+            falhas += (np.isnan(matriz) & chunk[numericas].notna().to_numpy(dtype=bool)).sum(axis=0)
+            momentos.atualizar(matriz)
+            for j, col in enumerate(numericas):
+                sketches[col].atualizar(matriz[:, j])
+
+        if nulos is None:
+            cursor = conexao.execute(f"SELECT * FROM {citar(tabela)} LIMIT 0")
+            nulos = pd.Series(0, index=[d[0] for d in cursor.description])
+
+        # Candidatas com algum valor que não é número não são numéricas
+        manter = [j for j in range(len(numericas)) if j < len(declaradas) or falhas[j] == 0]
+        if len(manter) < len(numericas):
+            momentos = momentos.selecionar(manter)
+            numericas = [numericas[j] for j in manter]
+            sketches = {col: sketches[col] for col in numericas}
+    finally:
+        if fechar:
+            conexao.close()
+
+    return EstatisticasStreaming(
+        tabela=tabela, n_linhas=n_linhas, nulos=nulos.astype("int64"),
+        numericas=numericas, momentos=momentos, sketches=sketches,
+    )
+
+# Versão streaming de `gerar_resumo_estatistico` para tabelas do stg_data.db.
+def gerar_resumo_estatistico_sql(fonte, tabela, tamanho_chunk=TAMANHO_CHUNK, estatisticas=None):
+    """
+    Retorna o mesmo resumo de `gerar_resumo_estatistico` lendo a tabela em blocos.
+
+    count, média, desvio padrão, mínimo e máximo são exatos (diferenças só de
+    arredondamento, < 1e-9 relativo). A mediana vem do sketch KLL, com erro de rank
+    normalizado em torno de 0,5%.
+
+    Parâmetros:
+    - fonte: Caminho do banco SQLite ou conexão sqlite3 aberta.
+    - tabela: Nome da tabela.
+    - tamanho_chunk: Número de linhas por bloco.
+    - estatisticas: EstatisticasStreaming já acumuladas (opcional, evita reler a tabela).
+
+    Retorna:
+    - DataFrame com resumo estatístico.
+    """
+    if estatisticas is None:
+        estatisticas = acumular_estatisticas_sql(fonte, tabela, tamanho_chunk)
+    m = estatisticas.momentos
+    tem_valor = m.n > 0
+    return pd.DataFrame(
+        {
+            "count": m.n,
+            "mean": np.where(tem_valor, m.media, np.nan),
+            "mediana": [estatisticas.sketches[c].quantil(0.5) for c in estatisticas.numericas],
+            "std": m.desvio_padrao,
+            "min": np.where(tem_valor, m.minimo, np.nan),
+            "max": np.where(tem_valor, m.maximo, np.nan),
+        },
+        index=pd.Index(estatisticas.numericas),
+    )
+
+# Versão streaming de `contar_valores_nulos` para tabelas do stg_data.db.
+def contar_valores_nulos_sql(fonte, tabela, tamanho_chunk=TAMANHO_CHUNK, estatisticas=None):
+    """
+    Retorna a quantidade e o percentual de valores nulos por coluna lendo a tabela em
+    blocos. O resultado é exato.
+    """
+    if estatisticas is None:
+        estatisticas = acumular_estatisticas_sql(fonte, tabela, tamanho_chunk)
+    total_nulos = estatisticas.nulos
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentual_nulos = total_nulos / estatisticas.n_linhas * 100
+    return pd.DataFrame({"Total Nulos": total_nulos, "Percentual (%)": percentual_nulos})
+
+# Versão streaming de `detectar_skewness` para tabelas do stg_data.db.
+def detectar_skewness_sql(fonte, tabela, tamanho_chunk=TAMANHO_CHUNK, estatisticas=None):
+    """
+    Calcula o skewness das colunas numéricas com acumuladores online mescláveis.
+    O resultado coincide com `detectar_skewness` a menos de arredondamento (< 1e-9 relativo).
+    """
+    if estatisticas is None:
+        estatisticas = acumular_estatisticas_sql(fonte, tabela, tamanho_chunk)
+    skew_values = pd.Series(estatisticas.momentos.skewness, index=pd.Index(estatisticas.numericas))
+    return pd.DataFrame({"Skewness": skew_values}).sort_values(by="Skewness", ascending=False)
+
+# Versão streaming de `outliers_por_coluna` para tabelas do stg_data.db.
+def outliers_por_coluna_sql(fonte, tabela, metodo="iqr", fator=1.5, tamanho_chunk=TAMANHO_CHUNK, estatisticas=None):
+    """
+    Conta os outliers de cada coluna numérica em duas passadas de memória constante:
+    a primeira acumula média/desvio ou os quartis (sketch KLL) e a segunda conta os
+    valores fora dos limites. Se `estatisticas` for informado, a primeira passada é pulada.
+
+    Com 'desvio_padrao' a contagem é exata. Com 'iqr' os quartis são aproximados
+    (erro de rank ~0,5%), então a contagem pode diferir levemente da versão em memória.
+
+    Retorna:
+    - DataFrame com a contagem de outliers por coluna.
+    """
+    conexao, fechar = conectar(fonte)
+    try:
+        if estatisticas is None:
+            estatisticas = acumular_estatisticas_sql(conexao, tabela, tamanho_chunk)
+        numericas = estatisticas.numericas
+
+        if metodo == "desvio_padrao":
+            intervalo = fator * estatisticas.momentos.desvio_padrao
+            limite_inferior = estatisticas.momentos.media - intervalo
+            limite_superior = estatisticas.momentos.media + intervalo
+        elif metodo == "iqr":
+            quartis = estatisticas.quantis([0.25, 0.75]).to_numpy()
+            iqr = quartis[1] - quartis[0]
+            limite_inferior = quartis[0] - fator * iqr
+            limite_superior = quartis[1] + fator * iqr
+        else:
+            raise ValueError("Método inválido. Escolha entre 'desvio_padrao' ou 'iqr'.")
+
+        contagem = np.zeros(len(numericas), dtype="int64")
+        if numericas:
+            for chunk in ler_chunks_sql(conexao, tabela, numericas, tamanho_chunk):
+                matriz = _matriz_numerica(chunk, numericas)
+                with np.errstate(invalid="ignore"):
+                    contagem += ((matriz < limite_inferior) | (matriz > limite_superior)).sum(axis=0)
+    finally:
+        if fechar:
+            conexao.close()
+
+    return pd.DataFrame({"Outliers": contagem}, index=pd.Index(numericas))
+
+@dataclass
+class TabelaFrequencias:
+    """
+    Frequências de uma coluna da maior para a menor, compartilhadas por `contar_categorias`,
+    `plot_barras`, `plot_pie_chart` e `plotar_distribuicoes_multiplas_colunas`.
+
+    Atributos:
+    - contagens: Series valor -> frequência em ordem decrescente (como `value_counts`).
+    - total: Quantidade de valores não nulos contados.
+    - distintos: Quantidade de valores distintos (None quando a contagem é aproximada).
+    - erros: Series com a superestimativa máxima de cada contagem (None quando exata).
+    """
+    contagens: pd.Series
+    total: int
+    distintos: int = None
+    erros: pd.Series = None
+
+    @property
+    def exata(self):
+        """Indica se as contagens são exatas."""
+        return self.erros is None
+
+    def top(self, n):
+        """Os `n` valores mais frequentes (cópia da fatia das contagens já ordenadas, O(n))."""
+        return self.contagens.iloc[:n].copy()
+
+    def copia(self):
+        """Cópia independente, sem Series compartilhadas com a original (ex: a do cache)."""
+        erros = None if self.erros is None else self.erros.copy()
+        return TabelaFrequencias(contagens=self.contagens.copy(), total=self.total, distintos=self.distintos, erros=erros)
+
+    def com_outros(self, n, rotulo="Outros"):
+        """
+        Os `n` valores mais frequentes mais uma entrada `rotulo` com a soma dos demais,
+        calculada pelo total (sem percorrer a cauda).
+
+        Retorna:
+        - Tupla (Series, quantidade de categorias agregadas em `rotulo`).
+        """
+        distintos = len(self.contagens) if self.distintos is None else self.distintos
+        if distintos <= n:
+            return self.contagens.copy(), 0
+        topo = self.contagens.iloc[:n].copy()
+        topo.loc[rotulo] = self.total - topo.sum()
+        return topo, distintos - n
+
+class SketchFrequencias:
+    """
+    Resumo Space-Saving dos valores mais frequentes de um fluxo, com no máximo `k` contadores.
+
+    Cada bloco é contado com `value_counts` e fundido ao resumo: os valores que ainda não
+    estão nele herdam o menor contador como erro, e só os `k` maiores contadores ficam.
+    Todo valor com mais de n/k ocorrências está no resumo, e cada contagem superestima a
+    real em no máximo o seu erro (que nunca passa de n/k).
+    """
+
+    def __init__(self, k=1000):
+        self.k = k
+        self.n = 0
+        self.contagens = pd.Series(dtype="int64")
+        self.erros = pd.Series(dtype="int64")
+
+    @property
+    def minimo(self):
+        """Menor contador quando o resumo está cheio (0 enquanto houver espaço)."""
+        return int(self.contagens.iloc[-1]) if len(self.contagens) >= self.k else 0
+
+    def atualizar(self, valores):
+        """Incorpora um array de valores (nulos são ignorados)."""
+        self.atualizar_contagens(pd.Series(valores).value_counts())
+
+    def atualizar_contagens(self, contagens):
+        """Incorpora as contagens exatas de um bloco (Series valor -> frequência)."""
+        contagens = contagens[contagens > 0]
+        if len(contagens) == 0:
+            return
+        minimo = self.minimo
+        indice = self.contagens.index.append(contagens.index.difference(self.contagens.index, sort=False))
+        novas = self.contagens.reindex(indice, fill_value=minimo).to_numpy() + contagens.reindex(indice, fill_value=0).to_numpy()
+        erros = self.erros.reindex(indice, fill_value=minimo).to_numpy()
+        ordem = np.argsort(-novas, kind="stable")[:self.k]
+        self.contagens = pd.Series(novas[ordem], index=indice[ordem])
+        self.erros = pd.Series(erros[ordem], index=indice[ordem])
+        self.n += int(contagens.sum())
+
+    def tabela(self):
+        """TabelaFrequencias com as contagens do resumo e seus erros máximos."""
+        return TabelaFrequencias(contagens=self.contagens.copy(), total=self.n, erros=self.erros.copy())
+
+# Cache das frequências lidas do SQLite: (banco, tabela, coluna, k) -> (versão, tabela de frequências).
+_CACHE_FREQUENCIAS_SQL = {}
+
+# Versão de uma tabela do banco: mtime do arquivo (e do -wal com dados) e quantidade de linhas.
+def _versao_tabela(conexao, db_path, tabela):
+    mtime = max(
+        os.stat(caminho).st_mtime_ns
+        for caminho in (db_path, db_path + "-wal")
+        if os.path.exists(caminho) and os.path.getsize(caminho) > 0
+    )
+    return mtime, conexao.execute(f"SELECT COUNT(*) FROM {citar(tabela)}").fetchone()[0]
+
+# Conta as frequências de uma coluna do SQLite (exatas ou Space-Saving), com cache.
+def contar_frequencias_sql(fonte, tabela, coluna, k=None, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Frequências de uma coluna de uma tabela SQLite sem carregar a tabela em memória.
+
+    Com `k=None` a contagem é exata e feita pelo próprio SQLite (GROUP BY). Com `k`, a
+    coluna é lida em blocos e resumida por um `SketchFrequencias` de `k` contadores
+    (memória constante, para colunas com valores distintos demais para contar).
+
+    Quando `fonte` é um caminho, o resultado fica em cache até o banco ou a quantidade de
+    linhas da tabela mudarem; novos top-N da mesma coluna custam O(n). Cada chamada
+    recebe uma cópia da tabela em cache.
+
+    Parâmetros:
+    - fonte: Caminho do banco SQLite ou conexão sqlite3 aberta.
+    - tabela: Nome da tabela.
+    - coluna: Nome da coluna.
+    - k: Contadores do resumo Space-Saving (se None, contagem exata).
+    - tamanho_chunk: Número de linhas por bloco (só com `k`).
+
+    Retorna:
+    - TabelaFrequencias.
+    """
+    conexao, fechar = conectar(fonte)
+    try:
+        chave = versao = None
+        if fechar:
+            chave = (os.path.abspath(fonte), tabela, coluna, k)
+            versao = _versao_tabela(conexao, chave[0], tabela)
+            if chave in _CACHE_FREQUENCIAS_SQL and _CACHE_FREQUENCIAS_SQL[chave][0] == versao:
+                return _CACHE_FREQUENCIAS_SQL[chave][1].copia()
+
+        if k is None:
+            col = citar(coluna)
+            linhas = conexao.execute(
+                f"SELECT {col}, COUNT(*) FROM {citar(tabela)} WHERE {col} IS NOT NULL GROUP BY {col} ORDER BY 2 DESC"
+            ).fetchall()
+            valores, contagens = zip(*linhas) if linhas else ((), ())
+            contagens = pd.Series(contagens, index=pd.Index(valores, name=coluna), dtype="int64", name="count")
+            frequencias = TabelaFrequencias(contagens=contagens, total=int(contagens.sum()), distintos=len(contagens))
+        else:
+            sketch = SketchFrequencias(k)
+            for chunk in ler_chunks_sql(conexao, tabela, [coluna], tamanho_chunk):
+                sketch.atualizar_contagens(chunk[coluna].value_counts())
+            frequencias = sketch.tabela()
+            frequencias.contagens.index.name = coluna
+            frequencias.contagens.name = "count"
+    finally:
+        if fechar:
+            conexao.close()
+
+    if chave is not None:
+        _CACHE_FREQUENCIAS_SQL[chave] = (versao, frequencias)
+        return frequencias.copia()
+    return frequencias
+
+# Versão streaming de `contar_categorias` para tabelas do stg_data.db.
+def contar_categorias_sql(fonte, tabela, col_name, top_n=10, k=None, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Retorna os 'top_n' valores mais frequentes de uma coluna lendo a tabela no SQLite
+    (ver `contar_frequencias_sql`). Com `k` as frequências são aproximadas e a coluna
+    'Erro máximo' traz a superestimativa máxima de cada uma.
+
+    Retorna:
+    - DataFrame com as categorias mais frequentes.
+    """
+    frequencias = contar_frequencias_sql(fonte, tabela, col_name, k, tamanho_chunk)
+    resultado = frequencias.top(top_n).to_frame(name="Frequência")
+    if not frequencias.exata:
+        resultado["Erro máximo"] = frequencias.erros.iloc[:top_n].to_numpy()
+    return resultado
+
+# Hash de 64 bits de cada linha nas colunas escolhidas.
+def hash_linhas(df, colunas=None, numericas=()):
+    """
+    Impressão digital (uint64) de cada linha via `pd.util.hash_pandas_object`, sem o
+    índice. Colunas numéricas (e as de `numericas`, que podem vir como object de um bloco
+    só com nulos) viram float64, para que 1 e 1.0 tenham o mesmo hash em todos os blocos.
+    """
+    colunas = list(df.columns) if colunas is None else list(colunas)
+    partes = {}
+    for col in colunas:
+        serie = df[col]
+        if col in numericas and not pd.api.types.is_numeric_dtype(serie.dtype):
+            serie = pd.to_numeric(serie, errors="coerce")
+        if pd.api.types.is_numeric_dtype(serie.dtype):
+            # + 0.0 troca -0.0 por 0.0 (iguais no drop_duplicates, bits diferentes no hash)
+            serie = serie.astype("float64") + 0.0
+        partes[col] = serie
+    return pd.util.hash_pandas_object(pd.DataFrame(partes, index=df.index, copy=False), index=False).to_numpy()
+
+class ConjuntoHashes:
+    """
+    Conjunto compacto de hashes de 64 bits com a contagem e a posição da primeira
+    ocorrência de cada um (24 bytes por chave distinta, sem guardar as linhas).
+
+    As chaves ficam em níveis de arrays ordenados e disjuntos; cada bloco inserido vira
+    um nível novo, fundido ao anterior quando fica do mesmo tamanho. A busca é um
+    `searchsorted` por nível (O(log n) níveis) e a fusão custa O(n log n) amortizado.
+    """
+
+    def __init__(self):
+        self.niveis = []
+        self.n = 0
+
+    def __len__(self):
+        return sum(len(chaves) for chaves, _, _ in self.niveis)
+
+    @property
+    def memoria_mb(self):
+        """Memória ocupada pelas chaves, contagens e posições."""
+        return sum(sum(array.nbytes for array in nivel) for nivel in self.niveis) / 2**20
+
+    # Nível e posição de cada hash (nível -1 quando ausente).
+    def _localizar(self, hashes):
+        nivel = np.full(len(hashes), -1, dtype="int64")
+        posicao = np.zeros(len(hashes), dtype="int64")
+        for i, (chaves, _, _) in enumerate(self.niveis):
+            pos = np.minimum(np.searchsorted(chaves, hashes), len(chaves) - 1)
+            achou = (chaves[pos] == hashes) & (nivel < 0)
+            nivel[achou] = i
+            posicao[achou] = pos[achou]
+        return nivel, posicao
+
+    def contem(self, hashes):
+        """Indica, para cada hash, se ele já está no conjunto."""
+        return self._localizar(np.asarray(hashes, dtype="uint64"))[0] >= 0
+
+    def adicionar(self, hashes, posicoes=None):
+        """
+        Incorpora um array de hashes.
+
+        Parâmetros:
+        - hashes: Array de hashes (uint64), na ordem das linhas.
+        - posicoes: Identificador de cada linha guardado para a primeira ocorrência (ex: o
+          rowid do SQLite); se None, usa a posição da linha desde o primeiro bloco.
+
+        Retorna:
+        - Array booleano, True nas posições que são a primeira ocorrência da chave (no
+          conjunto e no próprio array).
+        """
+        hashes = np.asarray(hashes, dtype="uint64")
+        if posicoes is None:
+            posicoes = np.arange(self.n, self.n + len(hashes), dtype="int64")
+        self.n += len(hashes)
+        primeira = np.zeros(len(hashes), dtype=bool)
+        if len(hashes) == 0:
+            return primeira
+        unicos, indices, contagens = np.unique(hashes, return_index=True, return_counts=True)
+        nivel, posicao = self._localizar(unicos)
+        for i, (_, contagens_nivel, _) in enumerate(self.niveis):
+            achou = nivel == i
+            contagens_nivel[posicao[achou]] += contagens[achou]
+
+        novos = nivel < 0
+        primeira[indices[novos]] = True
+        if novos.any():
+            self.niveis.append((unicos[novos], contagens[novos].astype("int64"), np.asarray(posicoes, dtype="int64")[indices[novos]]))
+            self._compactar(lambda anterior, ultimo: anterior <= 2 * ultimo)
+        return primeira
+
+    def _compactar(self, fundir):
+        while len(self.niveis) > 1 and fundir(len(self.niveis[-2][0]), len(self.niveis[-1][0])):
+            anterior, ultimo = self.niveis[-2], self.niveis.pop()
+            chaves = np.concatenate([anterior[0], ultimo[0]])
+            ordem = np.argsort(chaves, kind="stable")
+            self.niveis[-1] = tuple(np.concatenate([a, b])[ordem] for a, b in zip(anterior, ultimo))
+
+    def contagens(self):
+        """
+        Funde todos os níveis e retorna a tupla (hashes ordenados, contagens, posições da
+        primeira ocorrência).
+        """
+        self._compactar(lambda anterior, ultimo: True)
+        if not self.niveis:
+            return np.empty(0, dtype="uint64"), np.empty(0, dtype="int64"), np.empty(0, dtype="int64")
+        return self.niveis[0]
+
+    def maiores_grupos(self, limite_grupos):
+        """
+        Os `limite_grupos` hashes com mais de uma ocorrência, do maior grupo ao menor.
+
+        Retorna:
+        - DataFrame com hash, ocorrencias e primeira_linha.
+        """
+        chaves, contagens, posicoes = self.contagens()
+        repetidos = np.flatnonzero(contagens > 1)
+        ordem = repetidos[np.lexsort((posicoes[repetidos], -contagens[repetidos]))[:limite_grupos]]
+        return pd.DataFrame({"hash": chaves[ordem], "ocorrencias": contagens[ordem], "primeira_linha": posicoes[ordem]})
+
+@dataclass
+class ResultadoDuplicatas:
+    """
+    Resultado de `detectar_duplicatas_sql`, `remover_duplicatas_sql` e `detectar_duplicatas`.
+
+    Atributos:
+    - grupos: DataFrame com os maiores grupos de linhas repetidas: hash, ocorrências,
+      primeira_linha (rowid no SQLite, posição no DataFrame) e os valores das colunas
+      comparadas.
+    - estatisticas: Dicionário com linhas, chaves distintas, linhas duplicadas, grupos
+      duplicados, linhas mantidas, memória do conjunto de hashes (MB), segundos e linhas
+      por segundo.
+    """
+    grupos: pd.DataFrame
+    estatisticas: dict
+
+# Resume um ConjuntoHashes nas estatísticas de `ResultadoDuplicatas`.
+def estatisticas_duplicatas(conjunto, mantidas, inicio):
+    _, contagens, _ = conjunto.contagens()
+    segundos = time.perf_counter() - inicio
+    return {
+        "linhas": conjunto.n,
+        "chaves_distintas": len(contagens),
+        "linhas_duplicadas": conjunto.n - len(contagens),
+        "grupos_duplicados": int((contagens > 1).sum()),
+        "linhas_mantidas": mantidas,
+        "memoria_hashes_mb": conjunto.memoria_mb,
+        "segundos": segundos,
+        "linhas_por_segundo": conjunto.n / segundos if segundos else 0.0,
+    }
+
+# Colunas comparadas (todas, se None) e quais delas são numéricas no SQLite.
+def _colunas_duplicatas(conexao, tabela, colunas):
+    if colunas is None:
+        colunas = colunas_tabela(conexao, tabela)
+    elif isinstance(colunas, str):
+        colunas = [colunas]
+    numericas = set(colunas_numericas_sql(conexao, tabela)) & set(colunas)
+    return list(colunas), numericas
+
+# Lê em blocos (rowid, linha completa) ou (rowid, colunas) de uma tabela.
+def _blocos_com_rowid(conexao, tabela, colunas, tamanho_chunk):
+    selecao = ", ".join(citar(c) for c in colunas) if colunas else "*"
+    cursor = conexao.execute(f"SELECT rowid, {selecao} FROM {citar(tabela)}")
+    nomes = ["__rowid", *(d[0] for d in cursor.description[1:])]
+    try:
+        while True:
+            linhas = cursor.fetchmany(tamanho_chunk)
+            if not linhas:
+                break
+            chunk = pd.DataFrame.from_records(linhas, columns=nomes)
+            yield chunk.pop("__rowid").to_numpy(dtype="int64"), chunk, linhas
+    finally:
+        cursor.close()
+
+# Busca pelo rowid a primeira linha de cada grupo reportado.
+def _grupos_sql(conexao, tabela, colunas, grupos):
+    if grupos.empty:
+        return grupos.reindex(columns=[*grupos.columns, *colunas])
+    selecao = ", ".join(citar(c) for c in colunas)
+    marcadores = ", ".join("?" * len(grupos))
+    linhas = pd.read_sql_query(
+        f"SELECT rowid AS primeira_linha, {selecao} FROM {citar(tabela)} WHERE rowid IN ({marcadores})",
+        conexao, params=[int(r) for r in grupos["primeira_linha"]],
+    )
+    return grupos.merge(linhas, on="primeira_linha", how="left")
+
+# Encontra linhas repetidas de uma tabela SQLite em memória proporcional às chaves distintas.
+def detectar_duplicatas_sql(fonte, tabela, colunas=None, tamanho_chunk=TAMANHO_CHUNK, limite_grupos=100):
+    """
+    Detecta linhas duplicadas de uma tabela do SQLite lendo-a em blocos, em uma passada.
+
+    Cada linha vira um hash de 64 bits das `colunas` (`pd.util.hash_pandas_object`)
+    contado em um ConjuntoHashes junto com o rowid da primeira ocorrência; a memória
+    cresce com a quantidade de chaves distintas (24 bytes cada), não com o tamanho das
+    linhas. Os valores dos `limite_grupos` maiores grupos são buscados depois pelo rowid.
+    Duas chaves diferentes só se confundem se colidirem no hash (probabilidade ~n²/2⁶⁵).
+
+    Parâmetros:
+    - fonte: Caminho do banco SQLite (ex: stg_data.db) ou conexão sqlite3 aberta.
+    - tabela: Nome da tabela (ex: 'stg_olist_geolocation').
+    - colunas: Coluna ou lista de colunas comparadas (se None, todas).
+    - tamanho_chunk: Número de linhas por bloco.
+    - limite_grupos: Quantidade de grupos no relatório (os maiores primeiro).
+
+    Retorna:
+    - ResultadoDuplicatas.
+    """
+    inicio = time.perf_counter()
+    conexao, fechar = conectar(fonte)
+    try:
+        colunas, numericas = _colunas_duplicatas(conexao, tabela, colunas)
+        conjunto = ConjuntoHashes()
+        for rowids, chunk, _ in _blocos_com_rowid(conexao, tabela, colunas, tamanho_chunk):
+            conjunto.adicionar(hash_linhas(chunk, colunas, numericas), rowids)
+        grupos = _grupos_sql(conexao, tabela, colunas, conjunto.maiores_grupos(limite_grupos))
+    finally:
+        if fechar:
+            conexao.close()
+    return ResultadoDuplicatas(grupos=grupos, estatisticas=estatisticas_duplicatas(conjunto, len(conjunto), inicio))
+
+# Grava em outra tabela as linhas de uma tabela SQLite sem as duplicatas.
+def remover_duplicatas_sql(fonte, tabela, colunas=None, manter="primeiro", destino=None, tamanho_chunk=TAMANHO_CHUNK, limite_grupos=100):
+    """
+    Copia a tabela para `destino` sem as linhas duplicadas, em blocos e sem carregá-la
+    inteira (mesmo motor de hashes de `detectar_duplicatas_sql`). As linhas mantidas
+    são gravadas como vieram do SQLite, na ordem original.
+
+    Com manter='primeiro' basta uma passada; 'ultimo' e False fazem antes uma passada
+    só nas `colunas` para contar as ocorrências de cada chave.
+
+    Parâmetros:
+    - fonte: Caminho do banco SQLite ou conexão sqlite3 aberta.
+    - tabela: Nome da tabela de origem.
+    - colunas: Coluna ou lista de colunas comparadas (se None, todas).
+    - manter: 'primeiro' (default), 'ultimo' ou False (remove todas as ocorrências repetidas).
+    - destino: Tabela criada (ou substituída) no mesmo banco; se None, '<tabela>_sem_duplicatas'.
+    - tamanho_chunk: Número de linhas por bloco.
+    - limite_grupos: Quantidade de grupos no relatório.
+
+    Retorna:
+    - ResultadoDuplicatas (as estatísticas incluem a tabela de destino).
+    """
+    if manter not in ("primeiro", "ultimo", False):
+        raise ValueError("Opção inválida para 'manter'. Escolha entre 'primeiro', 'ultimo' ou False.")
+    destino = destino or f"{tabela}_sem_duplicatas"
+    inicio = time.perf_counter()
+    conexao, fechar = conectar(fonte)
+    try:
+        colunas, numericas = _colunas_duplicatas(conexao, tabela, colunas)
+        conjunto = ConjuntoHashes()
+        if manter != "primeiro":
+            for rowids, chunk, _ in _blocos_com_rowid(conexao, tabela, colunas, tamanho_chunk):
+                conjunto.adicionar(hash_linhas(chunk, colunas, numericas), rowids)
+            chaves, contagens, _ = conjunto.contagens()
+            restantes = contagens.copy()
+
+        conexao.execute(f"DROP TABLE IF EXISTS {citar(destino)}")
+        conexao.execute(f"CREATE TABLE {citar(destino)} AS SELECT * FROM {citar(tabela)} WHERE 0")
+        n_colunas = len(conexao.execute(f"SELECT * FROM {citar(tabela)} LIMIT 0").description)
+        insert = f"INSERT INTO {citar(destino)} VALUES ({', '.join('?' * n_colunas)})"
+        mantidas = 0
+        for rowids, chunk, linhas in _blocos_com_rowid(conexao, tabela, None, tamanho_chunk):
+            h = hash_linhas(chunk, colunas, numericas)
+            if manter == "primeiro":
+                manter_linha = conjunto.adicionar(h, rowids)
+            elif manter == "ultimo":
+                # Mantém a linha quando ela é a última ocorrência restante da chave
+                pos = np.searchsorted(chaves, h)
+                pos_unicas, vistas = np.unique(pos, return_counts=True)
+                vistas_linha = vistas[np.searchsorted(pos_unicas, pos)]
+                ordem_no_bloco = pd.Series(pos).groupby(pos).cumcount().to_numpy()
+                manter_linha = (ordem_no_bloco == vistas_linha - 1) & (restantes[pos] == vistas_linha)
+                restantes[pos_unicas] -= vistas
+            else:
+                manter_linha = contagens[np.searchsorted(chaves, h)] == 1
+            indices = np.flatnonzero(manter_linha)
+            conexao.executemany(insert, [linhas[i][1:] for i in indices])
+            mantidas += len(indices)
+        conexao.commit()
+        grupos = _grupos_sql(conexao, tabela, colunas, conjunto.maiores_grupos(limite_grupos))
+    finally:
+        if fechar:
+            conexao.close()
+    estatisticas = estatisticas_duplicatas(conjunto, mantidas, inicio)
+    estatisticas["destino"] = destino
+    return ResultadoDuplicatas(grupos=grupos, estatisticas=estatisticas)
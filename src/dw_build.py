@@ -0,0 +1,277 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+try:
+    from .data_loading import PRAGMAS_CARGA, criar_indices
+    from .data_preprocessing import imputar_nulos, normalizar_colunas_texto
+    from .sqlite_utils import citar, colunas_tabela, configurar_conexao, existe_tabela, linhas_para_insert, tipo_sqlite
+except ImportError:
+    from data_loading import PRAGMAS_CARGA, criar_indices
+    from data_preprocessing import imputar_nulos, normalizar_colunas_texto
+    from sqlite_utils import citar, colunas_tabela, configurar_conexao, existe_tabela, linhas_para_insert, tipo_sqlite
+
+# Tabela do dw_data.db com o estado de cada tabela construída.
+TABELA_CONTROLE = "_controle_dw"
+
+# Número de linhas lidas do staging por bloco.
+TAMANHO_CHUNK = 100_000
+
+# Pragmas da conexão do dw_data.db. O DW é a saída durável: com WAL, synchronous=NORMAL
+# não corrompe o banco numa queda (no máximo perde a última transação), ao contrário do
+# synchronous=OFF usado na carga descartável do staging.
+PRAGMAS_DW = {**PRAGMAS_CARGA, "synchronous": "NORMAL"}
+
+@dataclass
+class TabelaDW:
+    """
+    Definição de uma tabela do dw_data.db construída a partir do staging.
+
+    Atributos:
+    - nome: Nome da tabela no DW (ex: 'dw_orders').
+    - origem: Tabela de staging (ex: 'stg_olist_orders').
+    - chave: Colunas da chave primária (usadas no upsert).
+    - marca_dagua: Coluna de data usada como marca d'água. Se None, as linhas novas ou
+      alteradas são detectadas pelo hash de cada linha.
+    - origem_marca: Tupla (tabela, coluna de ligação) quando a marca d'água está em outra
+      tabela do staging (ex: pagamentos usam a data de compra do pedido).
+    - janela_dias: Dias antes da marca d'água que são reprocessados a cada execução, para
+      pegar linhas alteradas depois de carregadas (ex: status e datas de entrega).
+    - transformacoes: Funções df -> df aplicadas em cada bloco. Devem tratar cada linha
+      de forma independente, para o resultado incremental ser igual ao completo.
+    """
+    nome: str
+    origem: str
+    chave: list
+    marca_dagua: str = None
+    origem_marca: tuple = None
+    janela_dias: int = 0
+    transformacoes: list = field(default_factory=list)
+
+def _normalizar_cidade(coluna):
+    return lambda df: normalizar_colunas_texto(df, [coluna])
+
+# Tabelas do DW padrão do projeto.
+TABELAS_DW = [
+    TabelaDW("dw_customers", "stg_olist_customers", ["customer_id"], transformacoes=[_normalizar_cidade("customer_city")]),
+    TabelaDW("dw_sellers", "stg_olist_sellers", ["seller_id"], transformacoes=[_normalizar_cidade("seller_city")]),
+    TabelaDW(
+        "dw_products", "stg_olist_products", ["product_id"],
+        transformacoes=[lambda df: imputar_nulos(df, {"product_category_name": "sem_categoria"})],
+    ),
+    TabelaDW("dw_product_category_name_translation", "stg_product_category_name_translation", ["product_category_name"]),
+    TabelaDW("dw_orders", "stg_olist_orders", ["order_id"], marca_dagua="order_purchase_timestamp", janela_dias=60),
+    TabelaDW(
+        "dw_order_items", "stg_olist_order_items", ["order_id", "order_item_id"],
+        marca_dagua="order_purchase_timestamp", origem_marca=("stg_olist_orders", "order_id"), janela_dias=60,
+    ),
+    TabelaDW(
+        "dw_order_payments", "stg_olist_order_payments", ["order_id", "payment_sequential"],
+        marca_dagua="order_purchase_timestamp", origem_marca=("stg_olist_orders", "order_id"), janela_dias=60,
+    ),
+    TabelaDW("dw_order_reviews", "stg_olist_order_reviews", ["review_id", "order_id"], marca_dagua="review_creation_date", janela_dias=30),
+]
+
+# Lê o estado gravado (marca d'água e colunas) de cada tabela do DW.
+def ler_controle_dw(dw_path):
+    """
+    Retorna o estado da última construção de cada tabela do DW.
+
+    Retorna:
+    - DataFrame com tabela, marca d'água, colunas de origem, modo, linhas e data da execução.
+    """
+    with sqlite3.connect(dw_path) as conexao:
+        if not existe_tabela(conexao, TABELA_CONTROLE):
+            return pd.DataFrame(columns=["tabela", "marca_dagua", "colunas", "modo", "linhas", "atualizado_em"])
+        return pd.read_sql_query(f"SELECT * FROM {TABELA_CONTROLE}", conexao)
+
+def _controle(conexao, tabela):
+    if not existe_tabela(conexao, TABELA_CONTROLE):
+        return None
+    linha = conexao.execute(f"SELECT marca_dagua, colunas FROM {TABELA_CONTROLE} WHERE tabela = ?", (tabela,)).fetchone()
+    return None if linha is None else {"marca_dagua": linha[0], "colunas": json.loads(linha[1])}
+
+def _gravar_controle(conexao, tabela, marca, colunas, modo, linhas):
+    conexao.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABELA_CONTROLE} (tabela TEXT PRIMARY KEY, marca_dagua TEXT, colunas TEXT, modo TEXT, linhas INTEGER, atualizado_em TEXT)"
+    )
+    conexao.execute(
+        f"INSERT OR REPLACE INTO {TABELA_CONTROLE} VALUES (?, ?, ?, ?, ?, ?)",
+        (tabela, marca, json.dumps(colunas), modo, linhas, pd.Timestamp.now().isoformat(timespec="seconds")),
+    )
+
+# Monta a consulta das linhas de origem (todas, ou a partir de um limite da marca d'água).
+def _consulta_origem(config, limite=None):
+    origem = citar(config.origem)
+    if config.marca_dagua is None:
+        return f"SELECT * FROM {origem}", ()
+    if config.origem_marca is None:
+        filtro = f" WHERE {citar(config.marca_dagua)} >= ? OR {citar(config.marca_dagua)} IS NULL" if limite else ""
+        return f"SELECT * FROM {origem}{filtro}", (limite,) if limite else ()
+    pai, ligacao = config.origem_marca
+    filtro = f" WHERE p.{citar(config.marca_dagua)} >= ? OR p.{citar(config.marca_dagua)} IS NULL" if limite else ""
+    consulta = (
+        f"SELECT t.*, p.{citar(config.marca_dagua)} AS __marca FROM {origem} t "
+        f"LEFT JOIN {citar(pai)} p ON p.{citar(ligacao)} = t.{citar(ligacao)}{filtro}"
+    )
+    return consulta, (limite,) if limite else ()
+
+# Cria a tabela do DW com a chave primária (índice único usado pelo upsert).
+def _criar_tabela(conexao, config, chunk):
+    definicao = ", ".join(f"{citar(col)} {tipo_sqlite(dtype)}" for col, dtype in chunk.dtypes.items())
+    chave = ", ".join(citar(col) for col in config.chave)
+    conexao.execute(f"DROP TABLE IF EXISTS {citar(config.nome)}")
+    conexao.execute(f"CREATE TABLE {citar(config.nome)} ({definicao}, PRIMARY KEY ({chave}))")
+
+# Grava um bloco com INSERT ... ON CONFLICT DO UPDATE.
+def _upsert(conexao, config, chunk):
+    colunas = list(chunk.columns)
+    nomes = ", ".join(citar(col) for col in colunas)
+    marcadores = ", ".join("?" * len(colunas))
+    atualizacao = ", ".join(f"{citar(col)} = excluded.{citar(col)}" for col in colunas if col not in config.chave)
+    conflito = f"DO UPDATE SET {atualizacao}" if atualizacao else "DO NOTHING"
+    conexao.executemany(
+        f"INSERT INTO {citar(config.nome)} ({nomes}) VALUES ({marcadores}) "
+        f"ON CONFLICT ({', '.join(citar(c) for c in config.chave)}) {conflito}",
+        linhas_para_insert(chunk),
+    )
+
+# Hash de cada linha (colunas da origem), usado nas tabelas sem marca d'água.
+def _hash_linhas(chunk):
+    # Normaliza os tipos para o hash não depender do bloco (ex: inteiros com nulos viram float)
+    normalizado = {}
+    for col, serie in chunk.items():
+        if pd.api.types.is_numeric_dtype(serie) or serie.isna().all():
+            normalizado[col] = pd.to_numeric(serie, errors="coerce").astype("float64")
+        else:
+            normalizado[col] = serie.astype(object).where(serie.notna(), "")
+    return pd.util.hash_pandas_object(pd.DataFrame(normalizado), index=False).to_numpy().view("int64")
+
+# Seleciona as linhas novas ou alteradas de um bloco e atualiza a tabela de hashes.
+def _filtrar_alteradas(conexao, config, chunk):
+    tabela_hash = citar(f"_hash_{config.nome}")
+    chaves = ", ".join(citar(c) for c in config.chave)
+    conexao.execute(f"CREATE TABLE IF NOT EXISTS {tabela_hash} ({chaves}, __hash INTEGER, PRIMARY KEY ({chaves}))")
+
+    hashes = chunk[config.chave].assign(__hash=_hash_linhas(chunk), __posicao=range(len(chunk)))
+    conexao.execute("DROP TABLE IF EXISTS temp.__hash_novos")
+    conexao.execute(f"CREATE TEMP TABLE __hash_novos ({chaves}, __hash INTEGER, __posicao INTEGER)")
+    conexao.executemany(f"INSERT INTO temp.__hash_novos VALUES ({', '.join('?' * len(hashes.columns))})", linhas_para_insert(hashes))
+    juncao = " AND ".join(f"h.{citar(c)} = n.{citar(c)}" for c in config.chave)
+    posicoes = [linha[0] for linha in conexao.execute(
+        f"SELECT n.__posicao FROM temp.__hash_novos n LEFT JOIN {tabela_hash} h ON {juncao} "
+        f"WHERE h.__hash IS NULL OR h.__hash != n.__hash"
+    )]
+    conexao.execute(f"INSERT OR REPLACE INTO {tabela_hash} SELECT {chaves}, __hash FROM temp.__hash_novos")
+    return chunk.iloc[posicoes]
+
+# Constrói (completa ou incrementalmente) uma tabela do DW.
+def _construir_tabela(stg, dw, config, completo, tamanho_chunk, indexar_origem):
+    colunas_origem = colunas_tabela(stg, config.origem)
+    controle = _controle(dw, config.nome)
+    marca_atual = None
+    if config.marca_dagua is not None:
+        origem_marca = config.origem_marca[0] if config.origem_marca else config.origem
+        if indexar_origem:
+            # O índice na coluna da marca d'água deixa a leitura do delta proporcional ao delta
+            criar_indices(stg, origem_marca, [config.marca_dagua])
+        marca_atual = stg.execute(f"SELECT MAX({citar(config.marca_dagua)}) FROM {citar(origem_marca)}").fetchone()[0]
+
+    # Sem estado anterior, com colunas diferentes ou com a origem "voltando no tempo", reconstrói tudo
+    completo = (
+        completo
+        or controle is None
+        or not existe_tabela(dw, config.nome)
+        or controle["colunas"] != colunas_origem
+        or (marca_atual is not None and controle["marca_dagua"] is not None and marca_atual < controle["marca_dagua"])
+    )
+    limite = None
+    if not completo and config.marca_dagua is not None and controle["marca_dagua"] is not None:
+        limite = (pd.Timestamp(controle["marca_dagua"]) - pd.Timedelta(days=config.janela_dias)).strftime("%Y-%m-%d %H:%M:%S")
+
+    consulta, parametros = _consulta_origem(config, limite)
+    lidas = processadas = 0
+    criada = not completo
+    dw.execute("BEGIN")
+    if completo:
+        # Remove a tabela antiga já na transação: com a origem vazia, nenhum bloco a recriaria
+        dw.execute(f"DROP TABLE IF EXISTS {citar(config.nome)}")
+        dw.execute(f"DROP TABLE IF EXISTS {citar('_hash_' + config.nome)}")
+    for chunk in pd.read_sql_query(consulta, stg, params=parametros, chunksize=tamanho_chunk):
+        chunk = chunk.drop(columns="__marca", errors="ignore")
+        lidas += len(chunk)
+        if config.marca_dagua is None:
+            chunk = _filtrar_alteradas(dw, config, chunk)
+        if chunk.empty:
+            continue
+        for transformacao in config.transformacoes:
+            chunk = transformacao(chunk)
+        if not criada:
+            _criar_tabela(dw, config, chunk)
+            criada = True
+        _upsert(dw, config, chunk)
+        processadas += len(chunk)
+    total = dw.execute(f"SELECT COUNT(*) FROM {citar(config.nome)}").fetchone()[0] if criada else 0
+    _gravar_controle(dw, config.nome, marca_atual, colunas_origem, "completo" if completo else "incremental", total)
+    dw.execute("COMMIT")
+
+    if criada:
+        criar_indices(dw, config.nome)
+    return {"modo": "completo" if completo else "incremental", "linhas_lidas": lidas, "linhas_processadas": processadas, "linhas_total": total, "marca_dagua": marca_atual}
+
+# Atualiza o dw_data.db a partir do stg_data.db processando só as linhas novas ou alteradas.
+def construir_dw(stg_path, dw_path, tabelas=None, completo=False, tamanho_chunk=TAMANHO_CHUNK, indexar_origem=False, verbose=True):
+    """
+    Constrói o dw_data.db a partir do stg_data.db de forma incremental.
+
+    Para cada tabela, guarda a marca d'água (maior valor da coluna de data) em
+    `_controle_dw`; nas execuções seguintes só lê as linhas a partir da marca menos
+    `janela_dias`, aplica as transformações e grava com upsert pela chave primária.
+    Tabelas sem coluna de data (clientes, vendedores, produtos) comparam o hash de cada
+    linha com o da execução anterior e só transformam as linhas novas ou alteradas.
+
+    A tabela é reconstruída por completo na primeira execução, com `completo=True`, quando
+    as colunas da origem mudam ou quando a marca d'água da origem fica menor que a gravada
+    (ex: staging recarregado com menos dados). Linhas removidas do staging só saem do DW
+    na reconstrução completa.
+
+    Parâmetros:
+    - stg_path: Caminho do banco de staging (ex: data/processed/stg_data.db).
+    - dw_path: Caminho do banco do DW (ex: data/processed/dw_data.db).
+    - tabelas: Lista de TabelaDW (se None, usa `TABELAS_DW`).
+    - completo: Se True, reconstrói todas as tabelas.
+    - tamanho_chunk: Linhas lidas do staging por bloco.
+    - indexar_origem: Se True, cria no staging o índice das colunas de marca d'água
+      (leitura do delta sem varrer a tabela). Por padrão o staging só é lido; a carga
+      (`carregar_staging`) já indexa essas colunas.
+    - verbose: Se True, imprime o resultado de cada tabela.
+
+    Retorna:
+    - DataFrame com modo, linhas lidas, processadas, total, marca d'água e segundos por tabela.
+    """
+    tabelas = TABELAS_DW if tabelas is None else tabelas
+    relatorio = {}
+    stg = sqlite3.connect(stg_path)
+    dw = sqlite3.connect(dw_path, isolation_level=None)
+    configurar_conexao(dw, PRAGMAS_DW)
+    try:
+        for config in tabelas:
+            if not existe_tabela(stg, config.origem):
+                if verbose:
+                    print(f"Tabela {config.origem} não encontrada no staging; {config.nome} não foi atualizada.")
+                continue
+            inicio = time.perf_counter()
+            relatorio[config.nome] = _construir_tabela(stg, dw, config, completo, tamanho_chunk, indexar_origem)
+            relatorio[config.nome]["segundos"] = time.perf_counter() - inicio
+            if verbose:
+                r = relatorio[config.nome]
+                print(f"{config.nome}: {r['modo']}, {r['linhas_processadas']:,} de {r['linhas_lidas']:,} linhas lidas processadas ({r['segundos']:.2f}s)")
+    finally:
+        if dw.in_transaction:
+            dw.execute("ROLLBACK")
+        dw.close()
+        stg.close()
+    return pd.DataFrame.from_dict(relatorio, orient="index")
@@ -0,0 +1,447 @@
+import html
+import json
+import os
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import data_reader
+    from .data_analysis import calcular_outliers, contar_categorias, perfilar_tabela
+    from .data_preprocessing import detectar_duplicatas
+    from .data_streaming import acumular_estatisticas_sql, detectar_duplicatas_sql, gerar_resumo_estatistico_sql, outliers_por_coluna_sql
+    from .sqlite_utils import citar
+except ImportError:
+    import data_reader
+    from data_analysis import calcular_outliers, contar_categorias, perfilar_tabela
+    from data_preprocessing import detectar_duplicatas
+    from data_streaming import acumular_estatisticas_sql, detectar_duplicatas_sql, gerar_resumo_estatistico_sql, outliers_por_coluna_sql
+    from sqlite_utils import citar
+
+# Nome base dos arquivos gravados por `RelatorioEDA.salvar`.
+ARQUIVO_RELATORIO = "relatorio_eda"
+
+# Colunas do perfil por coluna, na ordem do relatório.
+COLUNAS_PERFIL = [
+    "tipo", "nulos", "percentual_nulos", "cardinalidade", "constante",
+    "mean", "median", "std", "min", "max", "skew", "outliers", "limite_inferior", "limite_superior",
+]
+
+# Lista as tabelas de dados do banco (sem as tabelas internas do src).
+def listar_tabelas_eda(conexao):
+    """
+    Tabelas do banco que entram na EDA: ficam de fora as internas do SQLite e do `src`
+    (prefixo '_', como `_esquemas`, `_controle_*` e `_hash_*`) e as cópias gravadas por
+    `remover_duplicatas_sql` (sufixo '_sem_duplicatas').
+    """
+    cursor = conexao.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    return [
+        nome for (nome,) in cursor.fetchall()
+        if not nome.startswith(("_", "sqlite_")) and not nome.endswith("_sem_duplicatas")
+    ]
+
+# Colunas inteiras (com nulos) do resumo por tabela e do perfil por coluna.
+_INTEIRAS_TABELAS = ["linhas", "colunas", "linhas_duplicadas", "grupos_duplicados", "pid"]
+_INTEIRAS_PERFIL = ["nulos", "cardinalidade", "outliers"]
+
+# Converte um DataFrame do relatório em texto (inteiros com separador de milhar, vazios sem 'nan').
+def _formatar(df, formato):
+    texto = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_integer_dtype(serie):
+            texto[col] = [f"{v:,}" if not pd.isna(v) else "" for v in serie]
+        elif pd.api.types.is_float_dtype(serie):
+            texto[col] = [format(v, formato) if not pd.isna(v) else "" for v in serie]
+        else:
+            texto[col] = ["" if v is None or (isinstance(v, float) and np.isnan(v)) else str(v) for v in serie]
+    return texto
+
+def _resultado_erro(tabela, erro, inicio):
+    return {
+        "tabela": tabela,
+        "status": "erro",
+        "erro": f"{type(erro).__name__}: {erro}",
+        "traceback": "".join(traceback.format_exception(erro)),
+        "segundos": time.perf_counter() - inicio,
+        "pid": os.getpid(),
+    }
+
+# Perfil, outliers, duplicatas e categorias mais frequentes de uma tabela lida em memória.
+def _perfil_em_memoria(db_path, tabela, metodo, fator, top_n, etapas):
+    t = time.perf_counter()
+    df = data_reader.obter_leitor(db_path).ler(tabela)
+    etapas["leitura"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    perfil = perfilar_tabela(df)
+    colunas = perfil.colunas.copy()
+    colunas["tipo"] = colunas["tipo"].astype(str)
+    etapas["perfil"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    if perfil.numericas:
+        outliers = calcular_outliers(df, perfil.numericas, metodo, fator)
+        colunas["outliers"] = outliers.contagem()
+        colunas = colunas.join(outliers.limites)
+    etapas["outliers"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    duplicatas = detectar_duplicatas(df, limite_grupos=0).estatisticas
+    etapas["duplicatas"] = time.perf_counter() - t
+
+    # Colunas identificadoras (um valor por linha) não têm categoria mais frequente
+    t = time.perf_counter()
+    categorias = {}
+    candidatas = colunas.index[~colunas["numerica"] & (colunas["cardinalidade"] > 1) & (colunas["cardinalidade"] < perfil.n_linhas)]
+    for col in candidatas:
+        frequencias = contar_categorias(df, col, top_n)["Frequência"]
+        categorias[col] = [[str(valor), int(n)] for valor, n in frequencias.items()]
+    etapas["categorias"] = time.perf_counter() - t
+    return perfil.n_linhas, colunas, duplicatas, categorias
+
+# Mesmo perfil lendo a tabela em blocos (tabelas acima de `max_linhas_memoria`).
+def _perfil_em_blocos(db_path, tabela, metodo, fator, etapas):
+    conexao = sqlite3.connect(db_path)
+    try:
+        t = time.perf_counter()
+        estatisticas = acumular_estatisticas_sql(conexao, tabela)
+        tipos = {nome: tipo for _, nome, tipo, *_ in conexao.execute(f"PRAGMA table_info({citar(tabela)})")}
+        etapas["perfil"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        outliers = outliers_por_coluna_sql(conexao, tabela, metodo, fator, estatisticas=estatisticas)
+        etapas["outliers"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        duplicatas = detectar_duplicatas_sql(conexao, tabela, limite_grupos=0).estatisticas
+        etapas["duplicatas"] = time.perf_counter() - t
+    finally:
+        conexao.close()
+
+    n_linhas = estatisticas.n_linhas
+    colunas = pd.DataFrame(index=estatisticas.nulos.index)
+    colunas["tipo"] = pd.Series(tipos)
+    colunas["nulos"] = estatisticas.nulos
+    colunas["percentual_nulos"] = colunas["nulos"] / n_linhas * 100 if n_linhas else np.nan
+    resumo = gerar_resumo_estatistico_sql(db_path, tabela, estatisticas=estatisticas)
+    colunas = colunas.join(resumo.drop(columns="count").rename(columns={"mediana": "median"}))
+    colunas["skew"] = pd.Series(estatisticas.momentos.skewness, index=pd.Index(estatisticas.numericas))
+    # A cardinalidade exigiria guardar os valores distintos; nas numéricas, min == max indica constante
+    colunas["cardinalidade"] = np.nan
+    colunas["constante"] = (colunas["min"] == colunas["max"]).where(colunas["min"].notna())
+    colunas["outliers"] = outliers["Outliers"]
+    return n_linhas, colunas, duplicatas, {}
+
+# Executa a EDA de uma tabela (nos processos do pool); falhas viram um resultado com status 'erro'.
+def _executar_eda_tabela(db_path, tabela, metodo, fator, top_n, max_linhas_memoria, linhas):
+    inicio = time.perf_counter()
+    etapas = {}
+    try:
+        if max_linhas_memoria is not None and linhas is not None and linhas > max_linhas_memoria:
+            modo = "blocos"
+            n_linhas, colunas, duplicatas, categorias = _perfil_em_blocos(db_path, tabela, metodo, fator, etapas)
+        else:
+            modo = "memoria"
+            n_linhas, colunas, duplicatas, categorias = _perfil_em_memoria(db_path, tabela, metodo, fator, top_n, etapas)
+    except Exception as e:
+        return _resultado_erro(tabela, e, inicio)
+
+    return {
+        "tabela": tabela,
+        "status": "ok",
+        "modo": modo,
+        "linhas": n_linhas,
+        "colunas": len(colunas),
+        "linhas_duplicadas": duplicatas["linhas_duplicadas"],
+        "grupos_duplicados": duplicatas["grupos_duplicados"],
+        "segundos": time.perf_counter() - inicio,
+        "etapas": etapas,
+        "pid": os.getpid(),
+        "perfil": colunas.reindex(columns=COLUNAS_PERFIL).astype(dict.fromkeys(_INTEIRAS_PERFIL, "Int64")),
+        "categorias": categorias,
+    }
+
+def _inicializar_worker():
+    # Conexões herdadas do processo pai (fork) não podem ser usadas nos filhos
+    data_reader._LEITORES.clear()
+
+# Executa as tarefas em um pool; se um processo morrer, refaz as tabelas afetadas isoladamente.
+def _executar_em_pool(tarefas, processos, ao_concluir):
+    resultados = {}
+    interrompidas = []
+    with ProcessPoolExecutor(processos, initializer=_inicializar_worker) as executor:
+        futuros = {executor.submit(_executar_eda_tabela, *tarefa): tarefa for tarefa in tarefas}
+        for futuro in as_completed(futuros):
+            tarefa = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except BrokenProcessPool:
+                interrompidas.append(tarefa)
+                continue
+            except Exception as e:
+                resultado = _resultado_erro(tarefa[1], e, time.perf_counter())
+            resultados[tarefa[1]] = resultado
+            ao_concluir(resultado)
+
+    # A queda de um processo derruba o pool inteiro: cada tabela pendente roda no seu próprio
+    # processo, e só a que realmente derruba o processo fica com erro
+    for tarefa in interrompidas:
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(1, initializer=_inicializar_worker) as executor:
+            try:
+                resultado = executor.submit(_executar_eda_tabela, *tarefa).result()
+            except Exception as e:
+                resultado = _resultado_erro(tarefa[1], e, inicio)
+        resultados[tarefa[1]] = resultado
+        ao_concluir(resultado)
+    return resultados
+
+@dataclass
+class RelatorioEDA:
+    """
+    Relatório consolidado de `gerar_relatorio_eda`.
+
+    Atributos:
+    - db_path: Banco analisado.
+    - tabelas: DataFrame indexado pela tabela com status, modo ('memoria' ou 'blocos'),
+      linhas, colunas, linhas e grupos duplicados, segundos (total e por etapa), pid do
+      processo e erro.
+    - colunas: DataFrame indexado por (tabela, coluna) com tipo, nulos, cardinalidade,
+      estatísticas numéricas e contagem/limites de outliers.
+    - categorias: Dicionário tabela -> coluna -> lista de [valor, frequência] mais frequentes.
+    - erros: Dicionário tabela -> traceback das tabelas que falharam.
+    - segundos: Tempo total (parede) da execução.
+    - processos: Número de processos usados.
+    - metodo_outliers, fator: Parâmetros da detecção de outliers.
+    """
+    db_path: str
+    tabelas: pd.DataFrame
+    colunas: pd.DataFrame
+    categorias: dict = field(default_factory=dict)
+    erros: dict = field(default_factory=dict)
+    segundos: float = 0.0
+    processos: int = 1
+    metodo_outliers: str = "iqr"
+    fator: float = 1.5
+
+    @property
+    def falhas(self):
+        """Lista das tabelas que falharam."""
+        return list(self.tabelas.index[self.tabelas["status"] == "erro"])
+
+    @property
+    def paralelismo(self):
+        """
+        Soma dos tempos das tabelas dividida pelo tempo total: quantas tabelas rodaram ao
+        mesmo tempo, em média (próximo do número de processos quando há núcleos livres).
+        """
+        return self.tabelas["segundos"].sum() / self.segundos if self.segundos else np.nan
+
+    def para_dict(self):
+        """Relatório em estruturas JSON (NaN vira null)."""
+        tabelas = json.loads(self.tabelas.reset_index().to_json(orient="records"))
+        for item in tabelas:
+            nome = item["tabela"]
+            if nome in self.colunas.index.get_level_values(0):
+                item["perfil"] = json.loads(self.colunas.loc[nome].reset_index().to_json(orient="records"))
+            item["categorias"] = self.categorias.get(nome, {})
+            if nome in self.erros:
+                item["traceback"] = self.erros[nome]
+        return {
+            "db_path": self.db_path,
+            "processos": self.processos,
+            "segundos": self.segundos,
+            "segundos_tabelas": float(self.tabelas["segundos"].sum()),
+            "paralelismo": self.paralelismo,
+            "metodo_outliers": self.metodo_outliers,
+            "fator": self.fator,
+            "tabelas": tabelas,
+        }
+
+    def para_json(self):
+        """Relatório em JSON."""
+        return json.dumps(self.para_dict(), indent=2, ensure_ascii=False)
+
+    def _resumo(self):
+        ok = len(self.tabelas) - len(self.falhas)
+        return (
+            f"{len(self.tabelas)} tabelas ({ok} ok, {len(self.falhas)} com erro) em {self.segundos:.2f}s "
+            f"com {self.processos} processos (soma das tabelas {self.tabelas['segundos'].sum():.2f}s, "
+            f"paralelismo {self.paralelismo:.1f}x); outliers por '{self.metodo_outliers}' com fator {self.fator}."
+        )
+
+    def para_markdown(self):
+        """Relatório em Markdown: resumo, tabela de tempos e o perfil de cada tabela."""
+        partes = [f"# Relatório de EDA: {os.path.basename(self.db_path)}", "", self._resumo(), "", "## Tabelas", ""]
+        partes += [self.tabelas.drop(columns=["erro", "pid"]).pipe(_formatar, ".3f").to_markdown(colalign=("left",) * 3 + ("right",) * (len(self.tabelas.columns) - 4), disable_numparse=True), ""]
+        for tabela in self.tabelas.index:
+            partes += [f"## {tabela}", ""]
+            if tabela in self.erros:
+                partes += [f"**Erro:** `{self.tabelas.at[tabela, 'erro']}`", "", "```", self.erros[tabela].rstrip(), "```", ""]
+                continue
+            partes += [_formatar(self.colunas.loc[tabela], ".4g").to_markdown(colalign=("left",) * 2 + ("right",) * (len(self.colunas.columns) - 1), disable_numparse=True), ""]
+            for col, valores in self.categorias.get(tabela, {}).items():
+                partes.append(f"- **{col}**: " + ", ".join(f"{valor} ({n:,})" for valor, n in valores))
+            if self.categorias.get(tabela):
+                partes.append("")
+        return "\n".join(partes)
+
+    def para_html(self):
+        """Relatório em HTML (página única, sem dependências externas)."""
+        def tabela_html(df, formato):
+            return _formatar(df, formato).to_html(border=0, classes="eda")
+
+        partes = [
+            "<!DOCTYPE html>", "<html><head><meta charset='utf-8'>",
+            f"<title>Relatório de EDA: {html.escape(os.path.basename(self.db_path))}</title>",
+            "<style>body{font-family:sans-serif;margin:2em}table.eda{border-collapse:collapse;font-size:13px}"
+            "table.eda td,table.eda th{padding:3px 8px;border-bottom:1px solid #ddd;text-align:right}"
+            ".erro{color:#b00}</style></head><body>",
+            f"<h1>Relatório de EDA: {html.escape(os.path.basename(self.db_path))}</h1>",
+            f"<p>{html.escape(self._resumo())}</p>", "<h2>Tabelas</h2>", tabela_html(self.tabelas.drop(columns=["erro", "pid"]), ".3f"),
+        ]
+        for tabela in self.tabelas.index:
+            partes.append(f"<h2>{html.escape(tabela)}</h2>")
+            if tabela in self.erros:
+                partes.append(f"<pre class='erro'>{html.escape(self.erros[tabela])}</pre>")
+                continue
+            partes.append(tabela_html(self.colunas.loc[tabela], ".4g"))
+            itens = [
+                f"<li><b>{html.escape(col)}</b>: " + html.escape(", ".join(f"{valor} ({n:,})" for valor, n in valores)) + "</li>"
+                for col, valores in self.categorias.get(tabela, {}).items()
+            ]
+            if itens:
+                partes.append("<ul>" + "".join(itens) + "</ul>")
+        partes.append("</body></html>")
+        return "\n".join(partes)
+
+    def salvar(self, diretorio, formato="markdown"):
+        """
+        Grava o relatório legível ('markdown' ou 'html') e o JSON no diretório.
+
+        Retorna:
+        - Lista com os caminhos gravados.
+        """
+        if formato == "markdown":
+            conteudo, extensao = self.para_markdown(), ".md"
+        elif formato == "html":
+            conteudo, extensao = self.para_html(), ".html"
+        else:
+            raise ValueError("Formato inválido. Escolha entre 'markdown' ou 'html'.")
+        os.makedirs(diretorio, exist_ok=True)
+        caminhos = [os.path.join(diretorio, ARQUIVO_RELATORIO + extensao), os.path.join(diretorio, ARQUIVO_RELATORIO + ".json")]
+        for caminho, texto in zip(caminhos, [conteudo, self.para_json()]):
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(texto)
+        return caminhos
+
+# Perfila todas as tabelas de um banco em paralelo e consolida um único relatório.
+def gerar_relatorio_eda(db_path, tabelas=None, diretorio_saida=None, formato="markdown", processos=None, metodo_outliers="iqr", fator=1.5, top_n=5, max_linhas_memoria=None, verbose=True):
+    """
+    Executa a EDA de cada tabela (a sequência do notebook: leitura, perfil com nulos,
+    tipos e estatísticas, outliers, duplicatas e categorias mais frequentes) em um pool
+    de processos, uma tabela por tarefa, e junta tudo em um `RelatorioEDA`.
+
+    As maiores tabelas são enviadas primeiro, para que a mais lenta não fique para o
+    final. A falha de uma tabela (inclusive a queda do processo) vira um resultado com
+    status 'erro' e o traceback, sem interromper as demais.
+
+    Parâmetros:
+    - db_path: Caminho do banco (ex: data/processed/stg_data.db).
+    - tabelas: Lista de tabelas (se None, `listar_tabelas_eda`).
+    - diretorio_saida: Se informado, grava o relatório (`formato`) e o JSON nesse diretório.
+    - formato: 'markdown' ou 'html'.
+    - processos: Número de processos (se None, um por tabela até o número de CPUs; 1
+      executa tudo no processo atual).
+    - metodo_outliers: 'desvio_padrao' ou 'iqr'.
+    - fator: Multiplicador do desvio padrão ou IQR.
+    - top_n: Categorias mais frequentes listadas por coluna não numérica.
+    - max_linhas_memoria: Tabelas com mais linhas são lidas em blocos (`data_streaming`),
+      com memória constante por processo (se None, todas são lidas em memória).
+    - verbose: Se True, imprime cada tabela ao terminar.
+
+    Retorna:
+    - RelatorioEDA.
+    """
+    if metodo_outliers not in ("desvio_padrao", "iqr"):
+        raise ValueError("Método inválido. Escolha entre 'desvio_padrao' ou 'iqr'.")
+    if formato not in ("markdown", "html"):
+        raise ValueError("Formato inválido. Escolha entre 'markdown' ou 'html'.")
+
+    inicio = time.perf_counter()
+    db_path = os.path.abspath(db_path)
+    linhas = {}
+    conexao = sqlite3.connect(db_path)
+    try:
+        tabelas = listar_tabelas_eda(conexao) if tabelas is None else list(tabelas)
+        for tabela in tabelas:
+            try:
+                linhas[tabela] = conexao.execute(f"SELECT COUNT(*) FROM {citar(tabela)}").fetchone()[0]
+            except sqlite3.Error:
+                linhas[tabela] = None  # o erro aparece no resultado da própria tabela
+    finally:
+        conexao.close()
+
+    ordem = sorted(tabelas, key=lambda t: -(linhas[t] or 0))
+    tarefas = [(db_path, t, metodo_outliers, fator, top_n, max_linhas_memoria, linhas[t]) for t in ordem]
+    if processos is None:
+        processos = min(len(tarefas), os.cpu_count() or 1)
+
+    def ao_concluir(r):
+        if not verbose:
+            return
+        if r["status"] == "ok":
+            print(f"{r['tabela']}: {r['linhas']:,} linhas, {r['colunas']} colunas em {r['segundos']:.2f}s ({r['modo']})")
+        else:
+            print(f"{r['tabela']}: {r['erro']}")
+
+    if processos <= 1:
+        resultados = {}
+        for tarefa in tarefas:
+            resultados[tarefa[1]] = _executar_eda_tabela(*tarefa)
+            ao_concluir(resultados[tarefa[1]])
+    else:
+        resultados = _executar_em_pool(tarefas, processos, ao_concluir)
+
+    resumo = []
+    perfis = {}
+    for tabela in tabelas:
+        r = resultados[tabela]
+        resumo.append({
+            "tabela": tabela,
+            "status": r["status"],
+            "modo": r.get("modo"),
+            "linhas": r.get("linhas", linhas[tabela]),
+            "colunas": r.get("colunas"),
+            "linhas_duplicadas": r.get("linhas_duplicadas"),
+            "grupos_duplicados": r.get("grupos_duplicados"),
+            "segundos": r["segundos"],
+            **{f"segundos_{etapa}": s for etapa, s in r.get("etapas", {}).items()},
+            "pid": r["pid"],
+            "erro": r.get("erro"),
+        })
+        if r["status"] == "ok":
+            perfis[tabela] = r["perfil"]
+
+    colunas = pd.concat(perfis, names=["tabela", "coluna"]) if perfis else pd.DataFrame(columns=COLUNAS_PERFIL)
+    relatorio = RelatorioEDA(
+        db_path=db_path,
+        tabelas=pd.DataFrame(resumo).set_index("tabela").astype(dict.fromkeys(_INTEIRAS_TABELAS, "Int64")),
+        colunas=colunas,
+        categorias={t: resultados[t]["categorias"] for t in perfis},
+        erros={t: r["traceback"] for t, r in resultados.items() if r["status"] == "erro"},
+        segundos=time.perf_counter() - inicio,
+        processos=processos,
+        metodo_outliers=metodo_outliers,
+        fator=fator,
+    )
+    if diretorio_saida is not None:
+        relatorio.salvar(diretorio_saida, formato)
+    return relatorio
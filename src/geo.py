@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Raio médio da Terra em km.
+RAIO_TERRA_KM = 6371.0088
+
+# Limites aproximados do território brasileiro (lat_min, lat_max, lng_min, lng_max); o
+# dataset de geolocalização tem alguns pontos fora do país que distorcem os centroides.
+LIMITES_BRASIL = (-33.75, 5.3, -73.99, -34.79)
+
+# Itens processados por bloco no cálculo das distâncias.
+TAMANHO_BLOCO = 1_000_000
+
+# Calcula a distância haversine (km) entre pares de coordenadas.
+def haversine(lat1, lng1, lat2, lng2):
+    """
+    Distância de grande círculo, em km, entre arrays (ou escalares) de coordenadas em graus.
+    """
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype="float64")) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+# Converte lat/lng em pontos da esfera unitária (a distância euclidiana cresce com a geodésica).
+def _para_xyz(lat, lng):
+    lat, lng = np.radians(lat), np.radians(lng)
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+def _corda_para_km(corda):
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.clip(corda / 2, 0.0, 1.0))
+
+def _km_para_corda(km):
+    return 2 * np.sin(np.minimum(km / RAIO_TERRA_KM, np.pi) / 2)
+
+# Reduz a tabela de geolocalização a um centroide por prefixo de CEP.
+def calcular_centroides(df, col_cep="geolocation_zip_code_prefix", col_lat="geolocation_lat", col_lng="geolocation_lng", col_estado="geolocation_state", limites=LIMITES_BRASIL):
+    """
+    Agrupa os pontos de geolocalização (vários por CEP) em um único centroide por
+    prefixo de CEP, com um só groupby.
+
+    Parâmetros:
+    - df: DataFrame de geolocalização (ex: stg_olist_geolocation).
+    - col_cep, col_lat, col_lng, col_estado: Colunas do prefixo, latitude, longitude e estado.
+    - limites: Tupla (lat_min, lat_max, lng_min, lng_max); pontos fora são descartados
+      antes da média (None para não filtrar).
+
+    Retorna:
+    - DataFrame indexado pelo prefixo com lat, lng, pontos e estado (o mais frequente).
+    """
+    colunas = [col_cep, col_lat, col_lng] + ([col_estado] if col_estado in df.columns else [])
+    pontos = df[colunas]
+    if limites is not None:
+        lat_min, lat_max, lng_min, lng_max = limites
+        pontos = pontos[pontos[col_lat].between(lat_min, lat_max) & pontos[col_lng].between(lng_min, lng_max)]
+
+    centroides = pontos.groupby(col_cep, sort=True).agg(lat=(col_lat, "mean"), lng=(col_lng, "mean"), pontos=(col_lat, "size"))
+    if col_estado in pontos.columns:
+        contagens = pontos.groupby([col_cep, col_estado], observed=True).size().rename("n").reset_index()
+        estado = contagens.sort_values([col_cep, "n"], ascending=[True, False], kind="stable").drop_duplicates(col_cep)
+        centroides["estado"] = estado.set_index(col_cep)[col_estado]
+    centroides.index.name = "zip_code_prefix"
+    return centroides
+
+class IndiceGeografico:
+    """
+    Índice espacial (KD-tree sobre a esfera unitária) dos centroides de CEP.
+
+    Responde consultas de vizinhos mais próximos e de raio em km, e localiza prefixos de
+    CEP; prefixos sem geolocalização usam o prefixo conhecido numericamente mais próximo
+    (os CEPs brasileiros são atribuídos por região).
+    """
+
+    def __init__(self, centroides):
+        self.centroides = centroides.sort_index()
+        self.prefixos = self.centroides.index.to_numpy()
+        self.lat = self.centroides["lat"].to_numpy(dtype="float64")
+        self.lng = self.centroides["lng"].to_numpy(dtype="float64")
+        self.arvore = cKDTree(_para_xyz(self.lat, self.lng))
+
+    @classmethod
+    def de_geolocalizacao(cls, df, **kwargs):
+        """Cria o índice direto da tabela de geolocalização (ver `calcular_centroides`)."""
+        return cls(calcular_centroides(df, **kwargs))
+
+    def posicoes(self, prefixos, aproximar=True):
+        """
+        Posição de cada prefixo em `self.prefixos`.
+
+        Parâmetros:
+        - prefixos: Array de prefixos de CEP.
+        - aproximar: Se True, prefixos desconhecidos usam o prefixo conhecido mais próximo;
+          se False, recebem -1.
+
+        Retorna:
+        - Array de posições (int64).
+        """
+        prefixos = pd.to_numeric(pd.Series(prefixos), errors="coerce").to_numpy(dtype="float64")
+        direita = np.clip(np.searchsorted(self.prefixos, prefixos), 0, len(self.prefixos) - 1)
+        esquerda = np.maximum(direita - 1, 0)
+        exato = self.prefixos[direita] == prefixos
+        if not aproximar:
+            return np.where(exato, direita, -1)
+        mais_perto = np.where(np.abs(self.prefixos[esquerda] - prefixos) <= np.abs(self.prefixos[direita] - prefixos), esquerda, direita)
+        return np.where(np.isnan(prefixos), -1, np.where(exato, direita, mais_perto))
+
+    def coordenadas(self, prefixos, aproximar=True):
+        """
+        Latitude e longitude de cada prefixo (NaN quando não localizado).
+
+        Retorna:
+        - Tupla (lat, lng) de arrays.
+        """
+        posicoes = self.posicoes(prefixos, aproximar)
+        validas = posicoes >= 0
+        lat = np.where(validas, self.lat[posicoes], np.nan)
+        lng = np.where(validas, self.lng[posicoes], np.nan)
+        return lat, lng
+
+    def vizinhos(self, lat, lng, k=1):
+        """
+        Os `k` prefixos mais próximos de cada coordenada.
+
+        Retorna:
+        - Tupla (distancias_km, prefixos), arrays com forma (n, k). Coordenadas nulas ou
+          não finitas (e vizinhos além dos prefixos existentes) recebem distância NaN e
+          prefixo -1 (None se os prefixos não forem inteiros).
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype="float64"))
+        lng = np.atleast_1d(np.asarray(lng, dtype="float64"))
+        inteiros = self.prefixos.dtype.kind in "iu"
+        distancias = np.full((len(lat), k), np.nan)
+        prefixos = np.full((len(lat), k), -1 if inteiros else None, dtype=self.prefixos.dtype if inteiros else object)
+
+        # O KD-tree só aceita coordenadas finitas: as demais ficam vazias
+        finitas = np.isfinite(lat) & np.isfinite(lng)
+        if finitas.any():
+            corda, indices = self.arvore.query(_para_xyz(lat[finitas], lng[finitas]), k=k)
+            corda, indices = corda.reshape(-1, k), indices.reshape(-1, k)
+            # Com k maior que o número de prefixos, o KD-tree devolve o índice n (distância inf)
+            encontrados = indices < len(self.prefixos)
+            distancias_finitas, prefixos_finitos = distancias[finitas], prefixos[finitas]
+            distancias_finitas[encontrados] = _corda_para_km(corda[encontrados])
+            prefixos_finitos[encontrados] = self.prefixos[indices[encontrados]]
+            distancias[finitas], prefixos[finitas] = distancias_finitas, prefixos_finitos
+        return distancias, prefixos
+
+    def no_raio(self, lat, lng, raio_km):
+        """
+        Prefixos a até `raio_km` de uma coordenada, do mais próximo ao mais distante.
+
+        Retorna:
+        - DataFrame com zip_code_prefix, distancia_km, lat e lng (vazio se a coordenada
+          for nula ou não finita).
+        """
+        if not (np.isfinite(lat) and np.isfinite(lng)):
+            indices = np.empty(0, dtype="int64")
+            return pd.DataFrame({
+                "zip_code_prefix": self.prefixos[indices], "distancia_km": np.empty(0),
+                "lat": np.empty(0), "lng": np.empty(0),
+            })
+        indices = np.asarray(self.arvore.query_ball_point(_para_xyz([lat], [lng])[0], _km_para_corda(raio_km)), dtype="int64")
+        distancias = haversine(lat, lng, self.lat[indices], self.lng[indices])
+        ordem = np.argsort(distancias, kind="stable")
+        return pd.DataFrame({
+            "zip_code_prefix": self.prefixos[indices][ordem],
+            "distancia_km": distancias[ordem],
+            "lat": self.lat[indices][ordem],
+            "lng": self.lng[indices][ordem],
+        })
+
+    def vizinhos_cep(self, prefixo, k=5):
+        """
+        Os `k` prefixos conhecidos mais próximos de um prefixo (conhecido ou não; o
+        próprio prefixo, se conhecido, vem primeiro com distância 0). Um prefixo que não
+        é número devolve as `k` linhas com prefixo -1 e distância NaN.
+
+        Retorna:
+        - DataFrame com zip_code_prefix e distancia_km.
+        """
+        lat, lng = self.coordenadas([prefixo])
+        distancias, prefixos = self.vizinhos(lat, lng, k)
+        return pd.DataFrame({"zip_code_prefix": prefixos[0], "distancia_km": distancias[0]})
+
+    def cep_no_raio(self, prefixo, raio_km):
+        """
+        Prefixos a até `raio_km` de um prefixo (conhecido ou não).
+        """
+        lat, lng = self.coordenadas([prefixo])
+        return self.no_raio(lat[0], lng[0], raio_km)
+
+# Calcula a distância cliente -> vendedor de cada item de pedido.
+def calcular_distancias_itens(itens, pedidos, clientes, vendedores, indice, tamanho_bloco=TAMANHO_BLOCO, aproximar=True):
+    """
+    Distância haversine (km) entre o CEP do cliente e o do vendedor de cada item de
+    pedido, calculada em blocos de `tamanho_bloco` itens para limitar a memória.
+
+    Parâmetros:
+    - itens: Itens de pedido (order_id, seller_id).
+    - pedidos: Pedidos (order_id, customer_id).
+    - clientes: Clientes (customer_id, customer_zip_code_prefix).
+    - vendedores: Vendedores (seller_id, seller_zip_code_prefix).
+    - indice: IndiceGeografico com os centroides.
+    - tamanho_bloco: Itens processados por vez.
+    - aproximar: Se True, CEPs sem geolocalização usam o prefixo conhecido mais próximo.
+
+    Retorna:
+    - Series (alinhada ao índice de `itens`) com a distância em km (NaN se o CEP não foi
+      localizado).
+    """
+    # Posição do centroide de cada cliente e vendedor, calculada uma vez por entidade
+    posicao_cliente = pd.Series(indice.posicoes(clientes["customer_zip_code_prefix"], aproximar), index=clientes["customer_id"].to_numpy())
+    posicao_cliente = posicao_cliente[~posicao_cliente.index.duplicated()]
+    posicao_pedido = pd.Series(
+        posicao_cliente.reindex(pedidos["customer_id"].to_numpy(), fill_value=-1).to_numpy(), index=pedidos["order_id"].to_numpy()
+    )
+    posicao_pedido = posicao_pedido[~posicao_pedido.index.duplicated()]
+    posicao_vendedor = pd.Series(indice.posicoes(vendedores["seller_zip_code_prefix"], aproximar), index=vendedores["seller_id"].to_numpy())
+    posicao_vendedor = posicao_vendedor[~posicao_vendedor.index.duplicated()]
+
+    # Latitude/longitude em radianos com uma posição extra (NaN) para os não localizados
+    lat = np.radians(np.append(indice.lat, np.nan))
+    lng = np.radians(np.append(indice.lng, np.nan))
+    cos_lat = np.cos(lat)
+
+    distancias = np.empty(len(itens), dtype="float64")
+    ids_pedido = itens["order_id"].to_numpy()
+    ids_vendedor = itens["seller_id"].to_numpy()
+    for inicio in range(0, len(itens), tamanho_bloco):
+        fim = inicio + tamanho_bloco
+        a = posicao_pedido.reindex(ids_pedido[inicio:fim], fill_value=-1).to_numpy()
+        b = posicao_vendedor.reindex(ids_vendedor[inicio:fim], fill_value=-1).to_numpy()
+        h = np.sin((lat[b] - lat[a]) / 2) ** 2 + cos_lat[a] * cos_lat[b] * np.sin((lng[b] - lng[a]) / 2) ** 2
+        distancias[inicio:fim] = 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+    return pd.Series(distancias, index=itens.index, name="distancia_km")
@@ -0,0 +1,312 @@
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Variável de ambiente que ativa a instrumentação ao importar o pacote.
+VARIAVEL_AMBIENTE = "SRC_INSTRUMENTACAO"
+
+# Variável de ambiente com o caminho do Chrome trace gravado ao final do processo.
+VARIAVEL_TRACE = "SRC_INSTRUMENTACAO_TRACE"
+
+# Lido a cada chamada das funções instrumentadas; com False elas só repassam a chamada.
+_ATIVO = False
+_MEDIR_MEMORIA = True
+_INICIOU_TRACEMALLOC = False
+# Thread em que o pico de memória é medido (a que ativou a instrumentação).
+_THREAD_MEMORIA = None
+_COPIAS_ORIGINAIS = {}
+_pilha = threading.local()
+
+class RegistroInstrumentacao:
+    """
+    Registro em memória das chamadas instrumentadas do processo.
+
+    Cada chamada guarda função, módulo, início, duração, linhas de entrada e saída,
+    linhas/s, pico de memória (tracemalloc) e cópias de DataFrame/Series feitas durante
+    a chamada (inclusive pelas funções chamadas por ela).
+
+    O pico do tracemalloc é um só para o processo: ele só é medido nas chamadas da thread
+    que ativou a instrumentação (nas outras threads `pico_memoria_mb` fica None), e
+    alocações feitas ao mesmo tempo por outras threads entram no pico dessa thread.
+    """
+
+    def __init__(self):
+        self.chamadas = []
+        self._trava = threading.Lock()
+        self._origem = time.perf_counter_ns()
+
+    def registrar(self, chamada):
+        with self._trava:
+            self.chamadas.append(chamada)
+
+    def limpar(self):
+        """Remove todas as chamadas registradas."""
+        with self._trava:
+            self.chamadas.clear()
+            self._origem = time.perf_counter_ns()
+
+    def tabela(self):
+        """DataFrame com uma linha por chamada."""
+        colunas = ["funcao", "modulo", "segundos", "linhas_entrada", "linhas_saida", "linhas_por_segundo", "pico_memoria_mb", "copias", "profundidade", "thread"]
+        return pd.DataFrame(self.chamadas, columns=colunas + ["inicio_ns"]).drop(columns="inicio_ns")
+
+    def resumo(self):
+        """
+        Resumo por função, ordenado pelo tempo total.
+
+        Retorna:
+        - DataFrame com chamadas, tempo total/médio/máximo (s), linhas de entrada e saída,
+          linhas/s, maior pico de memória (MB) e total de cópias.
+        """
+        tabela = self.tabela()
+        if tabela.empty:
+            return pd.DataFrame(columns=["chamadas", "segundos_total", "segundos_medio", "segundos_max", "linhas_entrada", "linhas_saida", "linhas_por_segundo", "pico_memoria_mb", "copias"])
+        resumo = tabela.groupby(["modulo", "funcao"]).agg(
+            chamadas=("segundos", "size"),
+            segundos_total=("segundos", "sum"),
+            segundos_medio=("segundos", "mean"),
+            segundos_max=("segundos", "max"),
+            linhas_entrada=("linhas_entrada", "sum"),
+            linhas_saida=("linhas_saida", "sum"),
+            pico_memoria_mb=("pico_memoria_mb", "max"),
+            copias=("copias", "sum"),
+        )
+        resumo.insert(6, "linhas_por_segundo", resumo["linhas_entrada"] / resumo["segundos_total"].where(resumo["segundos_total"] > 0))
+        return resumo.sort_values("segundos_total", ascending=False)
+
+    def exportar_chrome_trace(self, caminho):
+        """
+        Grava as chamadas no formato Trace Event (abrir em chrome://tracing ou no Perfetto).
+        Chamadas aninhadas aparecem empilhadas na mesma thread.
+        """
+        eventos = []
+        for chamada in list(self.chamadas):
+            eventos.append({
+                "name": chamada["funcao"],
+                "cat": chamada["modulo"],
+                "ph": "X",
+                "ts": (chamada["inicio_ns"] - self._origem) / 1000,
+                "dur": chamada["segundos"] * 1e6,
+                "pid": os.getpid(),
+                "tid": chamada["thread"],
+                "args": {chave: chamada[chave] for chave in ("linhas_entrada", "linhas_saida", "pico_memoria_mb", "copias")},
+            })
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+        return caminho
+
+# Registro global do processo.
+registro = RegistroInstrumentacao()
+
+# Quadro da chamada em andamento (um por nível de aninhamento).
+class _Quadro:
+    __slots__ = ("base", "pico", "copias")
+
+    def __init__(self, base):
+        self.base = base
+        self.pico = base
+        self.copias = 0
+
+def _quadros():
+    quadros = getattr(_pilha, "quadros", None)
+    if quadros is None:
+        quadros = _pilha.quadros = []
+    return quadros
+
+# Quantidade de linhas de um argumento ou resultado (None se não for tabular).
+def _linhas(objeto):
+    if isinstance(objeto, (pd.DataFrame, pd.Series)):
+        return len(objeto)
+    df = getattr(objeto, "df", None)
+    if isinstance(df, pd.DataFrame):
+        return len(df)
+    return None
+
+def _linhas_entrada(args, kwargs):
+    for valor in (*args, *kwargs.values()):
+        linhas = _linhas(valor)
+        if linhas is not None:
+            return linhas
+    return None
+
+# Substituto de DataFrame.copy / Series.copy que conta as cópias da chamada atual.
+def _contar_copia(original):
+    @functools.wraps(original)
+    def copy(self, deep=True):
+        if deep and _ATIVO:
+            quadros = _quadros()
+            if quadros:
+                quadros[-1].copias += 1
+        return original(self, deep=deep)
+    return copy
+
+# Executa uma chamada instrumentada e grava o resultado no registro.
+def _executar_instrumentado(funcao, modulo, args, kwargs):
+    quadros = _quadros()
+    # `reset_peak` zera o pico do processo inteiro: só uma thread pode usá-lo
+    medir_memoria = _MEDIR_MEMORIA and threading.get_ident() == _THREAD_MEMORIA
+    if medir_memoria:
+        atual, pico = tracemalloc.get_traced_memory()
+        if quadros:
+            quadros[-1].pico = max(quadros[-1].pico, pico)
+        tracemalloc.reset_peak()
+    else:
+        atual = 0
+    quadro = _Quadro(atual)
+    quadros.append(quadro)
+
+    inicio = time.perf_counter_ns()
+    try:
+        resultado = funcao(*args, **kwargs)
+    finally:
+        duracao = (time.perf_counter_ns() - inicio) / 1e9
+        quadros.pop()
+        if medir_memoria:
+            quadro.pico = max(quadro.pico, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if quadros:
+            # A chamada externa herda o pico e as cópias das chamadas internas
+            quadros[-1].pico = max(quadros[-1].pico, quadro.pico)
+            quadros[-1].copias += quadro.copias
+
+    linhas_entrada = _linhas_entrada(args, kwargs)
+    registro.registrar({
+        "funcao": funcao.__name__,
+        "modulo": modulo,
+        "segundos": duracao,
+        "linhas_entrada": linhas_entrada,
+        "linhas_saida": _linhas(resultado),
+        "linhas_por_segundo": linhas_entrada / duracao if linhas_entrada and duracao > 0 else None,
+        "pico_memoria_mb": (quadro.pico - quadro.base) / 2**20 if medir_memoria else None,
+        "copias": quadro.copias,
+        "profundidade": len(quadros),
+        "thread": threading.get_ident(),
+        "inicio_ns": inicio,
+    })
+    return resultado
+
+# Envolve uma função para que ela seja medida quando a instrumentação estiver ativa.
+def instrumentado(funcao, modulo=None):
+    """
+    Decorador que registra tempo, linhas, memória e cópias da função enquanto a
+    instrumentação estiver ativa. Desativada, o custo é só um teste de flag.
+    """
+    modulo = modulo or funcao.__module__
+
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        if not _ATIVO:
+            return funcao(*args, **kwargs)
+        return _executar_instrumentado(funcao, modulo, args, kwargs)
+
+    envoltorio.__instrumentado__ = True
+    return envoltorio
+
+# Instrumenta todas as funções públicas definidas em um módulo.
+def instrumentar_modulo(namespace):
+    """
+    Substitui, no namespace do módulo (`globals()`), cada função pública definida nele
+    pela versão instrumentada. Chamadas internas do módulo também passam a ser medidas.
+    """
+    nome_modulo = namespace["__name__"]
+    for nome, objeto in list(namespace.items()):
+        if (
+            not nome.startswith("_")
+            and inspect.isfunction(objeto)
+            and objeto.__module__ == nome_modulo
+            and not getattr(objeto, "__instrumentado__", False)
+        ):
+            namespace[nome] = instrumentado(objeto, nome_modulo.rsplit(".", 1)[-1])
+
+# Ativa a instrumentação no processo.
+def ativar_instrumentacao(memoria=True):
+    """
+    Ativa a medição das funções de `data_preprocessing`, `data_analysis` e `visualization`.
+
+    Parâmetros:
+    - memoria: Se True, mede o pico de memória com tracemalloc (deixa as chamadas mais
+      lentas), só nas chamadas feitas na thread atual.
+    """
+    global _ATIVO, _MEDIR_MEMORIA, _INICIOU_TRACEMALLOC, _THREAD_MEMORIA
+    _MEDIR_MEMORIA = memoria
+    _THREAD_MEMORIA = threading.get_ident()
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _INICIOU_TRACEMALLOC = True
+    if not _COPIAS_ORIGINAIS:
+        for classe in (pd.DataFrame, pd.Series):
+            _COPIAS_ORIGINAIS[classe] = classe.copy
+            classe.copy = _contar_copia(classe.copy)
+    _ATIVO = True
+
+# Desativa a instrumentação (o registro é mantido).
+def desativar_instrumentacao():
+    """
+    Desativa a medição e restaura `DataFrame.copy`/`Series.copy`. As chamadas já
+    registradas continuam em `registro`.
+    """
+    global _ATIVO, _INICIOU_TRACEMALLOC
+    _ATIVO = False
+    for classe, original in _COPIAS_ORIGINAIS.items():
+        classe.copy = original
+    _COPIAS_ORIGINAIS.clear()
+    if _INICIOU_TRACEMALLOC:
+        tracemalloc.stop()
+        _INICIOU_TRACEMALLOC = False
+
+def instrumentacao_ativa():
+    """Indica se a instrumentação está ativa."""
+    return _ATIVO
+
+# Ativa a instrumentação dentro de um bloco `with`.
+@contextmanager
+def instrumentar(memoria=True, limpar=True):
+    """
+    Ativa a instrumentação dentro do bloco e devolve o registro.
+
+    Exemplo:
+        with instrumentar() as reg:
+            df = preencher_nulos(df)
+        reg.resumo()
+
+    Parâmetros:
+    - memoria: Se True, mede o pico de memória com tracemalloc.
+    - limpar: Se True, limpa o registro antes de começar.
+    """
+    ja_ativo = _ATIVO
+    if limpar:
+        registro.limpar()
+    if not ja_ativo:
+        ativar_instrumentacao(memoria)
+    try:
+        yield registro
+    finally:
+        if not ja_ativo:
+            desativar_instrumentacao()
+
+# Retorna o resumo por função do registro global.
+def resumo_instrumentacao():
+    """
+    Atalho para `registro.resumo()`.
+    """
+    return registro.resumo()
+
+# Grava o registro global como Chrome trace.
+def exportar_chrome_trace(caminho):
+    """
+    Atalho para `registro.exportar_chrome_trace(caminho)`.
+    """
+    return registro.exportar_chrome_trace(caminho)
+
+if os.environ.get(VARIAVEL_AMBIENTE, "").lower() in ("1", "true", "sim"):
+    ativar_instrumentacao()
+    if os.environ.get(VARIAVEL_TRACE):
+        atexit.register(exportar_chrome_trace, os.environ[VARIAVEL_TRACE])
@@ -0,0 +1,718 @@
+import copy
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_analysis import calcular_outliers
+    from .data_preprocessing import METODOS_IMPUTACAO, Imputacao, ajustar_imputacao, aplicar_esquema, aplicar_mapeamento, ler_esquema_sql, preencher_serie
+    from .data_streaming import TAMANHO_CHUNK, AcumuladorMomentos, SketchQuantis, colunas_numericas_sql
+    from .sqlite_utils import citar, colunas_tabela, conectar
+except ImportError:
+    from data_analysis import calcular_outliers
+    from data_preprocessing import METODOS_IMPUTACAO, Imputacao, ajustar_imputacao, aplicar_esquema, aplicar_mapeamento, ler_esquema_sql, preencher_serie
+    from data_streaming import TAMANHO_CHUNK, AcumuladorMomentos, SketchQuantis, colunas_numericas_sql
+    from sqlite_utils import citar, colunas_tabela, conectar
+
+# Operadores aceitos por `Pipeline.filtrar` e o equivalente no SQLite.
+OPERADORES = {
+    "==": "=", "!=": "<>", ">": ">", ">=": ">=", "<": "<", "<=": "<=",
+    "in": "IN", "not in": "NOT IN", "nulo": "IS NULL", "nao_nulo": "IS NOT NULL",
+}
+
+@dataclass
+class Passo:
+    """
+    Um passo do plano de um Pipeline.
+
+    Atributos:
+    - tipo: 'filtro', 'substituir', 'converter', 'outliers', 'normalizar' ou 'imputar'.
+    - colunas: Colunas alteradas pelo passo (a coluna testada, no filtro).
+    - entradas: Colunas lidas pelo passo (inclui as alteradas).
+    - parametros: Argumentos do passo.
+    - passagem: Passagem de ajuste (em blocos) em que as estatísticas do passo são
+      calculadas; 0 para os passos que não dependem dos dados.
+    """
+    tipo: str
+    colunas: list
+    entradas: list
+    parametros: dict
+    passagem: int = 0
+
+    @property
+    def precisa_ajuste(self):
+        if self.tipo in ("outliers", "normalizar"):
+            return True
+        return self.tipo == "imputar" and any(
+            isinstance(e, str) and e in METODOS_IMPUTACAO and e != "zero" for e in self.parametros["estrategias"].values()
+        )
+
+    def __str__(self):
+        p = self.parametros
+        if self.tipo == "filtro":
+            return f"{self.colunas[0]} {p['operador']}" + ("" if p["operador"] in ("nulo", "nao_nulo") else f" {p['valor']!r}")
+        if self.tipo == "substituir":
+            return "substituir" + (f" (por {p['col_estado']})" if p.get("col_estado") else "")
+        if self.tipo == "converter":
+            return f"converter({p['tipo']})"
+        if self.tipo == "outliers":
+            return f"outliers({p['metodo']}, {p['fator']})"
+        if self.tipo == "normalizar":
+            return f"normalizar({p['metodo']})"
+        estrategias = sorted({str(e) for e in p["estrategias"].values()})
+        grupos = sorted(set(p["grupos"].values()))
+        return f"imputar({', '.join(estrategias)}" + (f" por {', '.join(grupos)})" if grupos else ")")
+
+# Máscara booleana de um filtro (nulos seguem a mesma regra da tradução para SQL).
+def _mascara_filtro(serie, operador, valor):
+    if operador == "nulo":
+        return serie.isna()
+    if operador == "nao_nulo":
+        return serie.notna()
+    if operador == "in":
+        return serie.isin(valor)
+    if operador == "not in":
+        return ~serie.isin(valor)
+    comparacoes = {"==": serie.eq, "!=": serie.ne, ">": serie.gt, ">=": serie.ge, "<": serie.lt, "<=": serie.le}
+    return comparacoes[operador](valor)
+
+def _tipo_numerico(tipo):
+    if tipo in ("datetime", "category"):
+        return False
+    try:
+        return pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(tipo))
+    except TypeError:
+        return False
+
+def _parametro_sql(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(valor))
+    return valor
+
+# Traduz um filtro para uma condição SQL com parâmetros.
+def _filtro_sql(passo):
+    coluna, operador, valor = citar(passo.colunas[0]), passo.parametros["operador"], passo.parametros["valor"]
+    if operador in ("nulo", "nao_nulo"):
+        return f"{coluna} {OPERADORES[operador]}", []
+    if operador in ("in", "not in"):
+        # No pandas `isin` casa os nulos da lista com os da coluna e `~isin` mantém os nulos
+        # quando a lista não tem nenhum; no SQL `IN`/`NOT IN` nunca casam NULL
+        tem_nulo = any(pd.isna(v) for v in valor)
+        valores = [_parametro_sql(v) for v in valor if not pd.isna(v)]
+        condicao = f"{coluna} {OPERADORES[operador]} ({', '.join('?' * len(valores))})"
+        if operador == "in":
+            return (f"({condicao} OR {coluna} IS NULL)" if tem_nulo else condicao), valores
+        return (f"({condicao} AND {coluna} IS NOT NULL)" if tem_nulo else f"({condicao} OR {coluna} IS NULL)"), valores
+    if operador == "!=":
+        return f"({coluna} <> ? OR {coluna} IS NULL)", [_parametro_sql(valor)]
+    return f"{coluna} {OPERADORES[operador]} ?", [_parametro_sql(valor)]
+
+# --- Aplicação dos passos (iguais em memória e em blocos) ---
+
+def _aplicar_substituir(serie, parametros):
+    valores_antigos = parametros["valores_antigos"]
+    if isinstance(valores_antigos, pd.DataFrame):
+        return aplicar_mapeamento(pd.DataFrame({serie.name: serie}), serie.name, valores_antigos)
+    if isinstance(valores_antigos, dict):
+        return serie.replace(valores_antigos)
+    return serie.replace(valores_antigos, parametros["novo_valor"])
+
+def _aplicar_converter(serie, tipo):
+    if tipo == "datetime":
+        return pd.to_datetime(serie, errors="coerce")
+    try:
+        return serie.astype(tipo)
+    except (TypeError, ValueError):
+        return serie
+
+def _aplicar_coluna(passo, serie, ajuste):
+    if passo.tipo == "substituir":
+        return _aplicar_substituir(serie, passo.parametros)
+    if passo.tipo == "converter":
+        return _aplicar_converter(serie, passo.parametros["tipo"])
+    if passo.tipo == "outliers":
+        limite_inferior, limite_superior = ajuste
+        valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            fora = (valores < limite_inferior) | (valores > limite_superior)
+        return serie.mask(fora) if fora.any() else serie
+    if passo.tipo == "normalizar":
+        deslocamento, escala = ajuste
+        return (serie - deslocamento) / escala
+    estrategia = passo.parametros["estrategias"][serie.name]
+    if estrategia == "zero":
+        return preencher_serie(serie, 0)
+    return preencher_serie(serie, ajuste if passo.precisa_ajuste else estrategia)
+
+# --- Ajuste exato (em memória) ---
+
+def _ajustar_coluna(passo, serie):
+    if passo.tipo == "outliers":
+        limites = calcular_outliers(pd.DataFrame({serie.name: serie}), [serie.name], passo.parametros["metodo"], passo.parametros["fator"]).limites
+        return limites["limite_inferior"].iloc[0], limites["limite_superior"].iloc[0]
+    if passo.tipo == "normalizar":
+        if passo.parametros["metodo"] == "min_max":
+            return serie.min(), serie.max() - serie.min()
+        return serie.mean(), serie.std()
+    return ajustar_imputacao(pd.DataFrame({serie.name: serie}), {serie.name: passo.parametros["estrategias"][serie.name]}).valores[serie.name]
+
+# --- Ajuste aproximado/exato em blocos ---
+
+class _AcumuladorPasso:
+    """
+    Acumula, bloco a bloco, as estatísticas de um passo: momentos (exatos) para média,
+    desvio, mínimo e máximo, sketch KLL para quartis e mediana, contagens para a moda.
+    """
+
+    def __init__(self, passo):
+        self.passo = passo
+        self.momentos = AcumuladorMomentos(1)
+        self.sketch = SketchQuantis(semente=0)
+        self.contagens = None
+        self.grupos = defaultdict(lambda: {"momentos": AcumuladorMomentos(1), "sketch": SketchQuantis(semente=0)})
+        self.contagens_grupo = None
+
+    def _metodo(self):
+        p = self.passo.parametros
+        if self.passo.tipo == "imputar":
+            return p["estrategias"][self.passo.colunas[0]]
+        return p["metodo"]
+
+    def atualizar(self, dados):
+        coluna = self.passo.colunas[0]
+        serie = dados[coluna]
+        metodo = self._metodo()
+        if metodo == "moda":
+            contagens = serie.value_counts()
+            self.contagens = contagens if self.contagens is None else self.contagens.add(contagens, fill_value=0)
+        else:
+            valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+            self.momentos.atualizar(valores[:, None])
+            if metodo in ("iqr", "mediana"):
+                self.sketch.atualizar(valores)
+
+        grupo = self.passo.parametros.get("grupos", {}).get(coluna)
+        if grupo is None:
+            return
+        if metodo == "moda":
+            contagens = dados.groupby([grupo, coluna], observed=True).size()
+            self.contagens_grupo = contagens if self.contagens_grupo is None else self.contagens_grupo.add(contagens, fill_value=0)
+            return
+        for chave, parte in dados.groupby(grupo, observed=True)[coluna]:
+            valores = parte.to_numpy(dtype="float64", na_value=np.nan)
+            self.grupos[chave]["momentos"].atualizar(valores[:, None])
+            if metodo == "mediana":
+                self.grupos[chave]["sketch"].atualizar(valores)
+
+    def finalizar(self):
+        p = self.passo.parametros
+        metodo = self._metodo()
+        m = self.momentos
+        media, desvio = m.media[0] if m.n[0] else np.nan, m.desvio_padrao[0]
+        if self.passo.tipo == "outliers":
+            if metodo == "desvio_padrao":
+                return media - p["fator"] * desvio, media + p["fator"] * desvio
+            q1, q3 = self.sketch.quantil([0.25, 0.75])
+            return q1 - p["fator"] * (q3 - q1), q3 + p["fator"] * (q3 - q1)
+        if self.passo.tipo == "normalizar":
+            if metodo == "min_max":
+                return m.minimo[0], m.maximo[0] - m.minimo[0]
+            return media, desvio
+
+        coluna = self.passo.colunas[0]
+        if metodo == "moda":
+            valor = _moda_de_contagens(self.contagens)
+        else:
+            valor = media if metodo == "media" else self.sketch.quantil(0.5)
+        grupo = p.get("grupos", {}).get(coluna)
+        if grupo is None:
+            return valor
+        if metodo == "moda":
+            if self.contagens_grupo is None:
+                por_grupo = pd.Series(dtype=object)
+            else:
+                contagens = self.contagens_grupo.rename("n").reset_index()
+                contagens = contagens.sort_values([grupo, "n", coluna], ascending=[True, False, True], kind="stable")
+                por_grupo = contagens.drop_duplicates(grupo).set_index(grupo)[coluna]
+        else:
+            por_grupo = pd.Series({
+                chave: (e["momentos"].media[0] if metodo == "media" else e["sketch"].quantil(0.5))
+                for chave, e in self.grupos.items() if e["momentos"].n[0]
+            }, dtype="float64")
+        return Imputacao(valores={coluna: valor}, valores_grupo={coluna: por_grupo}, grupos={coluna: grupo})
+
+# Moda a partir das contagens acumuladas (menor valor em caso de empate, como em Series.mode).
+def _moda_de_contagens(contagens):
+    if contagens is None or contagens.empty:
+        return np.nan
+    maiores = contagens[contagens == contagens.max()]
+    return maiores.sort_index().index[0]
+
+@dataclass
+class _Nucleo:
+    """Passos de uma coluna executados em sequência sobre a mesma Series."""
+    coluna: str
+    passos: list
+
+@dataclass
+class Plano:
+    """
+    Plano compilado de um Pipeline (ver `Pipeline.explicar`).
+
+    Atributos:
+    - consulta: SELECT enviado ao SQLite (None para fonte DataFrame).
+    - parametros: Parâmetros da consulta.
+    - colunas_fonte: Colunas disponíveis na fonte.
+    - colunas_lidas: Colunas lidas da fonte.
+    - colunas_saida: Colunas do resultado.
+    - filtros_fonte: Filtros aplicados na leitura (no SQL ou na máscara inicial).
+    - etapas: Lista de _Nucleo (passos fundidos por coluna) e Passo (filtros e passos
+      que leem várias colunas), na ordem de execução.
+    - passagens_ajuste: Passagens de leitura em blocos necessárias para as estatísticas.
+    - passagens_encadeado: Estimativa de passagens sobre a tabela chamando as funções
+      uma a uma.
+    - passagens_fundido: Passagens do plano fundido em memória.
+    """
+    consulta: str
+    parametros: list
+    colunas_fonte: list
+    colunas_lidas: list
+    colunas_saida: list
+    filtros_fonte: list
+    etapas: list
+    passagens_ajuste: int
+    passagens_encadeado: int
+    passagens_fundido: int
+
+class Pipeline:
+    """
+    Pipeline preguiçoso de limpeza: os métodos só registram passos e retornam um novo
+    Pipeline; nada é lido nem calculado até `executar`.
+
+    Na compilação, os passos de cada coluna são fundidos em um núcleo aplicado sobre a
+    mesma Series (uma leitura e uma escrita por coluna, sem cópias do DataFrame nem
+    invalidação de cache a cada passo); só as colunas usadas são lidas e os filtros que
+    vêm antes de qualquer passo dependente de estatísticas vão para o WHERE do SQLite.
+
+    Exemplo:
+        p = (Pipeline("data/processed/stg_data.db", "stg_olist_order_items")
+             .selecionar(["order_id", "price", "freight_value"])
+             .filtrar("price", ">", 0)
+             .excluir_outliers("price", metodo="iqr", fator=1.5)
+             .normalizar_coluna("freight_value", "z_score"))
+        print(p.explain())
+        df = p.executar()                      # tudo em memória
+        for bloco in p.executar_em_blocos():   # ou bloco a bloco
+            ...
+    """
+
+    def __init__(self, fonte, tabela=None):
+        """
+        Parâmetros:
+        - fonte: DataFrame, caminho de um banco SQLite ou conexão sqlite3 aberta.
+        - tabela: Tabela lida quando a fonte é um banco (ex: 'stg_olist_order_items').
+        """
+        if not isinstance(fonte, pd.DataFrame) and tabela is None:
+            raise ValueError("Informe a tabela quando a fonte for um banco SQLite.")
+        self.fonte = fonte
+        self.tabela = tabela
+        self.colunas = None
+        self.passos = []
+
+    def _com(self, passo=None, colunas=None):
+        novo = copy.copy(self)
+        novo.passos = self.passos + ([passo] if passo is not None else [])
+        if colunas is not None:
+            novo.colunas = colunas
+        return novo
+
+    # --- Registro dos passos ---
+
+    def selecionar(self, colunas):
+        """Mantém só estas colunas no resultado (e lê da fonte só o necessário)."""
+        return self._com(colunas=[colunas] if isinstance(colunas, str) else list(colunas))
+
+    def filtrar(self, coluna, operador, valor=None):
+        """
+        Mantém as linhas em que `coluna <operador> valor`.
+
+        Parâmetros:
+        - coluna: Nome da coluna.
+        - operador: '==', '!=', '>', '>=', '<', '<=', 'in', 'not in', 'nulo' ou 'nao_nulo'.
+        - valor: Valor comparado (lista para 'in'/'not in').
+        """
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador inválido. Escolha entre {', '.join(map(repr, OPERADORES))}.")
+        return self._com(Passo("filtro", [coluna], [coluna], {"operador": operador, "valor": valor}))
+
+    def substituir_valores(self, col_name, valores_antigos, novo_valor=None, col_estado=None):
+        """Mesmos argumentos de `substituir_valores`."""
+        if isinstance(valores_antigos, pd.DataFrame) and "estado" in valores_antigos.columns and not col_estado:
+            raise ValueError("A tabela de mapeamento é por estado: informe col_estado.")
+        entradas = [col_name] + ([col_estado] if col_estado and isinstance(valores_antigos, pd.DataFrame) else [])
+        parametros = {"valores_antigos": valores_antigos, "novo_valor": novo_valor, "col_estado": entradas[1] if len(entradas) > 1 else None}
+        return self._com(Passo("substituir", [col_name], entradas, parametros))
+
+    def converter_tipo_dado(self, col_name, tipo):
+        """Mesmos argumentos de `converter_tipo_dado`."""
+        return self._com(Passo("converter", [col_name], [col_name], {"tipo": tipo}))
+
+    def excluir_outliers(self, col_name, metodo="desvio_padrao", fator=2.7):
+        """Mesmos argumentos de `excluir_outliers` (cada coluna tem os próprios limites)."""
+        if metodo not in ("desvio_padrao", "iqr"):
+            raise ValueError("Método inválido. Escolha entre 'desvio_padrao' ou 'iqr'.")
+        colunas = list(col_name) if pd.api.types.is_list_like(col_name) else [col_name]
+        novo = self
+        for col in colunas:
+            novo = novo._com(Passo("outliers", [col], [col], {"metodo": metodo, "fator": fator}))
+        return novo
+
+    def normalizar_coluna(self, col_name, metodo="min_max"):
+        """Mesmos argumentos de `normalizar_coluna`."""
+        if metodo not in ("min_max", "z_score"):
+            raise ValueError("Método inválido. Escolha entre 'min_max' ou 'z_score'.")
+        return self._com(Passo("normalizar", [col_name], [col_name], {"metodo": metodo}))
+
+    def imputar_nulos(self, estrategias="media", colunas=None, grupos=None):
+        """
+        Mesmos argumentos de `imputar_nulos`. Se `colunas` for None, as colunas são
+        resolvidas na compilação (as numéricas, para 'media'/'mediana'/'zero').
+        """
+        return self._com(Passo("imputar", [], [], {"estrategias": estrategias, "colunas": colunas, "grupos": grupos}))
+
+    def preencher_nulos(self, metodo="media"):
+        """Mesmos argumentos de `preencher_nulos` (todas as colunas numéricas)."""
+        if metodo not in METODOS_IMPUTACAO:
+            return self._com()
+        return self._com(Passo("imputar", [], [], {"estrategias": metodo, "colunas": None, "grupos": None, "numericas": True}))
+
+    # --- Compilação ---
+
+    def _colunas_fonte(self, conexao):
+        if isinstance(self.fonte, pd.DataFrame):
+            numericas = self.fonte.select_dtypes(include=[np.number]).columns
+            return list(self.fonte.columns), set(numericas)
+        colunas = colunas_tabela(conexao, self.tabela)
+        return colunas, set(colunas_numericas_sql(conexao, self.tabela))
+
+    # Expande os passos de imputação (uma coluna por passo, como em `excluir_outliers`).
+    def _expandir(self, colunas_fonte, numericas):
+        numericas = set(numericas)
+        passos = []
+        for passo in self.passos:
+            if passo.tipo != "imputar":
+                passos.append(copy.copy(passo))
+                if passo.tipo == "converter":
+                    (numericas.add if _tipo_numerico(passo.parametros["tipo"]) else numericas.discard)(passo.colunas[0])
+                elif passo.tipo in ("outliers", "normalizar"):
+                    numericas.add(passo.colunas[0])
+                continue
+            estrategias = passo.parametros["estrategias"]
+            if not isinstance(estrategias, dict):
+                colunas = passo.parametros["colunas"]
+                if colunas is None:
+                    so_numericas = passo.parametros.get("numericas") or (isinstance(estrategias, str) and estrategias in ("media", "mediana", "zero"))
+                    # Colunas fora do resultado seriam imputadas e descartadas: nem entram no plano
+                    candidatas = self.colunas if self.colunas is not None else colunas_fonte
+                    colunas = [c for c in candidatas if c in numericas] if so_numericas else list(candidatas)
+                estrategias = {col: estrategias for col in colunas}
+            grupos = passo.parametros["grupos"]
+            if not isinstance(grupos, dict):
+                grupos = {col: grupos for col in estrategias if grupos is not None and col != grupos}
+            for col, estrategia in estrategias.items():
+                grupo = {col: grupos[col]} if col in grupos else {}
+                passos.append(Passo("imputar", [col], [col, *grupo.values()], {"estrategias": {col: estrategia}, "grupos": grupo}))
+        return passos
+
+    def compilar(self):
+        """
+        Compila os passos em um Plano: projeção e filtros da fonte, núcleos por coluna e
+        a passagem de ajuste de cada passo.
+        """
+        conexao, fechar = (None, False) if isinstance(self.fonte, pd.DataFrame) else conectar(self.fonte)
+        try:
+            colunas_fonte, numericas = self._colunas_fonte(conexao)
+        finally:
+            if fechar:
+                conexao.close()
+        colunas_saida = self.colunas if self.colunas is not None else colunas_fonte
+        passos = _podar(self._expandir(colunas_fonte, numericas), colunas_saida)
+
+        # Filtros que podem ir para a leitura: antes de qualquer passo com estatísticas e
+        # sobre colunas que ainda não foram alteradas
+        filtros_fonte, restantes, alteradas, com_ajuste_antes = [], [], set(), False
+        for passo in passos:
+            if passo.tipo == "filtro" and not com_ajuste_antes and passo.colunas[0] not in alteradas:
+                filtros_fonte.append(passo)
+                continue
+            restantes.append(passo)
+            if passo.tipo != "filtro":
+                alteradas.update(passo.colunas)
+                com_ajuste_antes |= passo.precisa_ajuste
+        # Colunas usadas só nos filtros da fonte não precisam ser lidas
+        usadas = {c for passo in restantes for c in passo.entradas}
+        colunas_lidas = [c for c in colunas_fonte if c in set(colunas_saida) | usadas]
+
+        faltando = (set(colunas_saida) | {c for passo in passos for c in passo.entradas}) - set(colunas_fonte)
+        if faltando:
+            raise KeyError(f"Colunas inexistentes na fonte: {sorted(faltando)}")
+
+        # Passagem de ajuste: depois das passagens que produziram as entradas do passo
+        # (e das que decidiram quais linhas chegam até ele)
+        nivel_coluna, nivel_linhas, passagens_ajuste = defaultdict(int), 0, 0
+        for passo in restantes:
+            nivel = max([nivel_linhas, *(nivel_coluna[c] for c in passo.entradas)])
+            if passo.tipo == "filtro":
+                nivel_linhas = nivel
+                continue
+            if passo.precisa_ajuste:
+                passo.passagem = nivel + 1
+                nivel += 1
+                passagens_ajuste = max(passagens_ajuste, passo.passagem)
+            for col in passo.colunas:
+                nivel_coluna[col] = nivel
+
+        etapas = _fundir(restantes)
+        consulta, parametros = None, []
+        if not isinstance(self.fonte, pd.DataFrame):
+            condicoes = [_filtro_sql(f) for f in filtros_fonte]
+            consulta = f"SELECT {', '.join(citar(c) for c in colunas_lidas)} FROM {citar(self.tabela)}"
+            if condicoes:
+                consulta += " WHERE " + " AND ".join(c for c, _ in condicoes)
+                parametros = [v for _, valores in condicoes for v in valores]
+
+        # Encadeado: carga da tabela inteira, uma passagem por chamada e outra para as
+        # estatísticas. Fundido: leitura projetada/filtrada, uma por núcleo e uma por ajuste.
+        sql = 0 if isinstance(self.fonte, pd.DataFrame) else 1
+        encadeado = sql + sum(2 if p.precisa_ajuste else 1 for p in passos)
+        fundido = sql + len(etapas) + sum(p.precisa_ajuste for p in restantes)
+        return Plano(
+            consulta=consulta, parametros=parametros, colunas_fonte=colunas_fonte, colunas_lidas=colunas_lidas, colunas_saida=list(colunas_saida),
+            filtros_fonte=filtros_fonte, etapas=etapas, passagens_ajuste=passagens_ajuste,
+            passagens_encadeado=encadeado, passagens_fundido=fundido,
+        )
+
+    def explicar(self):
+        """
+        Descreve o plano fundido: consulta enviada ao SQLite (ou filtros da máscara
+        inicial), colunas lidas, núcleos por coluna, passagens de ajuste em blocos e a
+        estimativa de passagens economizadas.
+
+        Retorna:
+        - Texto do plano.
+        """
+        plano = self.compilar()
+        linhas = []
+        if plano.consulta is not None:
+            linhas.append(f"Fonte: SQLite, tabela {self.tabela}")
+            linhas.append(f"  SQL: {plano.consulta}" + (f"  {plano.parametros}" if plano.parametros else ""))
+        else:
+            linhas.append(f"Fonte: DataFrame ({len(self.fonte):,} linhas)")
+            if plano.filtros_fonte:
+                linhas.append("  Máscara inicial: " + " E ".join(str(f) for f in plano.filtros_fonte))
+        linhas.append(f"  Colunas lidas: {len(plano.colunas_lidas)} de {len(plano.colunas_fonte)} ({', '.join(plano.colunas_lidas)})")
+        linhas.append("Etapas:")
+        for i, etapa in enumerate(plano.etapas, 1):
+            if isinstance(etapa, _Nucleo):
+                cadeia = " -> ".join(str(p) + (f" [ajuste {p.passagem}]" if p.passagem else "") for p in etapa.passos)
+                linhas.append(f"  {i}. {etapa.coluna}: {cadeia}")
+            elif etapa.tipo == "filtro":
+                linhas.append(f"  {i}. filtro em memória: {etapa}")
+            else:
+                linhas.append(f"  {i}. {', '.join(etapa.colunas)}: {etapa}" + (f" [ajuste {etapa.passagem}]" if etapa.passagem else ""))
+        linhas.append(f"Passagens em blocos: {plano.passagens_ajuste} de ajuste + 1 de aplicação")
+        economizadas = plano.passagens_encadeado - plano.passagens_fundido
+        linhas.append(
+            f"Passagens estimadas: {plano.passagens_encadeado} encadeando as funções, "
+            f"{plano.passagens_fundido} no plano fundido ({economizadas} economizadas)"
+        )
+        return "\n".join(linhas)
+
+    explain = explicar
+
+    def __repr__(self):
+        return f"Pipeline({len(self.passos)} passos)\n{self.explicar()}"
+
+    # --- Execução ---
+
+    def _ler(self, plano):
+        if isinstance(self.fonte, pd.DataFrame):
+            df = self.fonte
+            if plano.filtros_fonte:
+                mascara = np.logical_and.reduce([_mascara_filtro(df[f.colunas[0]], f.parametros["operador"], f.parametros["valor"]).to_numpy() for f in plano.filtros_fonte])
+                df = df[mascara]
+            # Colunas compartilhadas com a fonte: os núcleos substituem colunas, nunca alteram a original
+            return pd.DataFrame({c: df[c] for c in plano.colunas_lidas}, copy=False)
+        conexao, fechar = conectar(self.fonte)
+        try:
+            df = pd.read_sql_query(plano.consulta, conexao, params=plano.parametros)
+            return aplicar_esquema(df, ler_esquema_sql(conexao, self.tabela))
+        finally:
+            if fechar:
+                conexao.close()
+
+    def _blocos(self, plano, tamanho_chunk):
+        if isinstance(self.fonte, pd.DataFrame):
+            for inicio in range(0, len(self.fonte), tamanho_chunk):
+                bloco = self.fonte.iloc[inicio:inicio + tamanho_chunk]
+                if plano.filtros_fonte:
+                    mascara = np.logical_and.reduce([_mascara_filtro(bloco[f.colunas[0]], f.parametros["operador"], f.parametros["valor"]).to_numpy() for f in plano.filtros_fonte])
+                    bloco = bloco[mascara]
+                yield bloco[plano.colunas_lidas]
+            return
+        conexao, fechar = conectar(self.fonte)
+        try:
+            esquema = ler_esquema_sql(conexao, self.tabela)
+            cursor = conexao.execute(plano.consulta, plano.parametros)
+            try:
+                while True:
+                    linhas = cursor.fetchmany(tamanho_chunk)
+                    if not linhas:
+                        break
+                    yield aplicar_esquema(pd.DataFrame.from_records(linhas, columns=plano.colunas_lidas), esquema)
+            finally:
+                cursor.close()
+        finally:
+            if fechar:
+                conexao.close()
+
+    def executar(self, em_blocos=False, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Executa o plano e retorna o DataFrame resultante (a fonte não é alterada).
+
+        Em memória as estatísticas são exatas e iguais às das funções originais. Com
+        `em_blocos=True` a fonte é lida em blocos (ver `executar_em_blocos`) e os blocos
+        transformados são concatenados.
+
+        Parâmetros:
+        - em_blocos: Se True, executa bloco a bloco.
+        - tamanho_chunk: Linhas por bloco.
+
+        Retorna:
+        - DataFrame com as colunas selecionadas.
+        """
+        plano = self.compilar()
+        if em_blocos:
+            blocos = list(self._executar_em_blocos(plano, tamanho_chunk))
+            return pd.concat(blocos, ignore_index=True) if blocos else pd.DataFrame(columns=plano.colunas_saida)
+
+        dados = self._ler(plano)
+        for etapa in plano.etapas:
+            if isinstance(etapa, _Nucleo):
+                serie = dados[etapa.coluna]
+                for passo in etapa.passos:
+                    ajuste = _ajustar_coluna(passo, serie) if passo.precisa_ajuste else None
+                    serie = _aplicar_coluna(passo, serie, ajuste)
+                dados[etapa.coluna] = serie
+            elif etapa.tipo == "filtro":
+                dados = dados[_mascara_filtro(dados[etapa.colunas[0]], etapa.parametros["operador"], etapa.parametros["valor"]).to_numpy()]
+            else:
+                dados = _aplicar_etapa(etapa, dados, _ajustar_etapa(etapa, dados) if etapa.precisa_ajuste else None)
+        return _projetar(dados, plano.colunas_saida)
+
+    def executar_em_blocos(self, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Executa o plano bloco a bloco, com memória limitada ao tamanho do bloco.
+
+        Antes, `passagens_ajuste` leituras em blocos acumulam as estatísticas (média,
+        desvio, mínimo e máximo exatos; quartis e mediana pelo sketch KLL, com erro de rank
+        ~0,5%); todos os passos que dependem só de dados já disponíveis são ajustados na
+        mesma passagem. A última leitura aplica os núcleos a cada bloco.
+
+        Retorna:
+        - Gerador de DataFrames transformados.
+        """
+        return self._executar_em_blocos(self.compilar(), tamanho_chunk)
+
+    def _executar_em_blocos(self, plano, tamanho_chunk):
+        ajustes = {}
+        for passagem in range(1, plano.passagens_ajuste + 1):
+            acumuladores = {}
+            for bloco in self._blocos(plano, tamanho_chunk):
+                _processar_bloco(plano.etapas, bloco, ajustes, passagem, acumuladores)
+            ajustes.update({chave: acumulador.finalizar() for chave, acumulador in acumuladores.items()})
+        for bloco in self._blocos(plano, tamanho_chunk):
+            yield _projetar(_processar_bloco(plano.etapas, bloco, ajustes), plano.colunas_saida)
+
+# Seleciona as colunas do resultado sem copiar os dados.
+def _projetar(dados, colunas):
+    if list(dados.columns) == list(colunas):
+        return dados
+    return pd.DataFrame({c: dados[c] for c in colunas}, copy=False)
+
+# Remove os passos cujas colunas não chegam ao resultado nem são lidas por passos seguintes.
+def _podar(passos, colunas_saida):
+    vivas, mantidos = set(colunas_saida), []
+    for passo in reversed(passos):
+        if passo.tipo == "filtro" or vivas & set(passo.colunas):
+            mantidos.append(passo)
+            vivas.update(passo.entradas)
+    return mantidos[::-1]
+
+# Agrupa os passos consecutivos de cada coluna em núcleos; filtros e passos que leem
+# outras colunas interrompem o agrupamento.
+def _fundir(passos):
+    etapas, pendentes = [], {}
+
+    def descarregar():
+        etapas.extend(_Nucleo(col, lista) for col, lista in pendentes.items())
+        pendentes.clear()
+
+    for passo in passos:
+        if passo.tipo != "filtro" and passo.entradas == passo.colunas:
+            pendentes.setdefault(passo.colunas[0], []).append(passo)
+        else:
+            descarregar()
+            etapas.append(passo)
+    descarregar()
+    return etapas
+
+def _ajustar_etapa(passo, dados):
+    if passo.tipo == "imputar":
+        return ajustar_imputacao(dados[passo.entradas], passo.parametros["estrategias"], grupos=passo.parametros["grupos"])
+    return None
+
+def _aplicar_etapa(passo, dados, ajuste):
+    if passo.tipo == "imputar":
+        if ajuste is None:
+            ajuste = ajustar_imputacao(dados[passo.entradas], passo.parametros["estrategias"], grupos=passo.parametros["grupos"])
+        return ajuste.aplicar(dados)
+    col, col_estado = passo.colunas[0], passo.parametros["col_estado"]
+    dados[col] = aplicar_mapeamento(dados, col, passo.parametros["valores_antigos"], col_estado)
+    return dados
+
+# Passa um bloco pelas etapas. Com `passagem`, acumula as estatísticas dos passos dessa
+# passagem e para nos que dependem de passagens seguintes.
+def _processar_bloco(etapas, bloco, ajustes, passagem=None, acumuladores=None):
+    invalidas = set()
+    for etapa in etapas:
+        if isinstance(etapa, _Nucleo):
+            if etapa.coluna in invalidas:
+                continue
+            serie = bloco[etapa.coluna]
+            for passo in etapa.passos:
+                if passo.precisa_ajuste and id(passo) not in ajustes:
+                    if passo.passagem == passagem:
+                        acumuladores.setdefault(id(passo), _AcumuladorPasso(passo)).atualizar(pd.DataFrame({etapa.coluna: serie}))
+                    invalidas.add(etapa.coluna)
+                    break
+                serie = _aplicar_coluna(passo, serie, ajustes.get(id(passo)))
+            bloco[etapa.coluna] = serie
+        elif invalidas & set(etapa.entradas):
+            # Depende de estatísticas de passagens seguintes; nenhum passo desta passagem vem depois de um filtro assim
+            if etapa.tipo == "filtro":
+                break
+            invalidas.update(etapa.colunas)
+        elif etapa.tipo == "filtro":
+            bloco = bloco[_mascara_filtro(bloco[etapa.colunas[0]], etapa.parametros["operador"], etapa.parametros["valor"]).to_numpy()]
+        elif etapa.precisa_ajuste and id(etapa) not in ajustes:
+            if etapa.passagem == passagem:
+                acumuladores.setdefault(id(etapa), _AcumuladorPasso(etapa)).atualizar(bloco[etapa.entradas])
+            invalidas.update(etapa.colunas)
+        else:
+            bloco = _aplicar_etapa(etapa, bloco, ajustes.get(id(etapa)))
+    return bloco
@@ -0,0 +1,350 @@
+import warnings
+import weakref
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .cache_utils import assinatura_valores
+    from .data_streaming import AcumuladorMomentos
+except ImportError:
+    from cache_utils import assinatura_valores
+    from data_streaming import AcumuladorMomentos
+
+# Granularidades das séries temporais (os períodos são rotulados pelo primeiro dia).
+GRANULARIDADES = ("dia", "semana", "mes")
+
+# Agregações disponíveis nas séries: nome -> função sobre a tabela de momentos.
+AGREGACOES = {
+    "soma": lambda t: t["soma"],
+    "media": lambda t: t["media"].where(t["contagem"] > 0),
+    "contagem": lambda t: t["contagem"],
+    "minimo": lambda t: t["minimo"],
+    "maximo": lambda t: t["maximo"],
+}
+
+# Cache dos rollups: id(df) -> {(col_data, col_valor, col_grupo): (assinatura, rollup)}.
+_CACHE_ROLLUPS = {}
+
+# Colunas da tabela de momentos de cada período (e grupo).
+COLUNAS_MOMENTOS = ["soma", "contagem", "media", "m2", "m3", "minimo", "maximo", "linhas"]
+
+# Converte uma coluna de datas (datetime ou texto) em dias desde a época (NaT -> None).
+def _dias(serie):
+    """
+    Retorna um array datetime64[D] com o dia de cada linha, ou None se a coluna não for
+    temporal. Colunas de texto são convertidas só nos valores distintos (`factorize`);
+    a coluna é temporal se ao menos metade das linhas preenchidas forem datas, e os
+    valores que não são datas (inclusive textos vazios) viram NaT com um aviso.
+    """
+    if isinstance(serie.dtype, pd.DatetimeTZDtype):
+        serie = serie.dt.tz_localize(None)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return None
+
+    codigos, unicos = pd.factorize(serie)
+    if len(unicos) == 0:
+        return None
+    try:
+        datas = pd.to_datetime(pd.Index(unicos).astype(str), errors="coerce")
+    except (TypeError, ValueError):
+        return None
+    invalidas = np.asarray(datas.isna())[codigos[codigos >= 0]].sum()
+    if invalidas * 2 > (codigos >= 0).sum():
+        return None
+    if invalidas:
+        warnings.warn(f"{invalidas} valores de '{serie.name}' não são datas e foram ignorados.")
+    dias = np.append(datas.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]"), np.datetime64("NaT", "D"))
+    return dias[codigos]
+
+# Leva um array de dias ao início do período da granularidade.
+def _inicio_periodo(dias, granularidade):
+    if granularidade == "dia":
+        return dias
+    if granularidade == "semana":
+        # A época (1970-01-01) caiu numa quinta: +3 alinha as semanas à segunda-feira
+        numeros = dias.astype("int64")
+        return ((numeros + 3) // 7 * 7 - 3).astype("datetime64[D]")
+    if granularidade == "mes":
+        return dias.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError("Granularidade inválida. Escolha entre 'dia', 'semana' ou 'mes'.")
+
+# Combina as linhas de uma tabela de momentos que caem na mesma chave.
+def _combinar(tabela, chaves):
+    """
+    Agrupa a tabela de momentos por `chaves` com as fórmulas de Chan/Pébay na forma
+    agrupada (as mesmas do `AcumuladorMomentos`): cada parte contribui com seu M2/M3 e
+    o desvio da sua média em relação à média do grupo, sem somas de quadrados brutas.
+    """
+    agrupado = tabela.groupby(chaves, sort=False)
+    resultado = agrupado.agg(
+        soma=("soma", "sum"), contagem=("contagem", "sum"), minimo=("minimo", "min"),
+        maximo=("maximo", "max"), linhas=("linhas", "sum"),
+    )
+    codigos = agrupado.ngroup().to_numpy()
+    n = tabela["contagem"].to_numpy(dtype="float64")
+    media_parte = tabela["media"].to_numpy(dtype="float64")
+    total = resultado["contagem"].to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.where(total > 0, np.bincount(codigos, n * media_parte, len(resultado)) / total, 0.0)
+    desvio = np.where(n > 0, media_parte - media[codigos], 0.0)
+    m2 = tabela["m2"].to_numpy(dtype="float64")
+    resultado["media"] = media
+    resultado["m2"] = np.bincount(codigos, m2 + n * desvio ** 2, len(resultado))
+    resultado["m3"] = np.bincount(
+        codigos, tabela["m3"].to_numpy(dtype="float64") + 3 * desvio * m2 + n * desvio ** 3, len(resultado)
+    )
+    return resultado[COLUNAS_MOMENTOS]
+
+# Monta um AcumuladorMomentos com uma posição por linha da tabela de momentos.
+def _acumulador(tabela):
+    acumulador = AcumuladorMomentos(len(tabela))
+    acumulador.n = tabela["contagem"].to_numpy(dtype="float64")
+    acumulador.media = tabela["media"].to_numpy(dtype="float64")
+    acumulador.m2 = tabela["m2"].to_numpy(dtype="float64")
+    acumulador.m3 = tabela["m3"].to_numpy(dtype="float64")
+    acumulador.minimo = tabela["minimo"].fillna(np.inf).to_numpy(dtype="float64")
+    acumulador.maximo = tabela["maximo"].fillna(-np.inf).to_numpy(dtype="float64")
+    return acumulador
+
+class RollupTemporal:
+    """
+    Série pré-agregada de uma coluna de valores por período (dia, semana ou mês),
+    opcionalmente por grupo, para os gráficos de linha não reagregarem as linhas a cada
+    chamada.
+
+    As linhas são agregadas por dia (e grupo) com um único groupby em momentos mescláveis
+    (soma, contagem, média, M2, M3, mínimo e máximo); semanas e meses saem da tabela
+    diária, sem reler as linhas, e ficam em cache. `atualizar` incorpora só as linhas
+    novas e mescla cada granularidade já calculada com o `AcumuladorMomentos`.
+
+    Colunas não temporais (números, categorias) são agregadas pelo valor exato de x.
+    """
+
+    def __init__(self, col_data, col_valor=None, col_grupo=None):
+        self.col_data = col_data
+        self.col_valor = col_valor
+        self.col_grupo = col_grupo
+        self.temporal = None
+        self.linhas = 0
+        self.marca = None
+        self.niveis = {}
+
+    def copia(self):
+        """Cópia independente (as tabelas de momentos não são compartilhadas)."""
+        copia = RollupTemporal(self.col_data, self.col_valor, self.col_grupo)
+        copia.temporal = self.temporal
+        copia.linhas = self.linhas
+        copia.marca = self.marca
+        copia.niveis = {granularidade: tabela.copy() for granularidade, tabela in self.niveis.items()}
+        return copia
+
+    def _agregar(self, df):
+        """Tabela de momentos das linhas de `df` no nível base (dia ou valor exato)."""
+        dias = _dias(df[self.col_data])
+        if self.temporal is None:
+            self.temporal = dias is not None
+        elif self.temporal != (dias is not None):
+            raise ValueError(f"A coluna '{self.col_data}' mudou de tipo entre as atualizações.")
+
+        if self.temporal:
+            periodo = dias
+            validas = ~np.isnat(dias)
+        else:
+            periodo = df[self.col_data].to_numpy()
+            validas = pd.notna(periodo)
+
+        if self.col_valor is None:
+            valores = np.ones(len(df))
+        else:
+            valores = pd.to_numeric(df[self.col_valor], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        valores = valores[validas]
+        preenchidos = ~np.isnan(valores)
+
+        # Cada linha entra como uma parte de um valor só (M2 = M3 = 0)
+        dados = {
+            "periodo": periodo[validas],
+            "soma": np.where(preenchidos, valores, 0.0),
+            "contagem": preenchidos.astype("int64"),
+            "media": np.where(preenchidos, valores, 0.0),
+            "m2": 0.0,
+            "m3": 0.0,
+            "minimo": valores,
+            "maximo": valores,
+            "linhas": 1,
+        }
+        chaves = ["periodo"]
+        if self.col_grupo is not None:
+            # Agrupa pelos códigos e devolve os valores dos grupos só no resultado
+            codigos, grupos = pd.factorize(df[self.col_grupo])
+            dados["grupo"] = codigos[validas]
+            chaves.append("grupo")
+
+        tabela = _combinar(pd.DataFrame(dados), chaves)
+        if self.col_grupo is not None:
+            tabela = tabela[tabela.index.get_level_values("grupo") >= 0]
+            tabela.index = pd.MultiIndex.from_arrays(
+                [tabela.index.get_level_values("periodo"), pd.Index(grupos).take(tabela.index.get_level_values("grupo"))],
+                names=chaves,
+            )
+        if self.temporal and len(dados["periodo"]):
+            marca = dados["periodo"].max()
+            self.marca = marca if self.marca is None else max(self.marca, marca)
+        self.linhas += len(df)
+        return tabela
+
+    def _reagrupar(self, tabela, granularidade):
+        """Leva uma tabela diária para semanas ou meses (mesclando os momentos)."""
+        if granularidade == "dia":
+            return tabela
+        periodos = _inicio_periodo(tabela.index.get_level_values("periodo").to_numpy(dtype="datetime64[D]"), granularidade)
+        chaves = [periodos] + ([tabela.index.get_level_values("grupo")] if self.col_grupo is not None else [])
+        reagrupada = _combinar(tabela, chaves)
+        reagrupada.index.names = tabela.index.names
+        return reagrupada
+
+    @staticmethod
+    def _mesclar(atual, delta):
+        """Mescla duas tabelas de momentos alinhadas pelo período (e grupo)."""
+        if atual is None:
+            return delta
+        indice = atual.index.append(delta.index.difference(atual.index))
+        vazias = {"soma": 0.0, "contagem": 0, "media": 0.0, "m2": 0.0, "m3": 0.0, "linhas": 0}
+        atual = atual.reindex(indice).fillna(vazias)
+        delta = delta.reindex(indice).fillna(vazias)
+
+        acumulador = _acumulador(atual)
+        acumulador.mesclar(_acumulador(delta))
+        return pd.DataFrame(
+            {
+                "soma": atual["soma"] + delta["soma"],
+                "contagem": acumulador.n.astype("int64"),
+                "media": acumulador.media,
+                "m2": acumulador.m2,
+                "m3": acumulador.m3,
+                "minimo": np.where(np.isfinite(acumulador.minimo), acumulador.minimo, np.nan),
+                "maximo": np.where(np.isfinite(acumulador.maximo), acumulador.maximo, np.nan),
+                "linhas": (atual["linhas"] + delta["linhas"]).astype("int64"),
+            },
+            index=indice,
+        )
+
+    def atualizar(self, df):
+        """
+        Incorpora as linhas de `df` (só as novas: linhas já incorporadas seriam contadas
+        duas vezes) em todas as granularidades já calculadas.
+
+        Retorna:
+        - O próprio rollup.
+        """
+        delta = self._agregar(df)
+        base = "dia" if self.temporal else None
+        self.niveis[base] = self._mesclar(self.niveis.get(base), delta)
+        for granularidade in self.niveis:
+            if granularidade != base:
+                self.niveis[granularidade] = self._mesclar(self.niveis[granularidade], self._reagrupar(delta, granularidade))
+        return self
+
+    def tabela(self, granularidade="dia"):
+        """
+        Tabela de momentos (soma, contagem, media, m2, m3, minimo, maximo, linhas) por
+        período (e grupo), em ordem. Para colunas não temporais, a granularidade é ignorada.
+        """
+        if self.temporal is None:
+            return pd.DataFrame(columns=COLUNAS_MOMENTOS)
+        if not self.temporal:
+            granularidade = None
+        elif granularidade not in GRANULARIDADES:
+            raise ValueError("Granularidade inválida. Escolha entre 'dia', 'semana' ou 'mes'.")
+        if granularidade not in self.niveis:
+            self.niveis[granularidade] = self._reagrupar(self.niveis["dia"], granularidade)
+        tabela = self.niveis[granularidade].sort_index()
+        self.niveis[granularidade] = tabela
+        return tabela
+
+    def serie(self, granularidade="dia", agregacao="soma"):
+        """
+        Série agregada por período.
+
+        Parâmetros:
+        - granularidade: 'dia', 'semana' ou 'mes' (ignorada em colunas não temporais).
+        - agregacao: 'soma', 'media', 'contagem', 'minimo' ou 'maximo'.
+
+        Retorna:
+        - Series indexada pelo período ou, com grupo, DataFrame período x grupo.
+        """
+        if agregacao not in AGREGACOES:
+            raise ValueError("Agregação inválida. Escolha entre 'soma', 'media', 'contagem', 'minimo' ou 'maximo'.")
+        tabela = self.tabela(granularidade)
+        serie = AGREGACOES[agregacao](tabela).rename(agregacao)
+        if self.col_grupo is not None:
+            serie = serie.unstack("grupo")
+        return serie
+
+    def intervalo(self, granularidade="dia", z=1.96):
+        """
+        Intervalo de confiança da média de cada período pela aproximação normal
+        (média ± z * desvio / raiz(n)), com o desvio do `AcumuladorMomentos` (M2), sem
+        bootstrap.
+
+        Retorna:
+        - Tupla (inferior, superior) no mesmo formato de `serie`.
+        """
+        tabela = self.tabela(granularidade)
+        acumulador = _acumulador(tabela)
+        n = tabela["contagem"].where(tabela["contagem"] > 0)
+        media = tabela["media"].where(n.notna())
+        margem = z * pd.Series(acumulador.desvio_padrao, index=tabela.index) / np.sqrt(n)
+        limites = (media - margem, media + margem)
+        if self.col_grupo is not None:
+            limites = tuple(limite.unstack("grupo") for limite in limites)
+        return limites
+
+# Assinatura das colunas usadas por um rollup (valida o cache contra os valores).
+def _assinatura(df, colunas):
+    return (len(df),) + tuple(assinatura_valores(df[col]) for col in colunas if col is not None)
+
+# Retorna (ou calcula e guarda em cache) o rollup de um DataFrame.
+def obter_rollup(df, col_data, col_valor=None, col_grupo=None, atualizar=False):
+    """
+    Retorna o RollupTemporal de uma coluna de datas, calculado uma vez e guardado em
+    cache enquanto o DataFrame existir e as colunas usadas não mudarem (a assinatura
+    cobre os valores, então alterações no lugar também invalidam o cache).
+
+    O rollup devolvido é uma cópia: chamar `atualizar` nele não altera o cache nem os
+    rollups devolvidos a outras chamadas.
+
+    Parâmetros:
+    - df: DataFrame do pandas.
+    - col_data: Coluna de datas (datetime ou texto no formato ISO) ou outra coluna do eixo X.
+    - col_valor: Coluna de valores (se None, conta as linhas).
+    - col_grupo: Coluna para separar uma série por grupo (opcional).
+    - atualizar: Se True, ignora o cache e recalcula.
+
+    Retorna:
+    - RollupTemporal.
+    """
+    chave = (col_data, col_valor, col_grupo)
+    assinatura = _assinatura(df, chave)
+    cache_df = _CACHE_ROLLUPS.get(id(df))
+    if not atualizar and cache_df is not None and chave in cache_df and cache_df[chave][0] == assinatura:
+        return cache_df[chave][1].copia()
+
+    rollup = RollupTemporal(col_data, col_valor, col_grupo).atualizar(df)
+    # Calcula todas as granularidades antes de guardar: as cópias já saem com elas
+    for granularidade in GRANULARIDADES if rollup.temporal else (None,):
+        rollup.tabela(granularidade)
+    if cache_df is None:
+        cache_df = _CACHE_ROLLUPS[id(df)] = {}
+        weakref.finalize(df, _CACHE_ROLLUPS.pop, id(df), None)
+    cache_df[chave] = (assinatura, rollup)
+    return rollup.copia()
+
+# Descarta os rollups em cache de um DataFrame.
+def invalidar_rollups(df):
+    """
+    Remove do cache os rollups de um DataFrame.
+    """
+    _CACHE_ROLLUPS.pop(id(df), None)
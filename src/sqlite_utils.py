@@ -0,0 +1,51 @@
+import sqlite3
+
+import pandas as pd
+
+# Abre a conexão quando recebe um caminho; reaproveita quando recebe uma conexão.
+def conectar(fonte):
+    """
+    Retorna uma conexão para `fonte` (caminho do banco ou conexão aberta).
+
+    Retorna:
+    - Tupla (conexao, propria); `propria` indica se a conexão foi aberta aqui e deve ser
+      fechada por quem chamou.
+    """
+    if isinstance(fonte, sqlite3.Connection):
+        return fonte, False
+    return sqlite3.connect(fonte), True
+
+# Coloca o identificador entre aspas para uso seguro em SQL.
+def citar(nome):
+    return '"' + str(nome).replace('"', '""') + '"'
+
+# Verifica se uma tabela existe no banco.
+def existe_tabela(conexao, tabela):
+    return conexao.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabela,)).fetchone() is not None
+
+# Lista as colunas de uma tabela, na ordem da definição.
+def colunas_tabela(conexao, tabela):
+    return [linha[1] for linha in conexao.execute(f"PRAGMA table_info({citar(tabela)})")]
+
+# Aplica um dicionário de pragmas na conexão.
+def configurar_conexao(conexao, pragmas):
+    for pragma, valor in pragmas.items():
+        conexao.execute(f"PRAGMA {pragma}={valor}")
+
+# Traduz o dtype do pandas para o tipo declarado no SQLite.
+def tipo_sqlite(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+# Converte um bloco em tuplas prontas para executemany (NaN -> None).
+def linhas_para_insert(chunk):
+    colunas = []
+    for col in chunk.columns:
+        serie = chunk[col]
+        if serie.hasnans:
+            serie = serie.astype(object).where(serie.notna(), None)
+        colunas.append(serie.tolist())
+    return list(zip(*colunas))
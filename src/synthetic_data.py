@@ -0,0 +1,287 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Linhas de cada tabela em relação à `escala` (a escala é o tamanho da maior tabela, a
+# geolocalização). Com escala=1_000_000 as proporções ficam próximas do dataset do Kaggle.
+PROPORCOES = {
+    "geolocation": 1.0,
+    "customers": 0.0994,
+    "orders": 0.0994,
+    "order_items": 0.1127,
+    "order_payments": 0.1039,
+    "order_reviews": 0.0992,
+    "products": 0.0330,
+    "sellers": 0.0031,
+}
+
+# Nome do CSV do Kaggle correspondente a cada tabela.
+ARQUIVOS_CSV = {
+    "customers": "olist_customers_dataset.csv",
+    "geolocation": "olist_geolocation_dataset.csv",
+    "orders": "olist_orders_dataset.csv",
+    "order_items": "olist_order_items_dataset.csv",
+    "order_payments": "olist_order_payments_dataset.csv",
+    "order_reviews": "olist_order_reviews_dataset.csv",
+    "products": "olist_products_dataset.csv",
+    "sellers": "olist_sellers_dataset.csv",
+    "category_translation": "product_category_name_translation.csv",
+}
+
+# Estados com peso aproximado da distribuição de clientes do Olist.
+_ESTADOS = {
+    "SP": 0.42, "RJ": 0.13, "MG": 0.12, "RS": 0.055, "PR": 0.05, "SC": 0.037, "BA": 0.034,
+    "DF": 0.022, "ES": 0.02, "GO": 0.02, "PE": 0.017, "CE": 0.013, "PA": 0.01, "MT": 0.009,
+    "MA": 0.008, "MS": 0.007, "PB": 0.005, "PI": 0.005, "RN": 0.005, "AL": 0.004, "SE": 0.003,
+    "TO": 0.003, "RO": 0.003, "AM": 0.002, "AC": 0.001, "AP": 0.001, "RR": 0.001,
+}
+
+# Cidades por estado, com variações de grafia como as do dataset original.
+_CIDADES = {
+    "SP": ["sao paulo", "são paulo", "Sao Paulo", "campinas", "guarulhos", "santo andre", "sao bernardo do campo", "osasco"],
+    "RJ": ["rio de janeiro", "niteroi", "niterói", "nova iguacu", "duque de caxias"],
+    "MG": ["belo horizonte", "belo horizont", "uberlandia", "contagem", "juiz de fora"],
+    "RS": ["porto alegre", "caxias do sul", "pelotas"],
+    "PR": ["curitiba", "londrina", "maringa", "maringá"],
+}
+_CIDADES_PADRAO = ["capital", "interior"]
+
+# Coordenadas aproximadas (lat, lng) do centro de cada estado.
+_CENTROS = {
+    "SP": (-23.5, -46.6), "RJ": (-22.9, -43.2), "MG": (-19.9, -43.9), "RS": (-30.0, -51.2),
+    "PR": (-25.4, -49.3), "SC": (-27.6, -48.5), "BA": (-12.97, -38.5), "DF": (-15.8, -47.9),
+    "ES": (-20.3, -40.3), "GO": (-16.7, -49.3), "PE": (-8.05, -34.9), "CE": (-3.7, -38.5),
+    "PA": (-1.45, -48.5), "MT": (-15.6, -56.1), "MA": (-2.5, -44.3), "MS": (-20.4, -54.6),
+    "PB": (-7.1, -34.9), "PI": (-5.1, -42.8), "RN": (-5.8, -35.2), "AL": (-9.7, -35.7),
+    "SE": (-10.9, -37.1), "TO": (-10.2, -48.3), "RO": (-8.8, -63.9), "AM": (-3.1, -60.0),
+    "AC": (-9.97, -67.8), "AP": (0.03, -51.1), "RR": (2.8, -60.7),
+}
+
+# Categorias de produto (português -> inglês).
+CATEGORIAS = {
+    "cama_mesa_banho": "bed_bath_table",
+    "beleza_saude": "health_beauty",
+    "esporte_lazer": "sports_leisure",
+    "moveis_decoracao": "furniture_decor",
+    "informatica_acessorios": "computers_accessories",
+    "utilidades_domesticas": "housewares",
+    "relogios_presentes": "watches_gifts",
+    "telefonia": "telephony",
+    "ferramentas_jardim": "garden_tools",
+    "automotivo": "auto",
+    "brinquedos": "toys",
+    "cool_stuff": "cool_stuff",
+    "perfumaria": "perfumery",
+    "bebes": "baby",
+    "eletronicos": "electronics",
+}
+
+_STATUS = {"delivered": 0.97, "shipped": 0.011, "canceled": 0.0063, "unavailable": 0.0061, "invoiced": 0.0032, "processing": 0.003, "created": 0.0006}
+_PAGAMENTOS = {"credit_card": 0.74, "boleto": 0.19, "voucher": 0.055, "debit_card": 0.015}
+_NOTAS = {5: 0.577, 4: 0.193, 3: 0.082, 2: 0.032, 1: 0.116}
+
+_INICIO = np.datetime64("2016-09-04T00:00:00", "s")
+_DURACAO = 2 * 365 * 24 * 3600
+
+# Gera `n` identificadores hexadecimais de 32 caracteres (como os ids do Olist).
+def _ids(rng, n):
+    digitos = np.frombuffer(b"0123456789abcdef", dtype="S1")
+    return digitos[rng.integers(0, 16, (n, 32), dtype="uint8")].view("S32").ravel().astype(str).astype(object)
+
+# Sorteia valores de um dicionário valor -> peso.
+def _sortear(rng, pesos, n):
+    valores = np.array(list(pesos), dtype=object)
+    p = np.array(list(pesos.values()), dtype="float64")
+    return valores[rng.choice(len(valores), n, p=p / p.sum())]
+
+# Formata datetime64 como texto 'AAAA-MM-DD HH:MM:SS' (NaT vira None).
+def _texto_data(datas):
+    texto = np.datetime_as_string(datas.astype("datetime64[s]")).astype(object)
+    nulos = np.isnat(datas)
+    texto[~nulos] = [t.replace("T", " ") for t in texto[~nulos]]
+    texto[nulos] = None
+    return texto
+
+# Insere nulos em uma fração das posições.
+def _com_nulos(rng, valores, fracao):
+    valores = pd.Series(valores)
+    return valores.mask(rng.random(len(valores)) < fracao)
+
+# Gera o conjunto de CEPs (prefixos) com estado, cidade e coordenadas.
+def _ceps(rng, n):
+    estados = _sortear(rng, _ESTADOS, n)
+    prefixos = rng.choice(np.arange(1000, 100_000), n, replace=False)
+    cidades = np.array([rng.choice(_CIDADES.get(uf, _CIDADES_PADRAO)) for uf in estados], dtype=object)
+    centros = np.array([_CENTROS[uf] for uf in estados])
+    return pd.DataFrame({
+        "zip_code_prefix": prefixos,
+        "city": cidades,
+        "state": estados,
+        "lat": centros[:, 0] + rng.normal(0, 1.0, n),
+        "lng": centros[:, 1] + rng.normal(0, 1.0, n),
+    })
+
+# Gera as tabelas do Olist com dados sintéticos.
+def gerar_dados_olist(escala=100_000, semente=0):
+    """
+    Gera tabelas sintéticas com as mesmas colunas, tipos e relacionamentos do dataset
+    público do Olist (ids hexadecimais, datas em texto, nulos, cidades com variações de
+    grafia), sem precisar baixar nada do Kaggle.
+
+    Parâmetros:
+    - escala: Número de linhas da maior tabela (geolocation); as demais seguem `PROPORCOES`
+      (ex: 10_000 a 10_000_000; 1_000_000 fica próximo do dataset real).
+    - semente: Semente do gerador (a mesma semente gera sempre os mesmos dados).
+
+    Retorna:
+    - Dicionário nome da tabela -> DataFrame ('customers', 'geolocation', 'orders',
+      'order_items', 'order_payments', 'order_reviews', 'products', 'sellers' e
+      'category_translation').
+    """
+    rng = np.random.default_rng(semente)
+    n = {tabela: max(10, int(escala * proporcao)) for tabela, proporcao in PROPORCOES.items()}
+    ceps = _ceps(rng, min(max(50, escala // 50), 90_000))
+
+    # Geolocalização: vários pontos por CEP, espalhados em torno do centro do CEP
+    idx = rng.integers(0, len(ceps), n["geolocation"])
+    geolocation = pd.DataFrame({
+        "geolocation_zip_code_prefix": ceps["zip_code_prefix"].to_numpy()[idx],
+        "geolocation_lat": ceps["lat"].to_numpy()[idx] + rng.normal(0, 0.02, len(idx)),
+        "geolocation_lng": ceps["lng"].to_numpy()[idx] + rng.normal(0, 0.02, len(idx)),
+        "geolocation_city": ceps["city"].to_numpy()[idx],
+        "geolocation_state": ceps["state"].to_numpy()[idx],
+    })
+
+    idx = rng.integers(0, len(ceps), n["customers"])
+    unicos = _ids(rng, max(1, int(n["customers"] * 0.97)))
+    customers = pd.DataFrame({
+        "customer_id": _ids(rng, n["customers"]),
+        "customer_unique_id": unicos[rng.integers(0, len(unicos), n["customers"])],
+        "customer_zip_code_prefix": ceps["zip_code_prefix"].to_numpy()[idx],
+        "customer_city": ceps["city"].to_numpy()[idx],
+        "customer_state": ceps["state"].to_numpy()[idx],
+    })
+
+    idx = rng.integers(0, len(ceps), n["sellers"])
+    sellers = pd.DataFrame({
+        "seller_id": _ids(rng, n["sellers"]),
+        "seller_zip_code_prefix": ceps["zip_code_prefix"].to_numpy()[idx],
+        "seller_city": ceps["city"].to_numpy()[idx],
+        "seller_state": ceps["state"].to_numpy()[idx],
+    })
+
+    categorias = np.array(list(CATEGORIAS), dtype=object)
+    products = pd.DataFrame({
+        "product_id": _ids(rng, n["products"]),
+        "product_category_name": _com_nulos(rng, categorias[rng.integers(0, len(categorias), n["products"])], 0.018),
+        "product_name_lenght": _com_nulos(rng, rng.integers(5, 77, n["products"]).astype("float64"), 0.018),
+        "product_description_lenght": _com_nulos(rng, rng.integers(4, 3993, n["products"]).astype("float64"), 0.018),
+        "product_photos_qty": _com_nulos(rng, rng.integers(1, 8, n["products"]).astype("float64"), 0.018),
+        "product_weight_g": rng.lognormal(6.5, 1.2, n["products"]).round(),
+        "product_length_cm": rng.integers(7, 105, n["products"]).astype("float64"),
+        "product_height_cm": rng.integers(2, 105, n["products"]).astype("float64"),
+        "product_width_cm": rng.integers(6, 118, n["products"]).astype("float64"),
+    })
+
+    # Pedidos: compra -> aprovação -> transportadora -> entrega, com nulos conforme o status
+    status = _sortear(rng, _STATUS, n["orders"])
+    compra = _INICIO + rng.integers(0, _DURACAO, n["orders"]).astype("timedelta64[s]")
+    aprovacao = compra + rng.exponential(10 * 3600, n["orders"]).astype("timedelta64[s]")
+    transportadora = aprovacao + rng.exponential(3 * 86400, n["orders"]).astype("timedelta64[s]")
+    entrega = transportadora + rng.gamma(2.0, 4 * 86400, n["orders"]).astype("timedelta64[s]")
+    estimada = (compra + rng.integers(10, 40, n["orders"]).astype("timedelta64[D]")).astype("datetime64[D]")
+    entregue = status == "delivered"
+    transportadora = np.where(entregue | (status == "shipped"), transportadora, np.datetime64("NaT"))
+    entrega = np.where(entregue, entrega, np.datetime64("NaT"))
+    orders = pd.DataFrame({
+        "order_id": _ids(rng, n["orders"]),
+        "customer_id": customers["customer_id"].to_numpy()[np.resize(rng.permutation(n["customers"]), n["orders"])],
+        "order_status": status,
+        "order_purchase_timestamp": _texto_data(compra),
+        "order_approved_at": _texto_data(np.where(status == "created", np.datetime64("NaT"), aprovacao)),
+        "order_delivered_carrier_date": _texto_data(transportadora),
+        "order_delivered_customer_date": _texto_data(entrega),
+        "order_estimated_delivery_date": _texto_data(estimada.astype("datetime64[s]")),
+    })
+
+    # Itens: cada pedido tem ao menos um item; os extras são sorteados entre os pedidos
+    pedidos = np.concatenate([np.arange(n["orders"]), rng.integers(0, n["orders"], max(0, n["order_items"] - n["orders"]))])
+    pedidos.sort(kind="stable")
+    sequencia = pd.Series(pedidos).groupby(pedidos).cumcount().to_numpy() + 1
+    precos = rng.lognormal(4.3, 0.9, len(pedidos)).round(2)
+    order_items = pd.DataFrame({
+        "order_id": orders["order_id"].to_numpy()[pedidos],
+        "order_item_id": sequencia,
+        "product_id": products["product_id"].to_numpy()[rng.integers(0, n["products"], len(pedidos))],
+        "seller_id": sellers["seller_id"].to_numpy()[rng.integers(0, n["sellers"], len(pedidos))],
+        "shipping_limit_date": _texto_data(compra[pedidos] + rng.integers(2, 8, len(pedidos)).astype("timedelta64[D]")),
+        "price": precos,
+        "freight_value": (rng.gamma(2.0, 10.0, len(pedidos)) + precos * 0.05).round(2),
+    })
+
+    # Pagamentos: um por pedido, mais pagamentos sequenciais extras (vouchers)
+    pedidos = np.concatenate([np.arange(n["orders"]), rng.integers(0, n["orders"], max(0, n["order_payments"] - n["orders"]))])
+    pedidos.sort(kind="stable")
+    tipo = _sortear(rng, _PAGAMENTOS, len(pedidos))
+    order_payments = pd.DataFrame({
+        "order_id": orders["order_id"].to_numpy()[pedidos],
+        "payment_sequential": pd.Series(pedidos).groupby(pedidos).cumcount().to_numpy() + 1,
+        "payment_type": tipo,
+        "payment_installments": np.where(tipo == "credit_card", rng.integers(1, 11, len(pedidos)), 1),
+        "payment_value": rng.lognormal(4.6, 0.9, len(pedidos)).round(2),
+    })
+
+    pedidos = rng.integers(0, n["orders"], n["order_reviews"])
+    criacao = (compra[pedidos] + rng.integers(5, 40, len(pedidos)).astype("timedelta64[D]")).astype("datetime64[D]")
+    comentarios = np.array(["recomendo", "produto muito bom", "não recebi o produto", "entrega rápida", "Ótimo"], dtype=object)
+    order_reviews = pd.DataFrame({
+        "review_id": _ids(rng, n["order_reviews"]),
+        "order_id": orders["order_id"].to_numpy()[pedidos],
+        "review_score": _sortear(rng, _NOTAS, len(pedidos)).astype("int64"),
+        "review_comment_title": _com_nulos(rng, comentarios[rng.integers(0, len(comentarios), len(pedidos))], 0.88),
+        "review_comment_message": _com_nulos(rng, comentarios[rng.integers(0, len(comentarios), len(pedidos))], 0.59),
+        "review_creation_date": _texto_data(criacao.astype("datetime64[s]")),
+        "review_answer_timestamp": _texto_data(criacao + rng.exponential(2 * 86400, len(pedidos)).astype("timedelta64[s]")),
+    })
+
+    category_translation = pd.DataFrame({
+        "product_category_name": list(CATEGORIAS),
+        "product_category_name_english": list(CATEGORIAS.values()),
+    })
+
+    return {
+        "customers": customers,
+        "geolocation": geolocation,
+        "orders": orders,
+        "order_items": order_items,
+        "order_payments": order_payments,
+        "order_reviews": order_reviews,
+        "products": products,
+        "sellers": sellers,
+        "category_translation": category_translation,
+    }
+
+# Grava as tabelas sintéticas como os CSVs do Kaggle.
+def gravar_csv_olist(diretorio, escala=100_000, semente=0, tabelas=None):
+    """
+    Gera (ou recebe) as tabelas sintéticas e grava cada uma com o nome do CSV original
+    (ex: olist_orders_dataset.csv), pronto para `carregar_staging`.
+
+    Parâmetros:
+    - diretorio: Diretório de saída (ex: data/raw).
+    - escala: Escala usada em `gerar_dados_olist`.
+    - semente: Semente do gerador.
+    - tabelas: Tabelas já geradas (se None, são geradas aqui).
+
+    Retorna:
+    - Lista com os caminhos dos arquivos gravados.
+    """
+    tabelas = gerar_dados_olist(escala, semente) if tabelas is None else tabelas
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for nome, df in tabelas.items():
+        caminho = os.path.join(diretorio, ARQUIVOS_CSV[nome])
+        df.to_csv(caminho, index=False)
+        caminhos.append(caminho)
+    return caminhos
@@ -1,7 +1,52 @@
 import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+import numpy as np
 import seaborn as sns
 import pandas as pd
 
+try:
+    from .binning import amostrar_estratificado, calcular_densidade_2d, calcular_histograma, estimar_kde
+    from .data_analysis import calcular_matriz_correlacao, contar_frequencias
+    from .instrumentation import instrumentar_modulo
+    from .rollups import obter_rollup
+except ImportError:
+    from binning import amostrar_estratificado, calcular_densidade_2d, calcular_histograma, estimar_kde
+    from data_analysis import calcular_matriz_correlacao, contar_frequencias
+    from instrumentation import instrumentar_modulo
+    from rollups import obter_rollup
+
+# Acima desse número de linhas as dispersões passam a ser desenhadas como densidade.
+LIMITE_LINHAS_DENSIDADE = 100_000
+
+# Acima desse número de linhas o `plot_linha` com granularidade 'auto' agrega por dia.
+LIMITE_LINHAS_LINHA = 100_000
+
+# Estimador do seaborn equivalente a cada agregação do `plot_linha`.
+_ESTIMADORES_SEABORN = {"media": "mean", "soma": "sum", "contagem": "count", "minimo": "min", "maximo": "max"}
+
+# Desenha uma Densidade2D como imagem em um eixo do matplotlib.
+def _desenhar_densidade(ax, densidade, cmap="viridis"):
+    """
+    Desenha as contagens como imagem (escala log). Sem `hue` usa o `cmap`; com `hue`,
+    cada célula recebe a mistura das cores das categorias ponderada pelas contagens e a
+    transparência segue a densidade total.
+    """
+    extensao = (*densidade.limites_x, *densidade.limites_y)
+    total = densidade.total
+
+    if densidade.categorias is None:
+        imagem = np.ma.masked_where(total == 0, np.log1p(total))
+        return ax.imshow(imagem.T, origin="lower", extent=extensao, aspect="auto", cmap=cmap, interpolation="nearest")
+
+    cores = np.array(sns.color_palette(n_colors=len(densidade.categorias)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rgb = np.tensordot(densidade.contagens, cores, axes=(0, 0)) / total[..., None]
+    alfa = np.log1p(total) / np.log1p(total.max()) if total.max() else np.zeros_like(total, dtype=float)
+    rgba = np.dstack([np.nan_to_num(rgb), alfa]).transpose(1, 0, 2)
+    ax.imshow(rgba, origin="lower", extent=extensao, aspect="auto", interpolation="nearest")
+    legenda = [mpatches.Patch(color=cor, label=str(cat)) for cat, cor in zip(densidade.categorias, cores)]
+    ax.legend(handles=legenda, fontsize=8, frameon=False)
+
 # Mostra a distribuição de uma variável numérica.
 def plot_histograma(df, col_name, bins=30):
     """
@@ -11,9 +56,16 @@ def plot_histograma(df, col_name, bins=30):
     - df: DataFrame do pandas.
     - col_name: Nome da coluna numérica.
     - bins: Número de bins (padrão: 30).
+
+    As contagens e a densidade vêm de `calcular_histograma` (cacheadas por coluna e bins),
+    então o custo do desenho não depende do número de linhas.
     """
+    histograma = calcular_histograma(df, col_name, bins=bins)
     plt.figure(figsize=(8, 5))
-    sns.histplot(df[col_name], bins=bins, kde=True)
+    # Bordas reais (bins podem ser irregulares); como lista porque o seaborn compara `bins == "auto"`
+    sns.histplot(x=histograma.centros, weights=histograma.contagens, bins=list(histograma.bordas))
+    if len(histograma.kde_x):
+        plt.plot(histograma.kde_x, histograma.kde_em_contagens())
     plt.title(f'Histograma de {col_name}')
     plt.xlabel(col_name)
     plt.ylabel('Frequência')
@@ -46,7 +98,7 @@ def plot_barras(df, col_name, top_n=10):
     - top_n: Número de categorias mais frequentes a serem exibidas.
     """
     plt.figure(figsize=(10, 5))
-    df[col_name].value_counts().head(top_n).plot(kind='bar', color='skyblue')
+    contar_frequencias(df, col_name).top(top_n).plot(kind='bar', color='skyblue')
     plt.title(f'Top {top_n} Categorias em {col_name}')
     plt.xlabel(col_name)
     plt.ylabel('Frequência')
@@ -62,14 +114,20 @@ def plot_matriz_correlacao(df, metodo="pearson"):
     Parâmetros:
     - df: DataFrame do pandas.
     - metodo: Método de correlação ('pearson', 'spearman', 'kendall').
+
+    Retorna:
+    - Matriz de correlação (DataFrame) das colunas numéricas, em cache para reutilização.
     """
+    corr = calcular_matriz_correlacao(df, metodo=metodo, codificar=False)
     plt.figure(figsize=(10, 6))
-    sns.heatmap(df.corr(method=metodo), annot=True, cmap="coolwarm", fmt=".2f")
+    sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f")
     plt.title(f'Matriz de Correlação ({metodo})')
     plt.show()
 
+    return corr
+
 # Exibe a relação entre duas variáveis numéricas.
-def plot_dispersao(df, x_col, y_col, hue=None):
+def plot_dispersao(df, x_col, y_col, hue=None, modo="auto", limite_linhas=LIMITE_LINHAS_DENSIDADE, bins=300):
     """
     Plota um gráfico de dispersão para visualizar a relação entre duas variáveis numéricas.
 
@@ -78,9 +136,18 @@ def plot_dispersao(df, x_col, y_col, hue=None):
     - x_col: Nome da variável no eixo X.
     - y_col: Nome da variável no eixo Y.
     - hue: Coluna para diferenciar pontos por cor (opcional).
+    - modo: 'pontos', 'densidade' ou 'auto' (densidade acima de `limite_linhas` linhas).
+    - limite_linhas: Número de linhas a partir do qual o modo 'auto' usa densidade.
+    - bins: Células por eixo da grade de densidade.
     """
+    if modo == "auto":
+        modo = "densidade" if len(df) > limite_linhas else "pontos"
+
     plt.figure(figsize=(8, 5))
-    sns.scatterplot(data=df, x=x_col, y=y_col, hue=hue, alpha=0.7)
+    if modo == "densidade":
+        _desenhar_densidade(plt.gca(), calcular_densidade_2d(df, x_col, y_col, hue=hue, bins=bins))
+    else:
+        sns.scatterplot(data=df, x=x_col, y=y_col, hue=hue, alpha=0.7)
     plt.title(f'Dispersão entre {x_col} e {y_col}')
     plt.xlabel(x_col)
     plt.ylabel(y_col)
@@ -88,24 +155,58 @@ def plot_dispersao(df, x_col, y_col, hue=None):
     plt.show()
 
 # Plota uma linha temporal para análise de tendências.
-def plot_linha(df, x_col, y_col, group_col=None):
+def plot_linha(df, x_col, y_col, group_col=None, granularidade="auto", agregacao="media", intervalo_confianca=True, limite_linhas=LIMITE_LINHAS_LINHA):
     """
     Plota um gráfico de linha para séries temporais ou tendências.
 
+    Com granularidade 'auto' e até `limite_linhas` linhas, desenha o `sns.lineplot` nos
+    valores exatos de x (com o intervalo de 95% por bootstrap do seaborn). Acima do
+    limite, com 'dia', 'semana' ou 'mes', ou sem `y_col`, os valores são agregados por
+    período (e grupo) pelo `RollupTemporal` em cache do DataFrame, então as chamadas
+    seguintes só desenham a série pronta; 'auto' usa o dia. Nesse caso o intervalo de
+    confiança vem dos momentos de cada período (aproximação normal), sem bootstrap.
+
     Parâmetros:
     - df: DataFrame do pandas.
     - x_col: Nome da variável no eixo X (geralmente tempo).
-    - y_col: Nome da variável no eixo Y.
+    - y_col: Nome da variável no eixo Y (se None, conta as linhas).
     - group_col: Nome da coluna para agrupar e traçar múltiplas linhas (opcional).
+    - granularidade: 'dia', 'semana', 'mes' ou 'auto' (colunas não temporais usam sempre
+      o valor exato de x).
+    - agregacao: 'media' (como o seaborn), 'soma', 'contagem', 'minimo' ou 'maximo'.
+    - intervalo_confianca: Se True, desenha o intervalo de 95% da média (só com 'media').
+    - limite_linhas: Número de linhas a partir do qual 'auto' agrega por dia.
     """
+    if agregacao not in _ESTIMADORES_SEABORN:
+        raise ValueError("Agregação inválida. Escolha entre 'soma', 'media', 'contagem', 'minimo' ou 'maximo'.")
+    intervalo_confianca = intervalo_confianca and agregacao == "media"
+
     plt.figure(figsize=(10, 5))
-    if group_col:
-        sns.lineplot(data=df, x=x_col, y=y_col, hue=group_col)
+    if granularidade == "auto" and y_col is not None and len(df) <= limite_linhas:
+        sns.lineplot(
+            data=df, x=x_col, y=y_col, hue=group_col, estimator=_ESTIMADORES_SEABORN[agregacao],
+            errorbar=("ci", 95) if intervalo_confianca else None,
+        )
     else:
-        sns.lineplot(data=df, x=x_col, y=y_col)
-    plt.title(f'Tendência de {y_col} ao longo de {x_col}')
+        if granularidade == "auto":
+            granularidade = "dia"
+        rollup = obter_rollup(df, x_col, y_col, group_col)
+        serie = rollup.serie(granularidade, agregacao)
+        limites = rollup.intervalo(granularidade) if intervalo_confianca else None
+        if group_col:
+            for grupo in serie.columns:
+                valores = serie[grupo].dropna()
+                linha, = plt.plot(valores.index, valores.to_numpy(), label=grupo)
+                if limites is not None:
+                    plt.fill_between(valores.index, limites[0][grupo].reindex(valores.index), limites[1][grupo].reindex(valores.index), color=linha.get_color(), alpha=0.2)
+            plt.legend(title=group_col)
+        else:
+            plt.plot(serie.index, serie.to_numpy())
+            if limites is not None:
+                plt.fill_between(serie.index, limites[0], limites[1], alpha=0.2)
+    plt.title(f'Tendência de {y_col if y_col is not None else "linhas"} ao longo de {x_col}')
     plt.xlabel(x_col)
-    plt.ylabel(y_col)
+    plt.ylabel(y_col if y_col is not None else 'Contagem')
     plt.grid()
     plt.show()
 
@@ -119,14 +220,14 @@ def plot_pie_chart(df, col_name, top_n=5):
     - col_name: Nome da coluna categórica.
     - top_n: Número de categorias mais frequentes a serem exibidas.
     """
-    top_values = df[col_name].value_counts().head(top_n)
+    top_values = contar_frequencias(df, col_name).top(top_n)
     plt.figure(figsize=(7, 7))
     plt.pie(top_values, labels=top_values.index, autopct='%1.1f%%', colors=sns.color_palette("pastel"))
     plt.title(f'Distribuição de {col_name}')
     plt.show()
 
 # Gera um pairplot para visualizar correlações e padrões entre múltiplas variáveis.
-def plot_pairplot(df, cols=None, hue=None):
+def plot_pairplot(df, cols=None, hue=None, modo="auto", limite_linhas=LIMITE_LINHAS_DENSIDADE, amostra=None, bins=150):
     """
     Plota um pairplot para visualizar relações entre múltiplas variáveis numéricas.
 
@@ -134,6 +235,46 @@ def plot_pairplot(df, cols=None, hue=None):
     - df: DataFrame do pandas.
     - cols: Lista de colunas a serem analisadas (se None, usa todas numéricas).
     - hue: Coluna categórica para diferenciar cores (opcional).
+    - modo: 'pontos', 'densidade' ou 'auto' (densidade acima de `limite_linhas` linhas).
+    - limite_linhas: Número de linhas a partir do qual o modo 'auto' usa densidade.
+    - amostra: Número de linhas de uma amostra estratificada por `hue` (opcional).
+    - bins: Células por eixo da grade de densidade.
     """
-    sns.pairplot(df[cols] if cols else df, hue=hue, diag_kind="kde")
+    if amostra is not None:
+        df = amostrar_estratificado(df, amostra, coluna=hue)
+    if modo == "auto":
+        modo = "densidade" if len(df) > limite_linhas else "pontos"
+
+    if modo != "densidade":
+        sns.pairplot(df, vars=cols, hue=hue, diag_kind="kde")
+        plt.show()
+        return
+
+    if cols is None:
+        cols = [c for c in df.select_dtypes(include=["number"]).columns if c != hue]
+    k = len(cols)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+
+    for i, col_y in enumerate(cols):
+        for j, col_x in enumerate(cols):
+            ax = axes[i, j]
+            if i == j:
+                if hue is None:
+                    histograma = calcular_histograma(df, col_x)
+                    ax.plot(histograma.kde_x, histograma.kde_y)
+                else:
+                    for categoria, grupo in df.groupby(hue, observed=True)[col_x]:
+                        ax.plot(*estimar_kde(grupo.to_numpy(dtype="float64", na_value=np.nan)), label=str(categoria))
+                ax.set_yticks([])
+            else:
+                _desenhar_densidade(ax, calcular_densidade_2d(df, col_x, col_y, hue=hue, bins=bins))
+                if ax.get_legend() is not None and (i, j) != (0, k - 1):
+                    ax.get_legend().remove()
+            ax.set_xlabel(col_x if i == k - 1 else "")
+            ax.set_ylabel(col_y if j == 0 else "")
+
+    fig.tight_layout()
     plt.show()
+
+# Mede as funções públicas do módulo quando a instrumentação estiver ativa.
+instrumentar_modulo(globals())
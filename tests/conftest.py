@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+# Permite `import src` rodando o pytest de qualquer diretório.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Gráficos sem interface (plt.show não bloqueia).
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from src.data_loading import carregar_staging
+from src.dw_build import construir_dw
+from src.synthetic_data import gerar_dados_olist, gravar_csv_olist
+
+# Escala dos dados sintéticos dos testes (linhas da geolocalização).
+ESCALA = 5_000
+
+@pytest.fixture(scope="session")
+def tabelas_olist():
+    """Tabelas sintéticas do Olist em memória."""
+    return gerar_dados_olist(ESCALA, semente=0)
+
+@pytest.fixture(scope="session")
+def stg_path(tmp_path_factory, tabelas_olist):
+    """Banco de staging com as tabelas sintéticas (somente leitura nos testes)."""
+    diretorio = tmp_path_factory.mktemp("staging")
+    gravar_csv_olist(str(diretorio / "raw"), tabelas=tabelas_olist)
+    caminho = str(diretorio / "stg_data.db")
+    carregar_staging(str(diretorio / "raw"), caminho, processos=1, verbose=False)
+    return caminho
+
+@pytest.fixture
+def dw_path(tmp_path, stg_path):
+    """DW novo, construído a partir do staging, para cada teste."""
+    caminho = str(tmp_path / "dw_data.db")
+    construir_dw(stg_path, caminho, verbose=False)
+    return caminho
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pandas as pd
+
+from src.aggregations import AGREGADOS, construir_agregados
+
+ESTADO = "agg_vendas_diarias_estado"
+VENDEDOR = "agg_vendas_diarias_vendedor"
+
+def _ler(dw_path, nome, chaves):
+    with sqlite3.connect(dw_path) as conexao:
+        tabela = pd.read_sql_query(f'SELECT * FROM "{nome}"', conexao)
+    return tabela.sort_values(chaves, kind="stable").reset_index(drop=True)
+
+def test_agregado_novo_nao_apaga_particoes_do_incremental(dw_path):
+    construir_agregados(dw_path, {ESTADO: AGREGADOS[ESTADO]}, verbose=False)
+
+    # Um agregado incremental e um novo (reconstruído) na mesma execução
+    agregados = {ESTADO: AGREGADOS[ESTADO], VENDEDOR: AGREGADOS[VENDEDOR]}
+    relatorio = construir_agregados(dw_path, agregados, verbose=False)
+    assert relatorio.loc[ESTADO, "modo"] == "incremental"
+    assert relatorio.loc[VENDEDOR, "modo"] == "completo"
+    mistos = {nome: _ler(dw_path, nome, ["data", *colunas]) for nome, colunas in agregados.items()}
+
+    construir_agregados(dw_path, agregados, completo=True, verbose=False)
+    for nome, colunas in agregados.items():
+        completo = _ler(dw_path, nome, ["data", *colunas])
+        assert mistos[nome]["data"].min() == completo["data"].min()
+        pd.testing.assert_frame_equal(mistos[nome], completo)
+
+def test_incremental_igual_ao_completo(dw_path):
+    construir_agregados(dw_path, verbose=False)
+    relatorio = construir_agregados(dw_path, verbose=False)
+    assert (relatorio["modo"] == "incremental").all()
+    incrementais = {nome: _ler(dw_path, nome, ["data", *colunas]) for nome, colunas in AGREGADOS.items()}
+
+    construir_agregados(dw_path, completo=True, verbose=False)
+    for nome, colunas in AGREGADOS.items():
+        pd.testing.assert_frame_equal(incrementais[nome], _ler(dw_path, nome, ["data", *colunas]))
+
+def test_dw_sem_pedidos(dw_path):
+    construir_agregados(dw_path, verbose=False)
+    with sqlite3.connect(dw_path) as conexao:
+        conexao.execute("DELETE FROM dw_orders")
+    relatorio = construir_agregados(dw_path, verbose=False)
+    assert (relatorio["modo"] == "completo").all()
+    assert (relatorio["linhas_agregado"] == 0).all()
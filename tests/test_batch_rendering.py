@@ -0,0 +1,35 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.batch_rendering import renderizar_lote
+
+def _gravar(db_path, valores):
+    with sqlite3.connect(db_path) as conexao:
+        pd.DataFrame({"valor": valores}).to_sql("tabela", conexao, index=False, if_exists="replace")
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_recarregar_banco_renderiza_de_novo(tmp_path, processos):
+    db_path, saida = str(tmp_path / "dados.db"), str(tmp_path / "graficos")
+    especificacoes = [("plot_histograma", "tabela", "valor"), ("plot_histograma", "inexistente", "valor")]
+    _gravar(db_path, [1.0, 2.0, 2.0, 3.0, 5.0])
+
+    status = lambda: renderizar_lote(especificacoes, db_path, saida, processos=processos)["status"].tolist()
+    assert status() == ["renderizado", "erro"]
+    assert status() == ["em_cache", "erro"]
+
+    # Mesma quantidade de linhas, valores diferentes: o hash em memória não pode ser reaproveitado
+    _gravar(db_path, [10.0, 20.0, 20.0, 30.0, 50.0])
+    assert status() == ["renderizado", "erro"]
+    assert status() == ["em_cache", "erro"]
+
+def test_mudar_dpi_renderiza_de_novo(tmp_path):
+    db_path, saida = str(tmp_path / "dados.db"), str(tmp_path / "graficos")
+    _gravar(db_path, [1.0, 2.0, 2.0, 3.0, 5.0])
+    especificacoes = [("plot_histograma", "tabela", "valor")]
+
+    status = lambda dpi: renderizar_lote(especificacoes, db_path, saida, processos=1, dpi=dpi)["status"].tolist()
+    assert status(50) == ["renderizado"]
+    assert status(50) == ["em_cache"]
+    assert status(300) == ["renderizado"]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+import src
+from src.cache_utils import assinatura_valores
+
+def _tabela():
+    return pd.DataFrame({
+        "a": [1.0, np.nan, 3.0, 4.0],
+        "b": [1, 2, 3, 4],
+        "s": ["x", "y", None, "x"],
+        "c": pd.Categorical(["p", "q", "p", "p"]),
+    })
+
+def test_assinatura_muda_com_valores():
+    df = _tabela()
+    assinatura = assinatura_valores(df)
+    assert assinatura_valores(df.copy()) == assinatura
+    for col, valor in [("a", 10.0), ("b", 7), ("s", None), ("c", "q")]:
+        alterado = df.copy()
+        alterado.loc[0, col] = valor
+        assert assinatura_valores(alterado) != assinatura, col
+
+def test_perfil_ve_alteracao_no_lugar():
+    df = _tabela()
+    assert src.contar_valores_nulos(df).loc["a", "Total Nulos"] == 1
+    df.loc[0, "a"] = np.nan
+    assert src.contar_valores_nulos(df).loc["a", "Total Nulos"] == 2
+    assert src.gerar_resumo_estatistico(df).loc["a", "count"] == 2
+    df.loc[3, "b"] = 40
+    assert src.gerar_resumo_estatistico(df).loc["b", "max"] == 40
+
+def test_wrappers_aceitam_atualizar():
+    df = _tabela()
+    src.contar_valores_unicos(df)
+    assert src.contar_valores_unicos(df, atualizar=True).loc["s", "Valores Únicos"] == 2
+    assert src.encontrar_colunas_constantes(df, atualizar=True) == []
+    assert set(src.detectar_skewness(df, atualizar=True).index) == {"a", "b"}
+    assert src.verificar_tipos_dados(df, atualizar=True).loc["b", "Tipo de Dado"] == np.dtype("int64")
+
+def test_correlacao_ve_alteracao_no_lugar():
+    df = pd.DataFrame({"x": [1.0, 2.0, 3.0, 4.0], "y": [1.0, 2.0, 3.0, 5.0]})
+    assert src.calcular_matriz_correlacao(df).loc["x", "y"] > 0
+    df["y"] = df["y"].to_numpy()[::-1].copy()
+    assert src.calcular_matriz_correlacao(df).loc["x", "y"] < 0
+
+def test_histograma_ve_alteracao_no_lugar():
+    df = pd.DataFrame({"v": np.arange(100, dtype="float64")})
+    assert src.calcular_histograma(df, "v", bins=10).contagens.sum() == 100
+    df.loc[:49, "v"] = np.nan
+    assert src.calcular_histograma(df, "v", bins=10).contagens.sum() == 50
+
+def test_frequencias_ve_coluna_alterada_e_devolvem_copia():
+    df = pd.DataFrame({"s": ["a", "b", "a", "c"] * 10})
+    assert src.contar_categorias(df, "s").index[0] == "a"
+    df["s"] = df["s"].str.upper()
+    assert src.contar_categorias(df, "s").index[0] == "A"
+
+    frequencias = src.contar_frequencias(df, "s")
+    frequencias.contagens.iloc[0] = 0
+    frequencias.total = 0
+    novas = src.contar_frequencias(df, "s")
+    assert novas.contagens.iloc[0] == 20 and novas.total == 40
+
+def test_frequencias_sql_devolvem_copia(stg_path):
+    tabela, coluna = "stg_olist_orders", "order_status"
+    frequencias = src.contar_frequencias_sql(stg_path, tabela, coluna)
+    total = frequencias.total
+    frequencias.contagens.iloc[:] = 0
+    assert src.contar_frequencias_sql(stg_path, tabela, coluna).contagens.sum() == total
+
+def test_perfil_ve_edicao_pontual_de_texto():
+    n = 20_000
+    df = pd.DataFrame({"c": np.where(np.arange(n) % 2, "a", "b").astype(object), "x": np.arange(n)})
+    assert src.contar_valores_unicos(df).loc["c", "Valores Únicos"] == 2
+    df.loc[7, "c"] = "z"
+    assert src.contar_valores_unicos(df).loc["c", "Valores Únicos"] == 3
+
+def test_categorias_veem_edicao_pontual_de_texto():
+    n = 20_000
+    df = pd.DataFrame({"c": np.where(np.arange(n) % 2, "a", "b").astype(object)})
+    assert "z" not in src.contar_categorias(df, "c").index
+    df.loc[7, "c"] = "z"
+    assert src.contar_categorias(df, "c").loc["z", "Frequência"] == 1
+    assert src.contar_categorias(df, "c", atualizar=True).loc["a", "Frequência"] == n // 2 - 1
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src
+
+def _numericas(n=2_000, semente=0):
+    rng = np.random.default_rng(semente)
+    x = rng.normal(size=n)
+    df = pd.DataFrame({
+        "x": x,
+        "y": x * 2 + rng.normal(size=n),
+        "z": np.exp(rng.normal(size=n)),
+        "inteiros": rng.integers(0, 5, n),
+    })
+    # Nulos em linhas diferentes em cada coluna (e coincidentes entre z e y)
+    df.loc[rng.choice(n, 150, replace=False), "x"] = np.nan
+    nulos_yz = rng.choice(n, 100, replace=False)
+    df.loc[nulos_yz, ["y", "z"]] = np.nan
+    return df
+
+@pytest.mark.parametrize("metodo", ["pearson", "spearman", "kendall"])
+def test_correlacao_igual_ao_pandas(metodo):
+    df = _numericas()
+    esperado = df.corr(metodo)
+    obtido = src.calcular_matriz_correlacao(df, metodo=metodo, codificar=False)
+    np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(), atol=1e-4)
+
+def test_correlacao_devolve_copia():
+    df = _numericas()
+    matriz = src.calcular_matriz_correlacao(df, codificar=False)
+    matriz.iloc[0, 1] = 99
+    assert src.calcular_matriz_correlacao(df, codificar=False).iloc[0, 1] != 99
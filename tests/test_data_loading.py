@@ -0,0 +1,26 @@
+import sqlite3
+
+import pandas as pd
+
+from src.data_loading import carregar_staging
+from src.data_reader import ler_tabela
+
+def test_tipos_alargados_quando_blocos_discordam(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    pd.DataFrame({
+        "id": list(range(10)) + ["x1", "x2"],
+        "preco": list(range(11)) + [2.5],
+        "quantidade": range(12),
+    }).to_csv(raw / "itens.csv", index=False)
+    db_path = str(tmp_path / "stg.db")
+    carregar_staging(str(raw), db_path, tamanho_chunk=5, processos=1, verbose=False)
+
+    with sqlite3.connect(db_path) as conexao:
+        tipos = {linha[1]: linha[2] for linha in conexao.execute('PRAGMA table_info("stg_itens")')}
+    assert tipos == {"id": "TEXT", "preco": "REAL", "quantidade": "INTEGER"}
+
+    df = ler_tabela(db_path, "stg_itens")
+    assert df["id"].tolist() == [str(i) for i in range(10)] + ["x1", "x2"]
+    assert df["preco"].tolist() == list(range(11)) + [2.5]
+    assert df["quantidade"].tolist() == list(range(12))
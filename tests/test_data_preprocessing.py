@@ -0,0 +1,125 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import src
+from src.data_preprocessing import gravar_esquema_sql, ler_esquema_sql
+
+def _datas_com_pendentes():
+    return pd.DataFrame({
+        "data": ["2017-01-01"] * 300 + ["pendente"] * 5,
+        "hora": ["2017-01-01 10:00:00.5", "2017-01-02T11:30"] * 152 + ["2017-01-03 08:00:00"],
+        "seller_id": ["a", "b"] * 152 + ["a"],
+        "estado": ["SP", "RJ"] * 152 + ["SP"],
+    })
+
+def test_esquema_confere_datas_na_coluna_inteira():
+    df = _datas_com_pendentes()
+    conexao = sqlite3.connect(":memory:")
+    df.to_sql("tabela", conexao, index=False)
+    for esquema in (src.inferir_esquema(df), src.inferir_esquema_sql(conexao, "tabela")):
+        assert esquema["hora"] == "datetime64[ns]"
+        assert esquema["data"] != "datetime64[ns]"
+
+def test_esquema_sql_recusa_fracao_invalida():
+    conexao = sqlite3.connect(":memory:")
+    # O valor inválido fica fora da amostra de 200 linhas: só a conferência completa o vê
+    horas = [f"2017-01-01 {i // 60:02d}:{i % 60:02d}:00.5" for i in range(300)] + ["2017-01-01 10:00:00.5x"]
+    pd.DataFrame({"hora": horas}).to_sql("tabela", conexao, index=False)
+    assert "hora" not in src.inferir_esquema_sql(conexao, "tabela")
+
+def test_aplicar_esquema_mantem_texto_com_valores_invalidos():
+    df = _datas_com_pendentes()
+    with pytest.warns(UserWarning, match="5 valores de 'data'"):
+        src.aplicar_esquema(df, {"data": "datetime64[ns]"})
+    assert df["data"].dtype == object
+    assert (df["data"] == "pendente").sum() == 5
+
+def test_ids_nao_viram_categoria_por_padrao():
+    df = _datas_com_pendentes()
+    assert "seller_id" not in src.inferir_esquema(df)
+    assert src.inferir_esquema(df)["estado"] == "category"
+    assert src.inferir_esquema(df, categorizar_ids=True)["seller_id"] == "category"
+
+def test_relatorio_total_sem_texto_nas_colunas():
+    relatorio = src.otimizar_memoria(_datas_com_pendentes()).relatorio
+    assert relatorio.loc["Total", "memoria_antes"] == relatorio["memoria_antes"].drop("Total").sum()
+    assert relatorio.loc["Total", ["tipo_antes", "tipo_depois"]].isna().all()
+    assert pd.api.types.is_integer_dtype(relatorio["memoria_antes"])
+
+# Nomes de cidades no estilo do Olist, com variações de grafia por estado.
+CIDADES = {
+    "SP": [
+        "sao paulo", "sao jose dos campos", "sao jose do rio preto", "sao bernardo do campo", "sao caetano do sul",
+        "santo andre", "campinas", "guarulhos", "ribeirao preto", "sao carlos", "sao vicente", "santos",
+        "sorocaba", "osasco", "jundiai", "sao jose do rio pardo", "santa barbara d'oeste", "mogi das cruzes",
+        "sao joao da boa vista", "presidente prudente", "aracatuba", "araraquara",
+    ],
+    "RJ": [
+        "rio de janeiro", "niteroi", "sao goncalo", "duque de caxias", "nova iguacu", "sao joao de meriti",
+        "petropolis", "volta redonda", "campos dos goytacazes", "macae", "cabo frio", "angra dos reis",
+    ],
+    "MG": [
+        "belo horizonte", "uberlandia", "contagem", "juiz de fora", "betim", "montes claros", "sao joao del rei",
+        "sao jose da lapa", "santa luzia", "sete lagoas", "divinopolis", "pocos de caldas",
+    ],
+}
+
+def _cidades():
+    linhas = []
+    for uf, nomes in CIDADES.items():
+        for k, nome in enumerate(nomes):
+            i = 1 + k % (len(nome) - 2)
+            variantes = {
+                nome.title(), nome.replace("sao ", "são "),
+                nome[:i] + nome[i + 1:],
+                nome[:i] + nome[i + 1] + nome[i] + nome[i + 2:],
+            }
+            linhas += [(nome, uf)] * 20 + [(variante, uf) for variante in variantes]
+    return pd.DataFrame(linhas, columns=["cidade", "uf"])
+
+def _ordenado(mapeamento):
+    return mapeamento.sort_values(["estado", "valor_original"]).reset_index(drop=True)
+
+@pytest.mark.parametrize("tamanho_max_bloco", [100, 20])
+def test_deduplicacao_indexada_igual_forca_bruta(tamanho_max_bloco):
+    df = _cidades()
+    esperado = src.deduplicar_textos(df, "cidade", "uf", metodo="forca_bruta")
+    obtido = src.deduplicar_textos(df, "cidade", "uf", tamanho_max_bloco=tamanho_max_bloco)
+    pd.testing.assert_frame_equal(_ordenado(obtido.mapeamento), _ordenado(esperado.mapeamento))
+    assert obtido.estatisticas["pares_candidatos"] < esperado.estatisticas["pares_candidatos"]
+
+def test_deduplicacao_avisa_blocos_descartados():
+    with pytest.warns(UserWarning, match="blocos maiores que tamanho_max_bloco"):
+        resultado = src.deduplicar_textos(_cidades(), "cidade", "uf", tamanho_max_bloco=2)
+    assert resultado.estatisticas["blocos_descartados"] > 0
+    assert resultado.estatisticas["pares_descartados"] > 0
+
+def test_mapeamento_por_estado_exige_col_estado():
+    df = _cidades()
+    mapeamento = src.deduplicar_textos(df, "cidade", "uf").mapeamento
+    with pytest.raises(ValueError, match="col_estado"):
+        src.substituir_valores(df, "cidade", mapeamento)
+    with pytest.raises(ValueError, match="col_estado"):
+        src.Pipeline(df).substituir_valores("cidade", mapeamento)
+    src.substituir_valores(df, "cidade", mapeamento, col_estado="uf")
+    assert set(df["cidade"]) == set(mapeamento["valor_canonico"])
+
+def test_outliers_com_rotulos_nao_texto():
+    df = pd.DataFrame({0: [1.0, 2.0, 3.0, 2.0, 100.0], 1: [5.0, 6.0, 5.0, 6.0, 5.0]})
+    assert src.identificar_outliers(df, 0, metodo="iqr", fator=1.5).index.tolist() == [4]
+    assert src.identificar_outliers(df, [0, 1], metodo="iqr", fator=1.5).index.tolist() == [4]
+    src.excluir_outliers(df, 0, metodo="iqr", fator=1.5)
+    assert df[0].isna().tolist() == [False, False, False, False, True]
+    with pytest.raises(ValueError, match="Método inválido"):
+        src.identificar_outliers(df, 0, metodo="zscore")
+
+def test_esquema_sql_com_aspas_nos_nomes():
+    conexao = sqlite3.connect(":memory:")
+    tabela = 'pedidos "2018"'
+    pd.DataFrame({'data "compra"': ["2018-01-01", "2018-02-01"] * 150, "uf": ["SP", "RJ"] * 150}).to_sql(tabela, conexao, index=False)
+    esquema = src.inferir_esquema_sql(conexao, tabela)
+    assert esquema == {'data "compra"': "datetime64[ns]", "uf": "category"}
+    gravar_esquema_sql(conexao, tabela, esquema)
+    assert ler_esquema_sql(conexao, tabela) == esquema
@@ -0,0 +1,32 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.data_reader import LeitorTabelas, obter_leitor
+
+def test_obter_leitor_respeita_diretorio_cache(tmp_path):
+    db_path = str(tmp_path / "dados.db")
+    with sqlite3.connect(db_path) as conexao:
+        pd.DataFrame({"valor": [1, 2, 3]}).to_sql("tabela", conexao, index=False)
+
+    padrao = obter_leitor(db_path)
+    assert obter_leitor(db_path, padrao.diretorio_cache) is padrao
+
+    outro = obter_leitor(db_path, str(tmp_path / "outro_cache"))
+    assert outro is not padrao
+    assert outro.diretorio_cache == str(tmp_path / "outro_cache")
+    assert outro.ler("tabela")["valor"].tolist() == [1, 2, 3]
+    assert os.listdir(tmp_path / "outro_cache")
+
+def test_versao_de_banco_ou_tabela_inexistente(tmp_path):
+    ausente = str(tmp_path / "ausente.db")
+    with pytest.raises(FileNotFoundError, match="não encontrado"):
+        LeitorTabelas(ausente).versao("tabela")
+    assert not os.path.exists(ausente)
+
+    vazio = tmp_path / "vazio.db"
+    vazio.touch()
+    with pytest.raises(KeyError, match="não encontrada"):
+        LeitorTabelas(str(vazio)).versao("tabela")
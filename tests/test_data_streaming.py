@@ -0,0 +1,58 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src
+from src.data_streaming import acumular_estatisticas_sql
+
+TABELAS = ["stg_olist_geolocation", "stg_olist_order_items", "stg_olist_order_payments", "stg_olist_order_reviews"]
+
+# Contagem de outliers (iqr) com os quartis deslocados de `erro` no rank.
+def _outliers_iqr(valores, erro, fator=1.5, folga=1):
+    q1, q3 = np.quantile(valores, [0.25 - folga * erro, 0.75 + folga * erro])
+    return int(((valores < q1 - fator * (q3 - q1)) | (valores > q3 + fator * (q3 - q1))).sum())
+
+@pytest.mark.parametrize("tabela", TABELAS)
+def test_sql_igual_a_memoria(stg_path, tabela):
+    conexao = sqlite3.connect(stg_path)
+    df = pd.read_sql(f'SELECT * FROM "{tabela}"', conexao)
+    estatisticas = acumular_estatisticas_sql(conexao, tabela, tamanho_chunk=1_000)
+
+    resumo = src.gerar_resumo_estatistico(df)
+    resumo_sql = src.gerar_resumo_estatistico_sql(conexao, tabela, estatisticas=estatisticas)
+    assert list(resumo_sql.index) == list(resumo.index)
+    colunas = ["count", "mean", "std", "min", "max"]
+    np.testing.assert_allclose(resumo_sql[colunas].to_numpy(), resumo[colunas].to_numpy(), rtol=1e-9)
+
+    skew = src.detectar_skewness(df)["Skewness"]
+    skew_sql = src.detectar_skewness_sql(conexao, tabela, estatisticas=estatisticas)["Skewness"]
+    np.testing.assert_allclose(skew_sql.loc[skew.index].to_numpy(), skew.to_numpy(), rtol=1e-9, atol=1e-12)
+
+    outliers = src.outliers_por_coluna(df, metodo="desvio_padrao")["Outliers"]
+    outliers_sql = src.outliers_por_coluna_sql(conexao, tabela, metodo="desvio_padrao", estatisticas=estatisticas)["Outliers"]
+    assert outliers_sql.to_dict() == outliers.to_dict()
+
+    # Mediana e quartis do sketch: tolerância igual ao erro de rank do KLL
+    outliers_iqr = src.outliers_por_coluna_sql(conexao, tabela, metodo="iqr", estatisticas=estatisticas)["Outliers"]
+    for col in resumo.index:
+        valores = np.sort(df[col].dropna().to_numpy(dtype="float64"))
+        erro = estatisticas.sketches[col].erro_rank
+        mediana = resumo_sql.loc[col, "mediana"]
+        rank_min, rank_max = np.searchsorted(valores, mediana, "left") / len(valores), np.searchsorted(valores, mediana, "right") / len(valores)
+        assert rank_min - erro <= 0.5 <= rank_max + erro, col
+        limites = sorted([_outliers_iqr(valores, erro), _outliers_iqr(valores, erro, folga=-1)])
+        assert limites[0] <= outliers_iqr[col] <= limites[1], col
+
+def test_colunas_numericas_sem_tipo_ou_texto():
+    conexao = sqlite3.connect(":memory:")
+    conexao.execute("CREATE TABLE t (sem_tipo, texto TEXT, misto TEXT, nome TEXT)")
+    linhas = [(i, str(i / 4), str(i) if i < 1_500 else "n/d", f"x{i}") for i in range(2_000)]
+    conexao.executemany("INSERT INTO t VALUES (?, ?, ?, ?)", linhas)
+
+    estatisticas = acumular_estatisticas_sql(conexao, "t", tamanho_chunk=500)
+    assert estatisticas.numericas == ["sem_tipo", "texto"]
+    resumo = src.gerar_resumo_estatistico_sql(conexao, "t", estatisticas=estatisticas)
+    assert resumo.loc["texto", "max"] == 1_999 / 4
+    assert resumo.loc["sem_tipo", "count"] == 2_000
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pandas as pd
+
+from src.dw_build import TabelaDW, construir_dw
+from src.sqlite_utils import existe_tabela
+
+TABELAS = [TabelaDW("dw_itens", "stg_itens", ["item_id"])]
+
+def _gravar(stg_path, df):
+    with sqlite3.connect(stg_path) as conexao:
+        df.to_sql("stg_itens", conexao, index=False, if_exists="replace")
+
+def _linhas(dw_path):
+    with sqlite3.connect(dw_path) as conexao:
+        if not existe_tabela(conexao, "dw_itens"):
+            return []
+        return conexao.execute("SELECT item_id FROM dw_itens ORDER BY item_id").fetchall()
+
+def test_reconstrucao_com_origem_vazia_remove_linhas_antigas(tmp_path):
+    stg_path, dw_path = str(tmp_path / "stg.db"), str(tmp_path / "dw.db")
+    _gravar(stg_path, pd.DataFrame({"item_id": [1, 2, 3], "valor": [1.0, 2.0, 3.0]}))
+    construir_dw(stg_path, dw_path, TABELAS, verbose=False)
+    assert _linhas(dw_path) == [(1,), (2,), (3,)]
+
+    _gravar(stg_path, pd.DataFrame({"item_id": pd.Series([], dtype="int64"), "valor": pd.Series([], dtype="float64")}))
+    relatorio = construir_dw(stg_path, dw_path, TABELAS, completo=True, verbose=False)
+    assert relatorio.loc["dw_itens", "linhas_total"] == 0
+    assert _linhas(dw_path) == []
+
+    # A execução seguinte não pode fazer upsert sobre as linhas antigas
+    _gravar(stg_path, pd.DataFrame({"item_id": [4], "valor": [4.0]}))
+    construir_dw(stg_path, dw_path, TABELAS, verbose=False)
+    assert _linhas(dw_path) == [(4,)]
+
+def test_mudanca_de_colunas_com_origem_vazia_remove_esquema_antigo(tmp_path):
+    stg_path, dw_path = str(tmp_path / "stg.db"), str(tmp_path / "dw.db")
+    _gravar(stg_path, pd.DataFrame({"item_id": [1, 2], "valor": [1.0, 2.0]}))
+    construir_dw(stg_path, dw_path, TABELAS, verbose=False)
+
+    _gravar(stg_path, pd.DataFrame({"item_id": pd.Series([], dtype="int64"), "preco": pd.Series([], dtype="float64")}))
+    assert construir_dw(stg_path, dw_path, TABELAS, verbose=False).loc["dw_itens", "modo"] == "completo"
+    assert _linhas(dw_path) == []
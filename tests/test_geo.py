@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.geo import IndiceGeografico, haversine
+
+@pytest.fixture(scope="module")
+def indice(tabelas_olist):
+    return IndiceGeografico.de_geolocalizacao(tabelas_olist["geolocation"])
+
+def test_vizinho_mais_proximo_igual_a_forca_bruta(indice):
+    lat, lng = np.array([-23.5, -15.8, -3.1]), np.array([-46.6, -47.9, -60.0])
+    distancias, prefixos = indice.vizinhos(lat, lng)
+    todas = haversine(lat[:, None], lng[:, None], indice.lat[None, :], indice.lng[None, :])
+    np.testing.assert_allclose(distancias[:, 0], todas.min(axis=1))
+    assert prefixos[:, 0].tolist() == indice.prefixos[todas.argmin(axis=1)].tolist()
+
+def test_coordenadas_invalidas_ficam_vazias(indice):
+    distancias, prefixos = indice.vizinhos([np.nan, -23.5], [np.nan, -46.6], k=2)
+    assert np.isnan(distancias[0]).all() and (prefixos[0] == -1).all()
+    assert np.isfinite(distancias[1]).all() and (prefixos[1] >= 0).all()
+
+    vizinhos = indice.vizinhos_cep("abc", k=3)
+    assert len(vizinhos) == 3 and vizinhos["distancia_km"].isna().all()
+    assert indice.cep_no_raio("abc", 50).empty
+
+def test_k_maior_que_prefixos(indice):
+    distancias, prefixos = indice.vizinhos(-23.5, -46.6, k=len(indice.prefixos) + 2)
+    assert (prefixos[0, -2:] == -1).all() and np.isnan(distancias[0, -2:]).all()
+    assert np.isfinite(distancias[0, :-2]).all()
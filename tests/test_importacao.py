@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+from src.benchmark import verificar_orcamento_importacao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_pre_processamento_dentro_do_orcamento():
+    resultado = verificar_orcamento_importacao()
+    assert resultado["ok"], resultado["erro"]
+
+def test_pre_processamento_nao_importa_graficos():
+    # Processo novo: nesta sessão outros testes já importaram o matplotlib
+    codigo = "import sys, src; src.preencher_nulos; print(sorted(m for m in ('matplotlib', 'seaborn') if m in sys.modules))"
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+    assert saida.strip() == "[]"
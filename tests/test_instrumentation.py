@@ -0,0 +1,74 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import ativar_instrumentacao, desativar_instrumentacao, instrumentacao_ativa, instrumentado, instrumentar
+
+# ~8 MB alocados (e liberados) por chamada de `_interna`.
+BYTES_INTERNA = 8 * 2**20
+
+@instrumentado
+def _interna(df):
+    bloco = np.ones(BYTES_INTERNA // 8)
+    del bloco
+    return df.copy()
+
+@instrumentado
+def _externa(df):
+    df = df.copy()
+    return _interna(_interna(df))
+
+def test_ativar_e_desativar_restaura_copy():
+    originais = pd.DataFrame.copy, pd.Series.copy
+    ativar_instrumentacao()
+    assert pd.DataFrame.copy is not originais[0] and pd.Series.copy is not originais[1]
+    desativar_instrumentacao()
+    assert (pd.DataFrame.copy, pd.Series.copy) == originais
+    assert not instrumentacao_ativa()
+
+    with instrumentar():
+        with instrumentar():
+            pass
+        assert instrumentacao_ativa()
+    assert (pd.DataFrame.copy, pd.Series.copy) == originais
+
+def test_chamadas_aninhadas_somam_copias_e_picos():
+    df = pd.DataFrame({"a": range(1_000)})
+    with instrumentar() as reg:
+        _externa(df)
+    internas = [c for c in reg.chamadas if c["funcao"] == "_interna"]
+    externa = next(c for c in reg.chamadas if c["funcao"] == "_externa")
+    assert [c["copias"] for c in internas] == [1, 1]
+    assert [c["profundidade"] for c in internas] == [1, 1]
+    assert externa["copias"] == 3 and externa["profundidade"] == 0
+    for chamada in internas:
+        assert chamada["pico_memoria_mb"] >= BYTES_INTERNA / 2**20
+    assert externa["pico_memoria_mb"] >= max(c["pico_memoria_mb"] for c in internas)
+    assert reg.resumo().loc[("test_instrumentation", "_externa"), "copias"] == 3
+
+def test_pico_so_na_thread_que_ativou():
+    df = pd.DataFrame({"a": range(10)})
+    with instrumentar() as reg:
+        thread = threading.Thread(target=_interna, args=(df,))
+        thread.start()
+        thread.join()
+        _interna(df)
+    outra, principal = reg.chamadas
+    assert outra["thread"] != principal["thread"]
+    assert outra["pico_memoria_mb"] is None and outra["copias"] == 1
+    assert principal["pico_memoria_mb"] >= BYTES_INTERNA / 2**20
+
+def test_exporta_chrome_trace(tmp_path):
+    with instrumentar() as reg:
+        _externa(pd.DataFrame({"a": range(10)}))
+    caminho = reg.exportar_chrome_trace(str(tmp_path / "trace.json"))
+    with open(caminho, encoding="utf-8") as f:
+        eventos = json.load(f)["traceEvents"]
+    assert sorted(e["name"] for e in eventos) == ["_externa", "_interna", "_interna"]
+    externa = next(e for e in eventos if e["name"] == "_externa")
+    for evento in eventos:
+        assert evento["ph"] == "X" and evento["args"]["copias"] >= 1
+        # As chamadas internas ficam dentro do intervalo da externa
+        assert externa["ts"] <= evento["ts"] and evento["ts"] + evento["dur"] <= externa["ts"] + externa["dur"] + 1
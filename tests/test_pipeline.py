@@ -0,0 +1,140 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src
+from src.pipeline import Pipeline
+
+# Até 400 valores por coluna o sketch de quantis guarda tudo: em blocos, quartis e
+# medianas são exatos e podem ser comparados com as funções em memória.
+LINHAS = 400
+
+def _dados():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "k": rng.integers(0, 10, LINHAS),
+        "x": rng.normal(size=LINHAS),
+        "y": rng.exponential(size=LINHAS),
+        "t": rng.choice(["p", "q", "r"], LINHAS).astype(object),
+        "g": rng.choice(["a", "b"], LINHAS).astype(object),
+    })
+    df.loc[::7, "x"] = np.nan
+    df.loc[::11, "y"] = np.nan
+    df.loc[::5, "t"] = None
+    df.loc[[3, 50], "x"] = [40.0, -40.0]
+    return df
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    caminho = str(tmp_path_factory.mktemp("pipeline") / "dados.db")
+    with sqlite3.connect(caminho) as conexao:
+        _dados().to_sql("dados", conexao, index=False)
+    return caminho
+
+def _resultados(pipeline_de, db_path):
+    df = _dados()
+    yield "memoria", pipeline_de(Pipeline(df)).executar()
+    yield "memoria_em_blocos", pipeline_de(Pipeline(df)).executar(em_blocos=True, tamanho_chunk=64)
+    yield "sqlite", pipeline_de(Pipeline(db_path, "dados")).executar()
+    yield "sqlite_em_blocos", pipeline_de(Pipeline(db_path, "dados")).executar(em_blocos=True, tamanho_chunk=64)
+    pd.testing.assert_frame_equal(df, _dados())
+
+def _conferir(obtido, esperado):
+    pd.testing.assert_frame_equal(obtido.reset_index(drop=True), esperado.reset_index(drop=True), check_dtype=False)
+
+FILTROS = [
+    ("k", "==", 3, lambda s: s == 3),
+    ("k", "!=", 3, lambda s: s != 3),
+    ("x", ">", 0.5, lambda s: s > 0.5),
+    ("x", ">=", 0.5, lambda s: s >= 0.5),
+    ("x", "<", -0.5, lambda s: s < -0.5),
+    ("x", "<=", -0.5, lambda s: s <= -0.5),
+    ("t", "!=", "p", lambda s: s != "p"),
+    ("t", "in", ["p", "q"], lambda s: s.isin(["p", "q"])),
+    ("t", "in", ["p", None], lambda s: s.isin(["p", None])),
+    ("t", "not in", ["p"], lambda s: ~s.isin(["p"])),
+    ("t", "not in", ["p", None], lambda s: ~s.isin(["p", None])),
+    ("t", "nulo", None, lambda s: s.isna()),
+    ("t", "nao_nulo", None, lambda s: s.notna()),
+]
+
+@pytest.mark.parametrize("coluna, operador, valor, mascara", FILTROS, ids=[f"{c} {o} {v}" for c, o, v, _ in FILTROS])
+def test_filtros_iguais_ao_pandas(db_path, coluna, operador, valor, mascara):
+    df = _dados()
+    esperado = df[mascara(df[coluna])]
+    for fonte, obtido in _resultados(lambda p: p.filtrar(coluna, operador, valor), db_path):
+        assert len(obtido) == len(esperado), fonte
+        _conferir(obtido, esperado)
+
+PASSOS = {
+    "substituir_lista": (
+        lambda p: p.substituir_valores("t", ["p", "q"], "pq"),
+        lambda df: src.substituir_valores(df, "t", ["p", "q"], "pq"),
+    ),
+    "substituir_dict": (
+        lambda p: p.substituir_valores("t", {"r": "erre"}),
+        lambda df: src.substituir_valores(df, "t", {"r": "erre"}),
+    ),
+    "converter": (
+        lambda p: p.converter_tipo_dado("k", "float"),
+        lambda df: src.converter_tipo_dado(df, "k", "float"),
+    ),
+    "outliers_desvio_padrao": (
+        lambda p: p.excluir_outliers(["x", "y"], metodo="desvio_padrao", fator=2),
+        lambda df: src.excluir_outliers(df, ["x", "y"], metodo="desvio_padrao", fator=2),
+    ),
+    "outliers_iqr": (
+        lambda p: p.excluir_outliers("x", metodo="iqr", fator=1.5),
+        lambda df: src.excluir_outliers(df, "x", metodo="iqr", fator=1.5),
+    ),
+    "normalizar_min_max": (
+        lambda p: p.normalizar_coluna("y", "min_max"),
+        lambda df: src.normalizar_coluna(df, "y", "min_max"),
+    ),
+    "normalizar_z_score": (
+        lambda p: p.normalizar_coluna("x", "z_score"),
+        lambda df: src.normalizar_coluna(df, "x", "z_score"),
+    ),
+    "imputar_por_coluna": (
+        lambda p: p.imputar_nulos({"x": "media", "y": "mediana", "t": "moda"}),
+        lambda df: src.imputar_nulos(df, {"x": "media", "y": "mediana", "t": "moda"}),
+    ),
+    "imputar_por_grupo": (
+        lambda p: p.imputar_nulos({"x": "mediana", "t": "moda"}, grupos="g"),
+        lambda df: src.imputar_nulos(df, {"x": "mediana", "t": "moda"}, grupos="g"),
+    ),
+    "preencher_zero": (
+        lambda p: p.preencher_nulos("zero"),
+        lambda df: src.preencher_nulos(df, "zero"),
+    ),
+    "encadeado": (
+        lambda p: (p.filtrar("t", "not in", ["r"])
+                   .excluir_outliers("x", metodo="iqr", fator=1.5)
+                   .preencher_nulos("media")
+                   .normalizar_coluna("x", "z_score")
+                   .filtrar("x", ">", 0)),
+        lambda df: (lambda d: d[d["x"] > 0])(src.normalizar_coluna(
+            src.preencher_nulos(src.excluir_outliers(df[~df["t"].isin(["r"])].copy(), "x", metodo="iqr", fator=1.5), "media"),
+            "x", "z_score",
+        )),
+    ),
+}
+
+@pytest.mark.parametrize("nome", PASSOS)
+def test_passos_iguais_as_funcoes(db_path, nome):
+    pipeline_de, funcao = PASSOS[nome]
+    esperado = funcao(_dados())
+    for fonte, obtido in _resultados(pipeline_de, db_path):
+        assert list(obtido.columns) == list(esperado.columns), fonte
+        _conferir(obtido, esperado)
+
+def test_selecao_le_so_as_colunas_usadas(db_path):
+    pipeline = Pipeline(db_path, "dados").selecionar(["x"]).filtrar("t", "in", ["p", None]).normalizar_coluna("x")
+    plano = pipeline.compilar()
+    assert plano.colunas_lidas == ["x"]
+    assert "IS NULL" in plano.consulta
+    df = _dados()
+    esperado = src.normalizar_coluna(df[df["t"].isin(["p", None])][["x"]].copy(), "x")
+    _conferir(pipeline.executar(), esperado)
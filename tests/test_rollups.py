@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rollups import RollupTemporal, obter_rollup
+
+def _vendas(n=5_000, semente=0):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        "data": pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 200, n), "D"),
+        "valor": 1e9 + rng.normal(size=n),
+        "grupo": rng.choice(["a", "b", "c"], n),
+    })
+    df.loc[::13, "valor"] = np.nan
+    return df
+
+def test_intervalo_igual_ao_pandas_com_media_grande():
+    df = _vendas()
+    inferior, superior = RollupTemporal("data", "valor", "grupo").atualizar(df).intervalo("mes")
+    agrupado = df.groupby([df["data"].dt.to_period("M").dt.start_time, "grupo"])["valor"]
+    esperado = (agrupado.mean() - 1.96 * agrupado.sem()).unstack("grupo")
+    np.testing.assert_allclose(inferior.to_numpy(), esperado.to_numpy(), rtol=0, atol=1e-5)
+    assert (superior > inferior).all().all()
+
+def test_atualizacao_incremental_igual_a_completa():
+    df = _vendas()
+    completo = RollupTemporal("data", "valor", "grupo").atualizar(df)
+    incremental = RollupTemporal("data", "valor", "grupo").atualizar(df.iloc[:3_000])
+    incremental.tabela("semana")
+    incremental.atualizar(df.iloc[3_000:])
+    for granularidade in ("dia", "semana", "mes"):
+        esperado, obtido = completo.tabela(granularidade), incremental.tabela(granularidade)
+        pd.testing.assert_frame_equal(obtido[["contagem", "linhas"]], esperado[["contagem", "linhas"]])
+        np.testing.assert_allclose(obtido["media"], esperado["media"], rtol=1e-12)
+        np.testing.assert_allclose(obtido["m2"], esperado["m2"], rtol=1e-6)
+
+def test_datas_invalidas_viram_nat_com_aviso():
+    df = pd.DataFrame({"data": ["2018-01-05", "", "2018-01-20", "2018-02-03", "sem data"], "valor": [1, 2, 3, 4, 5]})
+    with pytest.warns(UserWarning, match="2 valores de 'data'"):
+        rollup = RollupTemporal("data", "valor").atualizar(df)
+    assert rollup.temporal
+    assert rollup.serie("mes").tolist() == [4, 4]
+
+def test_obter_rollup_ve_alteracao_e_devolve_copia():
+    df = pd.DataFrame({"data": pd.date_range("2020-01-01", periods=5), "valor": [1.0, 2.0, 3.0, 4.0, 5.0]})
+    assert obter_rollup(df, "data", "valor").serie().iloc[0] == 1
+    df.loc[0, "valor"] = 100
+    rollup = obter_rollup(df, "data", "valor")
+    assert rollup.serie().iloc[0] == 100
+
+    rollup.atualizar(df.iloc[:1])
+    assert rollup.serie().iloc[0] == 200
+    assert obter_rollup(df, "data", "valor").serie().iloc[0] == 100
@@ -0,0 +1,46 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+import seaborn as sns
+
+import src
+
+@pytest.fixture(autouse=True)
+def _fechar_figuras():
+    yield
+    plt.close("all")
+
+@pytest.mark.parametrize("funcao", [src.plot_histograma, src.visualizar_distribuicao])
+def test_histograma_usa_bordas_explicitas(funcao):
+    df = pd.DataFrame({"v": np.random.default_rng(0).exponential(size=1_000)})
+    bordas = np.array([0.0, 0.1, 0.5, 2.0, 10.0])
+    funcao(df, "v", bins=bordas)
+    barras = plt.gca().patches
+    esquerdas = sorted(barra.get_x() for barra in barras)
+    np.testing.assert_allclose(esquerdas, bordas[:-1])
+    alturas = [barra.get_height() for barra in sorted(barras, key=lambda b: b.get_x())]
+    np.testing.assert_array_equal(alturas, np.histogram(df["v"], bins=bordas)[0])
+
+def _vendas_por_hora():
+    rng = np.random.default_rng(0)
+    horas = pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 24 * 10, 2_000), "h")
+    return pd.DataFrame({"data": horas, "valor": rng.normal(size=len(horas)), "grupo": rng.choice(["a", "b"], len(horas))})
+
+def test_linha_padrao_igual_ao_seaborn():
+    df = _vendas_por_hora()
+    src.plot_linha(df, "data", "valor", "grupo")
+    obtido = plt.gca()
+    plt.figure()
+    esperado = sns.lineplot(data=df, x="data", y="valor", hue="grupo")
+    assert len(obtido.lines) == len(esperado.lines)
+    for linha, referencia in zip(obtido.lines, esperado.lines):
+        np.testing.assert_array_equal(linha.get_xydata(), referencia.get_xydata())
+    assert len(obtido.collections) == len(esperado.collections) == 2
+
+def test_linha_agrega_por_dia_acima_do_limite():
+    df = _vendas_por_hora()
+    src.plot_linha(df, "data", "valor", limite_linhas=len(df) - 1)
+    ax = plt.gca()
+    assert len(ax.lines[0].get_xdata()) == df["data"].dt.normalize().nunique()
+    assert len(ax.collections) == 1